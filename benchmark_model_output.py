@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+模型输出转储基准测试
+对比do_parse pipeline分支原来的 copy.deepcopy(model_list) + json.dumps 整体写出，
+与现在在生成middle_json之前逐页写出的耗时和峰值内存（按每100页统计）
+
+用法: python benchmark_model_output.py [--pages 100] [--dets 300]
+"""
+
+import argparse
+import copy
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def make_model_list(pages: int, dets: int) -> list:
+    """生成与pipeline模型输出结构相同的合成数据（每页dets个版面检测结果）"""
+    model_list = []
+    for page_no in range(pages):
+        layout_dets = []
+        for i in range(dets):
+            det = {
+                "category_id": i % 16,
+                "poly": [float(i), 10.0, i + 100.0, 10.0, i + 100.0, 40.0, float(i), 40.0],
+                "score": 0.9,
+            }
+            if i % 16 == 15:
+                det["text"] = "OCR识别的文本行 " * 4
+            elif i % 16 == 13:
+                det["latex"] = r"\sum_{i=1}^{n} x_i^2 + \frac{a}{b}"
+            layout_dets.append(det)
+        model_list.append({"layout_dets": layout_dets, "page_info": {"page_no": page_no, "width": 1224, "height": 1584}})
+    return model_list
+
+
+def rss_mb() -> float:
+    """当前进程的峰值RSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_mode(mode: str, pages: int, dets: int) -> dict:
+    """在当前进程中执行一种转储方式，返回耗时和峰值RSS增量"""
+    from pdf2md.streaming import write_json_array
+
+    model_list = make_model_list(pages, dets)
+    baseline = rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "doc_model.json"
+        start = time.perf_counter()
+        if mode == "deepcopy":
+            model_json = copy.deepcopy(model_list)
+            # 深拷贝一直保留到middle_json、markdown等产物全部写完
+            target.write_text(json.dumps(model_json, ensure_ascii=False, indent=4), encoding="utf-8")
+            del model_json
+        else:
+            write_json_array(target, model_list)
+        duration = time.perf_counter() - start
+    return {"mode": mode, "seconds": duration, "peak_rss_mb": rss_mb() - baseline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型输出转储基准测试")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--dets", type=int, default=300, help="每页版面检测结果数")
+    parser.add_argument("--mode", choices=["deepcopy", "snapshot"], help="内部使用：在子进程中执行一种方式")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.pages, args.dets)))
+        return
+
+    # 每种方式在独立子进程中运行，峰值RSS互不影响
+    results = {}
+    for mode in ("deepcopy", "snapshot"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--pages", str(args.pages), "--dets", str(args.dets)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    scale = 100 / args.pages
+    print(f"页数: {args.pages}，每页检测结果: {args.dets}")
+    print(f"{'方式':<10}{'耗时/100页':>14}{'峰值RSS增量/100页':>22}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['seconds'] * scale:>12.3f}s{result['peak_rss_mb'] * scale:>20.1f}MB")
+    old, new = results["deepcopy"], results["snapshot"]
+    print(f"每100页节省: {(old['seconds'] - new['seconds']) * scale:.3f}s, "
+          f"{(old['peak_rss_mb'] - new['peak_rss_mb']) * scale:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
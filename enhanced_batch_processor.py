@@ -7,26 +7,30 @@
 import os
 import sys
 import time
+import itertools
 import threading
 import queue
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import json
 
 class EnhancedBatchProcessor:
     """增强版批量处理器"""
     
-    def __init__(self, max_workers: int = 2, device_preference: str = "gpu_first"):
+    def __init__(self, max_workers: int = 2, device_preference: str = "gpu_first", worker_pool=None):
         """
         初始化批量处理器
         
         Args:
             max_workers: 最大并发数
             device_preference: 设备偏好 ("gpu_first", "cpu_first", "auto")
+            worker_pool: 常驻模型进程池（pdf2md.worker_pool.ModelWorkerPool），
+                提供时任务交给进程池执行，模型只在每个工作进程中加载一次
         """
         self.max_workers = max_workers
         self.device_preference = device_preference
+        self.worker_pool = worker_pool
         self.is_processing = False
         self.should_stop = False  # 添加停止标志
         self.processing_tasks = []
@@ -167,8 +171,55 @@ class EnhancedBatchProcessor:
             task["end_time"] = time.time()
             return {"success": False, "task": task, "error": str(e)}
     
-    def start_batch_processing(self, progress_callback: Optional[Callable] = None):
-        """开始批量处理"""
+    def _iter_pending_tasks(self, task_source: Optional[Iterable[Tuple[Path, Path, Dict[str, Any]]]]) -> Iterator[Dict[str, Any]]:
+        """依次产出已添加的任务和task_source中边发现边添加的任务"""
+        for task in list(self.processing_tasks):
+            yield task
+        if task_source is None:
+            return
+        for input_file, output_dir, options in task_source:
+            if self.should_stop:
+                return
+            self.add_task(input_file, output_dir, options)
+            self.total_files += 1
+            yield self.processing_tasks[-1]
+    
+    def _submit_bounded(self, tasks: Iterable[Dict[str, Any]], submit: Callable, on_done: Callable):
+        """边产生边提交任务，同时在途的任务不超过并发数的两倍"""
+        max_in_flight = max(2, self.max_workers * 2)
+        future_to_task = {}
+        for task in tasks:
+            if self.should_stop:  # 检查是否应该停止
+                break
+            future_to_task[submit(task)] = task
+            if len(future_to_task) >= max_in_flight:
+                done, _ = wait(future_to_task, return_when=FIRST_COMPLETED)
+                for future in done:
+                    on_done(future, future_to_task.pop(future))
+        
+        for future in as_completed(list(future_to_task)):
+            if self.should_stop:  # 检查是否应该停止
+                break
+            on_done(future, future_to_task.pop(future))
+    
+    def _report_progress(self, progress_callback: Optional[Callable]):
+        """调用进度回调（遍历未结束时总数还会增长）"""
+        if progress_callback and not self.should_stop and self.total_files:
+            progress = (self.completed_files / self.total_files) * 100
+            progress_callback(progress, f"已完成 {self.completed_files}/{self.total_files}")
+    
+    def start_batch_processing(
+        self,
+        progress_callback: Optional[Callable] = None,
+        task_source: Optional[Iterable[Tuple[Path, Path, Dict[str, Any]]]] = None
+    ):
+        """开始批量处理
+        
+        Args:
+            progress_callback: 进度回调
+            task_source: 可选的 (输入文件, 输出目录, 选项) 迭代器（如边遍历目录边产出），
+                任务随发现随提交，不必等全部文件找到后再开始
+        """
         if self.is_processing:
             return
         
@@ -186,37 +237,40 @@ class EnhancedBatchProcessor:
         print(f"可用设备: {available_devices}")
         print(f"选择设备: {selected_device}")
         
+        tasks = self._iter_pending_tasks(task_source)
+        
+        if self.worker_pool is not None:
+            self._process_with_worker_pool(selected_device, progress_callback, tasks)
+            self.is_processing = False
+            return {
+                "total_files": self.total_files,
+                "success_count": self.success_files,
+                "failed_count": self.failed_files,
+                "device_used": selected_device
+            }
+        
         # 使用线程池进行并发处理
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {}
-            for task in self.processing_tasks:
-                if self.should_stop:  # 检查是否应该停止
-                    break
-                future = executor.submit(self.process_single_file, task, selected_device)
-                future_to_task[future] = task
+        def on_done(future, task):
+            result = future.result()
             
-            # 处理完成的任务
-            for future in as_completed(future_to_task):
-                if self.should_stop:  # 检查是否应该停止
-                    break
-                    
-                task = future_to_task[future]
-                result = future.result()
-                
-                self.completed_files += 1
-                
-                if result["success"]:
-                    self.success_files += 1
-                    print(f"✅ 完成: {task['input_file'].name}")
-                else:
-                    self.failed_files += 1
-                    print(f"❌ 失败: {task['input_file'].name} - {result['error']}")
-                
-                # 调用进度回调
-                if progress_callback and not self.should_stop:
-                    progress = (self.completed_files / self.total_files) * 100
-                    progress_callback(progress, f"已完成 {self.completed_files}/{self.total_files}")
+            self.completed_files += 1
+            
+            if result["success"]:
+                self.success_files += 1
+                print(f"✅ 完成: {task['input_file'].name}")
+            else:
+                self.failed_files += 1
+                print(f"❌ 失败: {task['input_file'].name} - {result['error']}")
+            
+            # 调用进度回调
+            self._report_progress(progress_callback)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._submit_bounded(
+                tasks,
+                lambda task: executor.submit(self.process_single_file, task, selected_device),
+                on_done
+            )
         
         self.is_processing = False
         
@@ -227,6 +281,65 @@ class EnhancedBatchProcessor:
             "device_used": selected_device
         }
     
+    def _process_with_worker_pool(
+        self,
+        device: str,
+        progress_callback: Optional[Callable] = None,
+        tasks: Optional[Iterable[Dict[str, Any]]] = None
+    ):
+        """使用常驻模型进程池处理所有任务"""
+        from pdf2md.batch_processor import FileTask, convert_file_task
+        
+        task_ids = itertools.count(1)
+        
+        def submit(task):
+            options = task["options"]
+            file_task = FileTask(
+                file_path=Path(task["input_file"]),
+                output_dir=Path(task["output_dir"]),
+                task_id=next(task_ids),
+                total_files=self.total_files,
+                use_gpu=device == "gpu",
+                lang=self.worker_pool.lang,
+                backend=options.get("backend", "pipeline"),
+                method=options.get("method", "auto"),
+                formula_enable=self.worker_pool.formula_enable,
+                table_enable=self.worker_pool.table_enable
+            )
+            task["status"] = "处理中"
+            task["start_time"] = time.time()
+            return self.worker_pool.submit(convert_file_task, file_task)
+        
+        def on_done(future, task):
+            task["end_time"] = time.time()
+            task["processing_time"] = task["end_time"] - task["start_time"]
+            self.completed_files += 1
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                result = None
+                task["error"] = str(e)
+            
+            if result is not None and result.success:
+                self.success_files += 1
+                task["status"] = "成功"
+                task["progress"] = 100
+                task["output_file"] = result.output_path
+                print(f"✅ 完成: {task['input_file'].name}")
+            else:
+                self.failed_files += 1
+                task["status"] = "失败"
+                if result is not None:
+                    task["error"] = result.error_message
+                print(f"❌ 失败: {task['input_file'].name} - {task['error']}")
+            
+            self._report_progress(progress_callback)
+        
+        if tasks is None:
+            tasks = list(self.processing_tasks)
+        self._submit_bounded(tasks, submit, on_done)
+    
     def get_task_status(self) -> List[Dict[str, Any]]:
         """获取任务状态"""
         return self.processing_tasks
@@ -7,11 +7,19 @@
 import os
 import time
 import logging
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
+from .config import config
+from .ocr_pipeline import OcrOptions, iter_ocr_pages
+from .page_extraction import PageStore, iter_page_texts, write_markdown_pages
+from .triage import MIN_TEXT_CHARS, SCANNED, TriageResult, triage_pdf
+
 logger = logging.getLogger(__name__)
 
 class ProcessorType(Enum):
@@ -23,6 +31,14 @@ class ProcessorType(Enum):
     PYTESSERACT = "pytesseract"
     OCRMYPDF = "ocrmypdf"
 
+# 只读取文字层的提取器（开销小）和OCR处理器，均按优先级排列
+TEXT_EXTRACTORS = [ProcessorType.PYPDF, ProcessorType.PDFPLUMBER, ProcessorType.PYMUPDF]
+OCR_PROCESSORS = [ProcessorType.OCRMYPDF, ProcessorType.PYTESSERACT]
+
+# 处理策略：依次尝试 / 文本提取器同时运行
+STRATEGY_SEQUENTIAL = "sequential"
+STRATEGY_RACE = "race"
+
 @dataclass
 class ProcessorResult:
     """处理器结果"""
@@ -32,11 +48,43 @@ class ProcessorResult:
     processor: Optional[str] = None
     duration: float = 0.0
     page_count: int = 0
+    text_pages: int = 0  # 提取到文本的页数
+    output_path: Optional[Path] = None  # 已写好的markdown文件
+    pages: Dict[int, str] = field(default_factory=dict)  # 页码 -> 文本（未写入PageStore时）
+
+    @property
+    def text_coverage(self) -> float:
+        """提取到文本的页数占处理页数的比例"""
+        if self.page_count <= 0:
+            return 1.0 if self.text_pages > 0 else 0.0
+        return self.text_pages / self.page_count
 
 class AdvancedPDFProcessor:
     """高级PDF处理器"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        strategy: Optional[str] = None,
+        race_timeout: Optional[float] = None,
+        min_text_coverage: Optional[float] = None
+    ):
+        self.strategy = strategy or config.get('fallback.strategy', STRATEGY_RACE)
+        if self.strategy not in (STRATEGY_SEQUENTIAL, STRATEGY_RACE):
+            raise ValueError(f"未知的处理策略: {self.strategy}（可选: {STRATEGY_SEQUENTIAL}, {STRATEGY_RACE}）")
+        # 同时运行文本提取器时等待的最长时间（秒）
+        self.race_timeout = race_timeout if race_timeout is not None else config.get('fallback.race_timeout', 120.0)
+        # 提取到文本的页数占总页数的最低比例，达到才采用该结果
+        self.min_text_coverage = (
+            min_text_coverage if min_text_coverage is not None
+            else config.get('fallback.min_text_coverage', 0.5)
+        )
+        self.ocr_options = OcrOptions(
+            dpi=config.get('ocr.dpi', 200),
+            grayscale=config.get('ocr.grayscale', True),
+            lang=config.get('ocr.lang', 'eng+chi_sim'),
+            workers=config.get('ocr.workers', 0),
+            max_queued_pages=config.get('ocr.max_queued_pages', 0)
+        )
         self.processors = {}
         self._init_processors()
     
@@ -83,171 +131,115 @@ class AdvancedPDFProcessor:
         except ImportError:
             logger.warning("❌ OCRmyPDF处理器不可用")
     
-    def _pypdf_processor(self, pdf_path: Path) -> ProcessorResult:
-        """PyPDF处理器"""
+    def _extract_text_layer(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]],
+        store: Optional[PageStore],
+        source: str
+    ) -> ProcessorResult:
+        """用pypdf逐页读取文字层（大文档按页码范围并行提取）"""
         start_time = time.time()
+        collector = _PageCollector(source, store)
         try:
-            from pypdf import PdfReader
-            reader = PdfReader(pdf_path)
-            page_count = len(reader.pages)
-            
-            text_parts = []
-            successful_pages = 0
-            
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    text = page.extract_text()
-                    if text and text.strip():
-                        text_parts.append(f"# 第 {page_num} 页\n\n{text.strip()}\n")
-                        successful_pages += 1
-                except Exception as e:
-                    logger.debug(f"PyPDF: 第 {page_num} 页提取失败: {e}")
-                    continue
-            
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=len(text_parts) > 0,
-                text="\n".join(text_parts) if text_parts else None,
-                processor="pypdf",
-                duration=duration,
-                page_count=page_count
-            )
+            for page_num, text in iter_page_texts(pdf_path, page_numbers=page_numbers):
+                collector.add(page_num, text)
+            return collector.result(time.time() - start_time)
         except Exception as e:
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=False,
-                error=str(e),
-                processor="pypdf",
-                duration=duration
-            )
+            return collector.failure(e, time.time() - start_time)
+    
+    def _pypdf_processor(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None,
+        store: Optional[PageStore] = None
+    ) -> ProcessorResult:
+        """PyPDF处理器"""
+        return self._extract_text_layer(pdf_path, page_numbers, store, "pypdf")
     
-    def _pdfplumber_processor(self, pdf_path: Path) -> ProcessorResult:
+    def _pdfplumber_processor(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None,
+        store: Optional[PageStore] = None
+    ) -> ProcessorResult:
         """PDFPlumber处理器"""
         start_time = time.time()
+        collector = _PageCollector("pdfplumber", store)
         try:
             import pdfplumber
             
-            text_parts = []
-            successful_pages = 0
-            
             with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
+                for index in _page_indices(len(pdf.pages), page_numbers):
                     try:
-                        text = page.extract_text()
-                        if text and text.strip():
-                            text_parts.append(f"# 第 {page_num} 页\n\n{text.strip()}\n")
-                            successful_pages += 1
+                        text = pdf.pages[index].extract_text()
                     except Exception as e:
-                        logger.debug(f"PDFPlumber: 第 {page_num} 页提取失败: {e}")
-                        continue
+                        logger.debug(f"PDFPlumber: 第 {index + 1} 页提取失败: {e}")
+                        text = ""
+                    collector.add(index + 1, text)
             
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=len(text_parts) > 0,
-                text="\n".join(text_parts) if text_parts else None,
-                processor="pdfplumber",
-                duration=duration,
-                page_count=len(pdf.pages)
-            )
+            return collector.result(time.time() - start_time)
         except Exception as e:
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=False,
-                error=str(e),
-                processor="pdfplumber",
-                duration=duration
-            )
+            return collector.failure(e, time.time() - start_time)
     
-    def _pymupdf_processor(self, pdf_path: Path) -> ProcessorResult:
+    def _pymupdf_processor(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None,
+        store: Optional[PageStore] = None
+    ) -> ProcessorResult:
         """PyMuPDF处理器"""
         start_time = time.time()
+        collector = _PageCollector("pymupdf", store)
         try:
             import pymupdf
             
-            text_parts = []
-            successful_pages = 0
-            
             doc = pymupdf.open(pdf_path)
-            page_count = len(doc)
-            
-            for page_num in range(page_count):
-                try:
-                    page = doc.load_page(page_num)
-                    text = page.get_text()
-                    if text and text.strip():
-                        text_parts.append(f"# 第 {page_num + 1} 页\n\n{text.strip()}\n")
-                        successful_pages += 1
-                except Exception as e:
-                    logger.debug(f"PyMuPDF: 第 {page_num + 1} 页提取失败: {e}")
-                    continue
+            try:
+                for index in _page_indices(len(doc), page_numbers):
+                    try:
+                        text = doc.load_page(index).get_text()
+                    except Exception as e:
+                        logger.debug(f"PyMuPDF: 第 {index + 1} 页提取失败: {e}")
+                        text = ""
+                    collector.add(index + 1, text)
+            finally:
+                doc.close()
             
-            doc.close()
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=len(text_parts) > 0,
-                text="\n".join(text_parts) if text_parts else None,
-                processor="pymupdf",
-                duration=duration,
-                page_count=page_count
-            )
+            return collector.result(time.time() - start_time)
         except Exception as e:
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=False,
-                error=str(e),
-                processor="pymupdf",
-                duration=duration
-            )
+            return collector.failure(e, time.time() - start_time)
     
-    def _pytesseract_processor(self, pdf_path: Path) -> ProcessorResult:
-        """PyTesseract OCR处理器"""
+    def _pytesseract_processor(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None,
+        store: Optional[PageStore] = None
+    ) -> ProcessorResult:
+        """PyTesseract OCR处理器（只识别指定的页，渲染与多进程识别流水线并行）"""
         start_time = time.time()
+        collector = _PageCollector("pytesseract", store)
         try:
-            import pytesseract
-            from PIL import Image
             import fitz  # PyMuPDF for PDF to image conversion
             
-            text_parts = []
-            successful_pages = 0
-            
             doc = fitz.open(pdf_path)
             page_count = len(doc)
+            doc.close()
             
-            for page_num in range(page_count):
-                try:
-                    page = doc.load_page(page_num)
-                    pix = page.get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    
-                    # OCR处理
-                    text = pytesseract.image_to_string(img, lang='eng+chi_sim')
-                    if text and text.strip():
-                        text_parts.append(f"# 第 {page_num + 1} 页 (OCR)\n\n{text.strip()}\n")
-                        successful_pages += 1
-                except Exception as e:
-                    logger.debug(f"PyTesseract: 第 {page_num + 1} 页OCR失败: {e}")
-                    continue
+            for page_num, text in iter_ocr_pages(pdf_path, page_count, page_numbers, self.ocr_options):
+                collector.add(page_num, text)
             
-            doc.close()
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=len(text_parts) > 0,
-                text="\n".join(text_parts) if text_parts else None,
-                processor="pytesseract",
-                duration=duration,
-                page_count=page_count
-            )
+            return collector.result(time.time() - start_time)
         except Exception as e:
-            duration = time.time() - start_time
-            return ProcessorResult(
-                success=False,
-                error=str(e),
-                processor="pytesseract",
-                duration=duration
-            )
+            return collector.failure(e, time.time() - start_time)
     
-    def _ocrmypdf_processor(self, pdf_path: Path) -> ProcessorResult:
-        """OCRmyPDF处理器"""
+    def _ocrmypdf_processor(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None,
+        store: Optional[PageStore] = None
+    ) -> ProcessorResult:
+        """OCRmyPDF处理器（只对指定的页做OCR）"""
         start_time = time.time()
         try:
             import ocrmypdf
@@ -258,18 +250,21 @@ class AdvancedPDFProcessor:
                 output_path = Path(tmp_file.name)
             
             try:
-                # 使用OCRmyPDF处理
+                # 使用OCRmyPDF处理；其余页原样保留，页码不变
+                options = {}
+                if page_numbers:
+                    options["pages"] = ",".join(str(p) for p in page_numbers)
                 ocrmypdf.ocr(
                     pdf_path,
                     output_path,
                     language=['eng', 'chi_sim'],
                     output_type='pdf',
-                    force_ocr=True
+                    force_ocr=True,
+                    **options
                 )
                 
                 # 从OCR处理后的PDF提取文本
-                result = self._pypdf_processor(output_path)
-                result.processor = "ocrmypdf"
+                result = self._extract_text_layer(output_path, page_numbers, store, "ocrmypdf")
                 result.duration = time.time() - start_time
                 
                 return result
@@ -288,7 +283,10 @@ class AdvancedPDFProcessor:
             )
     
     def process_pdf(self, pdf_path: Path, output_path: Path) -> ProcessorResult:
-        """处理PDF文件，自动选择最佳处理器"""
+        """处理PDF文件，自动选择最佳处理器
+        
+        各处理器的结果按页合并：已经得到合格文本的页保留，只有缺失或质量不足的页交给下一个（开销更大的）处理器。
+        """
         logger.info(f"开始处理PDF文件: {pdf_path}")
         
         if not pdf_path.exists():
@@ -297,46 +295,218 @@ class AdvancedPDFProcessor:
                 error="PDF文件不存在"
             )
         
-        # 按优先级尝试不同的处理器
-        processor_order = [
-            ProcessorType.PYPDF,
-            ProcessorType.PDFPLUMBER,
-            ProcessorType.PYMUPDF,
-            ProcessorType.OCRMYPDF,
-            ProcessorType.PYTESSERACT
-        ]
+        start_time = time.time()
+        triage = triage_pdf(pdf_path)
+        store = PageStore.create_for(output_path)
+        try:
+            if triage is not None:
+                store.page_count = triage.pages
+            
+            if self.strategy == STRATEGY_RACE:
+                self._process_race(pdf_path, store, triage)
+            else:
+                self._process_sequential(pdf_path, store, triage)
+            
+            return self._write_pages(pdf_path, output_path, store, time.time() - start_time)
+        finally:
+            store.close()
+    
+    def _process_sequential(self, pdf_path: Path, store: PageStore, triage: Optional[TriageResult]) -> None:
+        """按优先级依次尝试各处理器"""
+        processor_order = TEXT_EXTRACTORS + OCR_PROCESSORS
+        
+        # 扫描型PDF没有文字层，文本提取只会得到页眉页码之类的零星文字，直接从OCR开始
+        if triage is not None and triage.kind == SCANNED:
+            logger.info("预分类为扫描型PDF，优先使用OCR处理器")
+            processor_order = OCR_PROCESSORS + TEXT_EXTRACTORS
+        
+        self._run_chain(pdf_path, store, processor_order)
+    
+    def _process_race(self, pdf_path: Path, store: PageStore, triage: Optional[TriageResult]) -> None:
+        """文本提取器同时运行，采用在截止时间内第一个达到质量阈值的结果，剩余的页再走OCR
+        
+        预分类为扫描型的PDF不运行文本提取器，直接OCR。每个提取器把逐页结果写入自己的磁盘暂存目录，
+        不在内存中保存整个文档；被放弃的提取器在写入下一页时结束，需要OCR时等它们结束后才启动OCR进程池。
+        """
+        if triage is not None and triage.kind == SCANNED:
+            logger.info("预分类为扫描型PDF，直接使用OCR处理器")
+        else:
+            extractors = [t for t in TEXT_EXTRACTORS if t in self.processors]
+            racers = {
+                t: _RaceStore(Path(tempfile.mkdtemp(prefix=f"{t.value}.", dir=store.directory)))
+                for t in extractors
+            }
+            executor = ThreadPoolExecutor(max_workers=max(1, len(extractors)))
+            try:
+                for processor_type, result in self._race(pdf_path, racers, executor):
+                    store.page_count = store.page_count or result.page_count
+                    for page_num, text in racers[processor_type].iter_pages():
+                        store.add(page_num, text, result.processor)
+            finally:
+                for racer in racers.values():
+                    racer.abandoned.set()
+                executor.shutdown(wait=store.missing() != [], cancel_futures=True)
+                for racer in racers.values():
+                    racer.close()
         
+        self._run_chain(pdf_path, store, OCR_PROCESSORS)
+    
+    def _run_chain(self, pdf_path: Path, store: PageStore, processor_order: List[ProcessorType]) -> None:
+        """依次运行处理器，每个处理器只处理前面还缺失或质量不足的页"""
         for processor_type in processor_order:
             if processor_type not in self.processors:
                 logger.warning(f"处理器 {processor_type.value} 不可用")
                 continue
             
-            logger.info(f"尝试使用 {processor_type.value} 处理器")
-            result = self.processors[processor_type](pdf_path)
+            page_numbers = store.missing()
+            if page_numbers == []:
+                return
             
-            if result.success and result.text:
-                # 保存为markdown文件
-                try:
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(f"# {pdf_path.stem}\n\n")
-                        f.write(result.text)
-                    
-                    logger.info(f"✅ 使用 {processor_type.value} 成功处理PDF文件")
-                    return result
-                    
-                except Exception as e:
-                    logger.error(f"保存文件失败: {e}")
-                    result.success = False
-                    result.error = f"保存失败: {e}"
-                    continue
+            scope = "全部页面" if page_numbers is None else f"{len(page_numbers)} 页"
+            logger.info(f"尝试使用 {processor_type.value} 处理器 ({scope})")
+            result = self.processors[processor_type](pdf_path, page_numbers, store)
+            if page_numbers is None:
+                store.page_count = result.page_count
+            
+            if result.success:
+                logger.info(f"{processor_type.value} 提取到 {result.text_pages}/{result.page_count} 页文本")
             else:
                 logger.warning(f"❌ {processor_type.value} 处理失败: {result.error}")
+    
+    def _race(
+        self,
+        pdf_path: Path,
+        racers: Dict[ProcessorType, PageStore],
+        executor: ThreadPoolExecutor
+    ) -> List[Tuple[ProcessorType, ProcessorResult]]:
+        """同时运行文本提取器，返回已完成的结果，第一个达标的结果排在最前
         
-        # 所有处理器都失败了
+        达标或超过截止时间后不再等待其余提取器，由调用方放弃它们并决定是否等待结束。
+        """
+        if not racers:
+            return []
+        
+        logger.info(f"同时运行文本提取器: {', '.join(t.value for t in racers)}")
+        pending = {executor.submit(self.processors[t], pdf_path, None, racers[t]): t for t in racers}
+        deadline = time.time() + self.race_timeout
+        finished = []
+        
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(f"文本提取超过 {self.race_timeout:.0f} 秒，放弃仍在运行的提取器")
+                break
+            
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                processor_type = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = ProcessorResult(success=False, error=str(e), processor=processor_type.value)
+                
+                if self._passes_quality(result):
+                    logger.info(f"{processor_type.value} 最先达到质量阈值 (文本页比例 {result.text_coverage:.0%})")
+                    return [(processor_type, result)] + finished
+                if result.success:
+                    finished.append((processor_type, result))
+                logger.warning(f"❌ {processor_type.value} 未达到质量阈值: {result.error or f'文本页比例 {result.text_coverage:.0%}'}")
+        return finished
+    
+    def _passes_quality(self, result: ProcessorResult) -> bool:
+        """提取结果是否达到质量阈值"""
+        return result.success and result.text_coverage >= self.min_text_coverage
+    
+    def _write_pages(self, pdf_path: Path, output_path: Path, store: PageStore, duration: float) -> ProcessorResult:
+        """把合并后的逐页结果按页码顺序写入markdown文件"""
+        if not len(store):
+            # 所有处理器都失败了
+            return ProcessorResult(
+                success=False,
+                error="所有处理器都失败了",
+                duration=duration
+            )
+        
+        try:
+            written = write_markdown_pages(output_path, pdf_path.stem, store.iter_pages())
+        except Exception as e:
+            logger.error(f"保存文件失败: {e}")
+            return ProcessorResult(success=False, error=f"保存失败: {e}", duration=duration)
+        
+        processors = "+".join(store.processors())
+        logger.info(f"✅ 使用 {processors} 成功处理PDF文件 ({written}/{store.page_count or written} 页)")
+        return ProcessorResult(
+            success=True,
+            processor=processors,
+            duration=duration,
+            page_count=store.page_count,
+            text_pages=written,
+            output_path=output_path
+        )
+
+
+def _page_indices(page_count: int, page_numbers: Optional[List[int]]) -> List[int]:
+    """要处理的页面索引（从0开始），page_numbers为None时表示全部页面"""
+    if page_numbers is None:
+        return list(range(page_count))
+    return sorted({p - 1 for p in page_numbers if 1 <= p <= page_count})
+
+
+class RaceAbandoned(Exception):
+    """同时运行的文本提取器已被放弃"""
+
+
+class _RaceStore(PageStore):
+    """同时运行的文本提取器各自的逐页结果，被放弃后再写入页面时抛出RaceAbandoned，提取器随之结束"""
+    
+    def __init__(self, directory: Path, min_chars: int = MIN_TEXT_CHARS):
+        super().__init__(directory, min_chars)
+        self.abandoned = threading.Event()
+    
+    def add(self, page_num: int, text: str, source: str) -> bool:
+        if self.abandoned.is_set():
+            raise RaceAbandoned(f"{source} 已被放弃")
+        return super().add(page_num, text, source)
+
+
+class _PageCollector:
+    """收集处理器的逐页输出：指定PageStore时直接写入，否则保存在内存中"""
+    
+    def __init__(self, source: str, store: Optional[PageStore] = None):
+        self.source = source
+        self.store = store
+        self.pages: Dict[int, str] = {}
+        self.page_count = 0
+        self.text_pages = 0
+    
+    def add(self, page_num: int, text: Optional[str]) -> None:
+        self.page_count += 1
+        text = (text or "").strip()
+        if not text:
+            return
+        self.text_pages += 1
+        if self.store is not None:
+            self.store.add(page_num, text, self.source)
+        else:
+            self.pages[page_num] = text
+    
+    def result(self, duration: float) -> ProcessorResult:
+        # 逐页结果已在pages或PageStore中，不再拼接一份完整文本
+        return ProcessorResult(
+            success=self.text_pages > 0,
+            processor=self.source,
+            duration=duration,
+            page_count=self.page_count,
+            text_pages=self.text_pages,
+            pages=self.pages
+        )
+    
+    def failure(self, error: Exception, duration: float) -> ProcessorResult:
         return ProcessorResult(
             success=False,
-            error="所有处理器都失败了"
+            error=str(error),
+            processor=self.source,
+            duration=duration
         )
 
 def install_dependencies():
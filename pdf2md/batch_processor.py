@@ -7,15 +7,32 @@ import os
 import time
 import signal
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from dataclasses import dataclass, field
 import threading
 from queue import Queue
 import multiprocessing as mp
 
 from .logger import ConversionLogger
 from .mineru_wrapper import parse_doc
+from .worker_pool import ModelWorkerPool, create_process_executor
+from .batching import InferenceBatch, convert_batch, iter_inference_batches
+from .result_cache import ConversionCache, get_conversion_cache, options_fingerprint
+from .manifest import ConversionManifest
+from .discovery import FileDiscovery, iter_pdf_files
+from .utils import format_duration
+from .output_profiles import DEFAULT_OUTPUT_PROFILE
+from .serialization import DEFAULT_SERIALIZATION
+from .output_layout import OutputLayout
+from .estimator import LearnedTimeEstimator, PdfFeatures, estimate_makespan, extract_pdf_features
+from .scheduling import iter_longest_first, schedule_window_for
+from .triage import KIND_LABELS, triage_pdf
+from .sharding import (
+    ShardFinish, ShardJob, ShardResult, convert_shard, exact_page_count, finish_shards, plan_shards
+)
 
 
 @dataclass
@@ -26,6 +43,34 @@ class FileTask:
     task_id: int
     total_files: int
     use_gpu: bool
+    lang: str = "ch"
+    backend: str = "pipeline"
+    method: str = "auto"
+    formula_enable: bool = True
+    table_enable: bool = True
+    output_profile: str = DEFAULT_OUTPUT_PROFILE  # 输出配置档，决定生成哪些产物
+    cache_dir: Optional[Path] = None  # 转换结果缓存目录，None表示不使用缓存
+    cache_max_size_mb: int = 10240
+    cache_key: Optional[str] = None
+    input_dir: Optional[Path] = None  # 输入根目录，输出按其下的相对路径镜像
+    file_size: int = 0  # 遍历目录时取得的文件大小，用于剩余时间预估
+    features: Optional[Dict[str, Any]] = None  # PdfFeatures，启用学习型时间预估时提取
+    predicted_time: float = 0.0
+    doc_kind: Optional[str] = None  # 预分类结果: text / scanned / mixed，未分类时为None
+    window_pages: int = 0  # 超过该页数的文档分窗口流式转换，0表示整份文档一次推理
+    serialization: str = DEFAULT_SERIALIZATION  # JSON产物的编码和压缩方式，例如 compact+gzip
+    
+    def conversion_options(self) -> Dict[str, Any]:
+        """影响转换结果的参数（用于缓存指纹）"""
+        return {
+            "lang": self.lang,
+            "backend": self.backend,
+            "method": self.method,
+            "formula_enable": self.formula_enable,
+            "table_enable": self.table_enable,
+            "output_profile": self.output_profile,
+            "serialization": self.serialization
+        }
 
 
 @dataclass
@@ -37,17 +82,184 @@ class FileResult:
     duration: float
     error_message: Optional[str] = None
     output_path: Optional[Path] = None
+    cache_hit: bool = False
+    extra_paths: List[Path] = field(default_factory=list)  # markdown之外属于该文档的产物
+
+
+def task_layout(task: FileTask) -> OutputLayout:
+    """任务对应的输出布局（按输入目录结构镜像到输出目录）"""
+    return OutputLayout(task.input_dir, task.output_dir)
+
+
+def task_output_path(task: FileTask) -> Path:
+    """计算任务对应的markdown输出路径"""
+    return task_layout(task).markdown_path(task.file_path)
+
+
+def find_markdown_output(
+    output_dir: Path,
+    file_stem: str,
+    method: str = "auto",
+    include_pypdf: bool = True
+) -> Optional[Path]:
+    """查找parse_doc生成的markdown文件
+    
+    mineru按 {output_dir}/{stem}/{method}/{stem}.md 组织输出（vlm后端的method为vlm），
+    pypdf备选方案则直接写到 {output_dir}/{stem}.md（include_pypdf为False时不查找）
+    """
+    candidates = [
+        output_dir / file_stem / method / f"{file_stem}.md",
+        output_dir / file_stem / "vlm" / f"{file_stem}.md",
+    ]
+    if include_pypdf:
+        candidates.append(output_dir / f"{file_stem}.md")
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def open_task_cache(task: FileTask) -> Optional[ConversionCache]:
+    """打开任务对应的结果缓存，未启用时返回None"""
+    if task.cache_dir is None:
+        return None
+    try:
+        cache = get_conversion_cache(task.cache_dir, task.cache_max_size_mb)
+        if task.cache_key is None:
+            task.cache_key = cache.make_key(task.file_path, task.conversion_options())
+        return cache
+    except Exception as e:
+        print(f"警告：结果缓存不可用: {e}")
+        return None
+
+
+def cached_output_dir(output_dir: Path, task: FileTask) -> Path:
+    """缓存恢复的目标目录，与mineru的输出结构一致"""
+    method_dir = task.method if task.backend == "pipeline" else "vlm"
+    return output_dir / task.file_path.stem / method_dir
+
+
+def convert_file_task(task: FileTask) -> FileResult:
+    """处理单个PDF文件（模块级函数，可被进程池pickle调用）
+    
+    mineru写入目标目录旁的暂存目录，完成后由输出布局管理器原子发布markdown和图片。
+    """
+    start_time = time.time()
+    layout = task_layout(task)
+    staging_dir = None
+    
+    try:
+        staging_dir = layout.create_staging_dir(task.file_path)
+        
+        # 命中结果缓存时直接恢复输出，否则调用mineru进行转换
+        cache = open_task_cache(task)
+        cache_hit = cache is not None and cache.restore(
+            task.cache_key, cached_output_dir(staging_dir, task)
+        )
+        if not cache_hit:
+            parse_doc(
+                path_list=[task.file_path],
+                output_dir=str(staging_dir),
+                lang=task.lang,
+                backend=task.backend,
+                method=task.method,
+                formula_enable=task.formula_enable,
+                table_enable=task.table_enable,
+                output_profile=task.output_profile,
+                window_pages=task.window_pages,
+                serialization=task.serialization
+            )
+        
+        # 查找生成的markdown文件
+        md_file = find_markdown_output(staging_dir, task.file_path.stem, task.method)
+        if md_file is None:
+            raise Exception(f"mineru未生成markdown文件: {staging_dir}")
+        
+        # 只缓存mineru的完整输出，pypdf备选方案的结果不缓存
+        if cache is not None and not cache_hit and md_file.parent != staging_dir:
+            cache.store(task.cache_key, md_file.parent)
+        
+        extra_paths = layout.publish(task.file_path, md_file)
+        
+        duration = time.time() - start_time
+        return FileResult(
+            task_id=task.task_id,
+            file_path=task.file_path,
+            success=True,
+            duration=duration,
+            output_path=layout.markdown_path(task.file_path),
+            cache_hit=cache_hit,
+            extra_paths=extra_paths
+        )
+            
+    except Exception as e:
+        duration = time.time() - start_time
+        return FileResult(
+            task_id=task.task_id,
+            file_path=task.file_path,
+            success=False,
+            duration=duration,
+            error_message=str(e)
+        )
+    finally:
+        if staging_dir is not None:
+            layout.discard(staging_dir)
 
 
 class BatchProcessor:
     """批量处理器"""
     
-    def __init__(self, max_workers: int = 4, use_processes: bool = False):
+    def __init__(
+        self,
+        max_workers: int = 4,
+        use_processes: bool = False,
+        worker_pool: Optional[ModelWorkerPool] = None,
+        batch_pages: int = 0,
+        cache_dir: Optional[Path] = None,
+        cache_max_size_mb: int = 10240,
+        incremental: bool = False,
+        shard_threshold_pages: int = 0,
+        shard_pages: int = 100,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        estimator: Optional[LearnedTimeEstimator] = None,
+        longest_first: bool = True,
+        schedule_window: int = 0,
+        triage: bool = False,
+        window_pages: int = 0,
+        serialization: str = DEFAULT_SERIALIZATION
+    ):
         self.max_workers = max_workers
         self.use_processes = use_processes
+        self.worker_pool = worker_pool
+        self.batch_pages = batch_pages  # 每个推理批次的目标页数，0表示逐文件推理
+        self.cache_dir = cache_dir  # 转换结果缓存目录，None表示不使用缓存
+        self.cache_max_size_mb = cache_max_size_mb
+        self.incremental = incremental  # 增量模式：根据输出目录中的清单跳过未变化的文件
+        self.shard_threshold_pages = shard_threshold_pages  # 超过该页数的文件拆分为分片并行转换，0表示不分片
+        self.shard_pages = shard_pages
+        self.output_profile = output_profile
+        self.estimator = estimator  # 学习型时间预估器，转换过程中用实际耗时在线更新
+        self.longest_first = longest_first  # 按预估耗时从长到短提交任务
+        # 最长任务优先调度的预读窗口（文件数），0表示按工作进程数自动确定
+        self.schedule_window = schedule_window_for(schedule_window, self.max_workers)
+        self.predicted_durations: List[float] = []
+        self.triage = triage  # 转换前预分类，文字型PDF走txt方法，只有扫描型走OCR
+        self.window_pages = window_pages  # 超过该页数的文档分窗口流式转换，峰值内存取决于窗口而不是文档页数
+        self.serialization = serialization
+        self.manifest: Optional[ConversionManifest] = None
+        self._shard_results: Dict[int, Dict[int, Any]] = {}
+        self.options_fingerprint = ""
         self.progress_lock = threading.Lock()
+        self.discovery: Optional[FileDiscovery] = None
+        self.input_dir: Optional[Path] = None
+        self._shard_jobs: Dict[int, List[ShardJob]] = {}
+        self.start_time = 0.0
         self.completed_count = 0
-        self.total_count = 0
+        self.successful_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+        self.completed_bytes = 0
+        self.skipped_bytes = 0
         
     def process_directory(
         self,
@@ -56,80 +268,369 @@ class BatchProcessor:
         use_gpu: bool = False,
         logger: Optional[ConversionLogger] = None
     ) -> Tuple[int, int, float]:
-        """处理整个目录的PDF文件"""
-        
-        # 查找所有PDF文件
-        pdf_files = self._find_pdf_files(input_dir)
+        """处理整个目录的PDF文件
         
-        if not pdf_files:
-            print("警告：在指定目录中未找到PDF文件")
+        后台线程边遍历目录边把文件放入有界队列，找到第一个文件就开始转换；
+        总文件数和剩余时间预估随遍历推进不断更新。
+        """
+        if not input_dir.exists():
+            print(f"错误：输入目录 '{input_dir}' 不存在")
             return 0, 0, 0.0
         
-        print(f"找到 {len(pdf_files)} 个PDF文件")
-        
         # 创建输出目录
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 创建任务列表
-        tasks = []
-        for i, pdf_file in enumerate(pdf_files):
-            task = FileTask(
-                file_path=pdf_file,
-                output_dir=output_dir,
-                task_id=i + 1,
-                total_files=len(pdf_files),
-                use_gpu=use_gpu
-            )
-            tasks.append(task)
+        self.discovery = FileDiscovery(input_dir)
+        self.input_dir = input_dir
+        self.skipped_count = 0
+        self.completed_count = 0
+        self.successful_count = 0
+        self.failed_count = 0
+        self.completed_bytes = 0
+        self.predicted_durations = []
+        self._shard_results = {}
+        self._shard_jobs = {}
         
-        # 选择执行器类型 - 默认使用线程池避免pickle问题
-        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        # 增量模式：根据清单跳过未变化的文件，遍历结束后清理源文件已删除的输出
+        self.manifest = None
+        if self.incremental:
+            self.manifest = ConversionManifest(output_dir, input_dir)
+            options = self._make_task(input_dir, output_dir, 0, use_gpu).conversion_options()
+            options["triage"] = self.triage
+            self.options_fingerprint = options_fingerprint(options)
         
-        start_time = time.time()
-        successful = 0
-        failed = 0
+        discovered_files: List[Path] = []
+        self.start_time = time.time()
+        start_time = self.start_time
         
         try:
-            with executor_class(max_workers=self.max_workers) as executor:
-                # 提交所有任务
-                future_to_task = {
-                    executor.submit(self._process_single_file, task): task 
-                    for task in tasks
-                }
-                
-                # 处理完成的任务
-                for future in as_completed(future_to_task):
-                    task = future_to_task[future]
-                    try:
-                        result = future.result()
-                        
-                        with self.progress_lock:
-                            self.completed_count += 1
-                            if result.success:
-                                successful += 1
-                                print(f"✓ 成功转换 ({self.completed_count}/{self.total_count}): {task.file_path.name}")
-                            else:
-                                failed += 1
-                                print(f"✗ 转换失败 ({self.completed_count}/{self.total_count}): {task.file_path.name}")
-                                if result.error_message:
-                                    print(f"  错误: {result.error_message}")
-                        
-                        # 记录日志
-                        if logger:
-                            self._log_conversion(logger, task, result)
-                            
-                    except Exception as e:
-                        failed += 1
-                        print(f"✗ 任务异常 ({self.completed_count}/{self.total_count}): {task.file_path.name}")
-                        print(f"  异常: {str(e)}")
+            tasks = self._iter_tasks(self.discovery, output_dir, use_gpu, discovered_files)
+            if self.longest_first:
+                # 大文件先提交，避免排在最后的大文件让单个工作进程拖长整批耗时
+                tasks = iter_longest_first(tasks, self._task_priority, self.schedule_window)
+            work_items = self._iter_work_items(tasks)
+            
+            if self.worker_pool is not None:
+                # 交给常驻模型进程池，复用已加载的模型
+                pool = self.worker_pool
+                self._run_work_items(work_items, lambda item: pool.submit(self._job_for(item), item), logger)
+            else:
+                # 进程池只能提交模块级函数，线程池沿用实例方法
+                local = not self.use_processes
+                with self._create_executor(use_gpu) as executor:
+                    self._run_work_items(
+                        work_items,
+                        lambda item: executor.submit(self._job_for(item, local=local), item),
+                        logger
+                    )
+            
+            if self.manifest is not None:
+                if self.discovery.complete:
+                    removed = self.manifest.remove_orphans(discovered_files)
+                    if removed:
+                        print(f"增量模式: 已清理 {len(removed)} 个源文件已删除的输出")
+                else:
+                    # 有目录读取失败时发现的文件不完整，不能把未发现的文件当作已删除
+                    print(f"增量模式: {len(self.discovery.errors)} 个目录或条目无法读取，本次不清理已删除文件的输出")
+                print(f"增量模式: 跳过 {self.skipped_count} 个未变化的文件, 转换 {self.total_count} 个")
+            
+            if self.discovery.discovered_count == 0:
+                print("警告：在指定目录中未找到PDF文件")
+            else:
+                print(f"共找到 {self.discovery.discovered_count} 个PDF文件")
         
         except KeyboardInterrupt:
             print("\n用户中断处理")
-            return successful, failed, time.time() - start_time
+            return self.successful_count, self.failed_count, time.time() - start_time
+        finally:
+            self.discovery.stop()
+            if self.manifest is not None:
+                self.manifest.compact()
         
         total_duration = time.time() - start_time
+        self._print_makespan(total_duration)
         
-        return successful, failed, total_duration
+        return self.successful_count, self.failed_count, total_duration
+    
+    @property
+    def total_count(self) -> int:
+        """目前已知需要转换的文件数（遍历未结束时仍会增长）"""
+        if self.discovery is None:
+            return 0
+        return self.discovery.discovered_count - self.skipped_count
+    
+    def _progress_label(self) -> str:
+        """进度文字，遍历未结束时总数后加“+”"""
+        suffix = "" if self.discovery is None or self.discovery.finished else "+"
+        return f"{self.completed_count}/{self.total_count}{suffix}"
+    
+    def _estimate_remaining(self) -> Optional[float]:
+        """按已完成文件的吞吐量（字节/秒）预估剩余时间"""
+        if self.discovery is None or self.completed_bytes <= 0:
+            return None
+        elapsed = time.time() - self.start_time
+        remaining_bytes = self.discovery.discovered_bytes - self.skipped_bytes - self.completed_bytes
+        return max(0.0, remaining_bytes * elapsed / self.completed_bytes)
+    
+    def _make_task(self, file_path: Path, output_dir: Path, task_id: int, use_gpu: bool, file_size: int = 0) -> FileTask:
+        """创建文件任务（使用常驻模型进程池时沿用进程池预加载模型的参数）"""
+        task = FileTask(
+            file_path=file_path,
+            output_dir=output_dir,
+            task_id=task_id,
+            total_files=self.total_count,
+            use_gpu=use_gpu,
+            cache_dir=self.cache_dir,
+            cache_max_size_mb=self.cache_max_size_mb,
+            file_size=file_size,
+            output_profile=self.output_profile,
+            input_dir=self.input_dir,
+            window_pages=self.window_pages,
+            serialization=self.serialization
+        )
+        pool = self.worker_pool
+        if pool is not None:
+            task.lang = pool.lang
+            task.formula_enable = pool.formula_enable
+            task.table_enable = pool.table_enable
+        triage = None
+        if self.triage and task_id > 0 and task.method == "auto":
+            # 只在未指定解析方法时按预分类结果选择
+            triage = triage_pdf(file_path)
+            if triage is not None:
+                task.doc_kind = triage.kind
+                task.method = triage.method
+        if self.estimator is not None and task_id > 0:
+            features = extract_pdf_features(file_path, file_size, triage)
+            task.features = features.to_dict()
+            task.predicted_time = self.estimator.predict(features, task.backend, task.method)
+            self.predicted_durations.append(task.predicted_time)
+        return task
+    
+    def _task_priority(self, task: FileTask) -> float:
+        """调度优先级：有时间预估时按预估耗时，否则按文件大小"""
+        if self.estimator is not None:
+            return task.predicted_time
+        return float(task.file_size)
+    
+    def _print_makespan(self, total_duration: float) -> None:
+        """输出实际总耗时及按当前并发数预估的总耗时，用于判断调度效果"""
+        if not self.predicted_durations:
+            return
+        predicted = estimate_makespan(self.predicted_durations, self.max_workers)
+        print(f"总耗时: 实际 {format_duration(total_duration)}, 预估 {format_duration(predicted)}")
+    
+    def _iter_tasks(
+        self,
+        files: Iterable[Tuple[Path, int]],
+        output_dir: Path,
+        use_gpu: bool,
+        discovered_files: List[Path]
+    ) -> Iterator[FileTask]:
+        """把发现的文件逐个转换为任务，增量模式下跳过未变化的文件"""
+        self.skipped_bytes = 0
+        task_id = 0
+        for file_path, file_size in files:
+            if self.manifest is not None:
+                # 清理已删除源文件的输出需要完整的文件列表，只在增量模式下保留
+                discovered_files.append(file_path)
+                if not self.manifest.needs_conversion(file_path, self.options_fingerprint):
+                    self.skipped_count += 1
+                    self.skipped_bytes += file_size
+                    continue
+            task_id += 1
+            yield self._make_task(file_path, output_dir, task_id, use_gpu, file_size)
+    
+    def _iter_work_items(self, tasks: Iterable[FileTask]) -> Iterator[Any]:
+        """组织工作单元：大文档拆分为页码分片，开启跨文档批量推理时按目标页数分组"""
+        def unsharded() -> Iterator[FileTask]:
+            for task in tasks:
+                jobs = self._shard_task(task)
+                if jobs:
+                    # 分片先于其他工作单元提交
+                    self._pending_shards.extend(jobs)
+                    continue
+                yield task
+        
+        self._pending_shards: List[ShardJob] = []
+        if self.batch_pages > 0:
+            items = iter_inference_batches(unsharded(), target_pages=self.batch_pages)
+        else:
+            items = unsharded()
+        
+        for item in items:
+            while self._pending_shards:
+                yield self._pending_shards.pop(0)
+            yield item
+        while self._pending_shards:
+            yield self._pending_shards.pop(0)
+    
+    def _run_work_items(
+        self,
+        work_items: Iterable[Any],
+        submit: Callable[[Any], Future],
+        logger: Optional[ConversionLogger] = None
+    ) -> None:
+        """边产生边提交工作单元，同时在途的工作单元不超过工作进程数的两倍
+
+        处理结果时产生的后续工作单元（分片收尾）同样提交到执行器，协调线程只负责调度和记录进度。
+        """
+        max_in_flight = max(2, self.max_workers * 2)
+        in_flight: Dict[Future, Any] = {}
+        
+        def handle_done() -> None:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                follow_up = self._handle_future(future, in_flight.pop(future), logger)
+                if follow_up is not None:
+                    in_flight[submit(follow_up)] = follow_up
+        
+        for item in work_items:
+            in_flight[submit(item)] = item
+            if len(in_flight) >= max_in_flight:
+                handle_done()
+        
+        while in_flight:
+            handle_done()
+    
+    def _create_executor(self, use_gpu: bool) -> Any:
+        """创建执行器：进程池摆脱GIL限制，适合CPU模式；线程池适合GPU模式"""
+        if self.use_processes:
+            return create_process_executor(self.max_workers, use_gpu)
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+    
+    def _shard_task(self, task: FileTask) -> List[ShardJob]:
+        """拆分超过页数阈值的文件，不需要分片时返回空列表"""
+        if self.shard_threshold_pages <= 0:
+            return []
+        
+        # 先读页数（只解析交叉引用表）：缓存键需要计算整个文件的哈希，只对超过阈值的文件在协调线程上计算，
+        # 其余文件照常在工作进程中并行查询缓存
+        page_count = exact_page_count(task.file_path)
+        if page_count is None or page_count <= self.shard_threshold_pages:
+            return []
+        
+        # 已缓存的文件直接恢复，无需分片
+        cache = open_task_cache(task)
+        if cache is not None and cache.contains(task.cache_key):
+            return []
+        
+        jobs = plan_shards(task, page_count, self.shard_pages)
+        self._shard_results[task.task_id] = {}
+        self._shard_jobs[task.task_id] = jobs
+        print(f"分片转换: {task.file_path.name} ({page_count} 页, {len(jobs)} 个分片)")
+        return jobs
+    
+    def _job_for(self, item: Any, local: bool = False) -> Any:
+        """返回处理工作单元的函数"""
+        if isinstance(item, InferenceBatch):
+            return convert_batch
+        if isinstance(item, ShardJob):
+            return convert_shard
+        if isinstance(item, ShardFinish):
+            return finish_shards
+        return self._process_single_file if local else convert_file_task
+    
+    def _handle_future(
+        self,
+        future: Future,
+        item: Any,
+        logger: Optional[ConversionLogger] = None
+    ) -> Optional[ShardFinish]:
+        """处理一个已完成的工作单元并更新进度，返回需要继续提交的后续工作单元"""
+        if isinstance(item, ShardJob):
+            return self._collect_shard(item, future, logger)
+        
+        if isinstance(item, InferenceBatch):
+            tasks = item.tasks
+        elif isinstance(item, ShardFinish):
+            tasks = [item.task]
+        else:
+            tasks = [item]
+        
+        try:
+            results = future.result()
+            if not isinstance(results, list):
+                results = [results]
+            
+            for task, result in zip(tasks, results):
+                self._record_result(task, result, logger)
+                
+        except Exception as e:
+            for task in tasks:
+                self._record_result(
+                    task,
+                    FileResult(task_id=task.task_id, file_path=task.file_path, success=False,
+                               duration=0.0, error_message=f"任务异常: {e}"),
+                    logger
+                )
+        return None
+    
+    def _collect_shard(
+        self,
+        job: ShardJob,
+        future: Future,
+        logger: Optional[ConversionLogger] = None
+    ) -> Optional[ShardFinish]:
+        """记录分片结果，文件的所有分片完成后返回收尾工作单元（拼接或整体重新转换在执行器中进行）"""
+        try:
+            result = future.result()
+        except Exception as e:
+            result = ShardResult(shard_index=job.shard_index, success=False, duration=0.0, error_message=str(e))
+        
+        task_id = job.task.task_id
+        done = self._shard_results[task_id]
+        done[job.shard_index] = result
+        if len(done) < job.shard_count:
+            return None
+        
+        results = [done[i] for i in range(job.shard_count)]
+        del self._shard_results[task_id]
+        return ShardFinish(task=job.task, jobs=self._shard_jobs.pop(task_id), results=results)
+    
+    def _record_result(
+        self,
+        task: FileTask,
+        result: FileResult,
+        logger: Optional[ConversionLogger] = None
+    ) -> None:
+        """更新单个文件的进度并记录日志"""
+        with self.progress_lock:
+            self.completed_count += 1
+            self.completed_bytes += task.file_size
+            if result.success:
+                self.successful_count += 1
+                source = " [缓存]" if result.cache_hit else ""
+                if task.doc_kind:
+                    source += f" [{KIND_LABELS[task.doc_kind]}]"
+                print(f"✓ 成功转换 ({self._progress_label()}): {task.file_path.name}{source}")
+            else:
+                self.failed_count += 1
+                print(f"✗ 转换失败 ({self._progress_label()}): {task.file_path.name}")
+                if result.error_message:
+                    print(f"  错误: {result.error_message}")
+            
+            remaining = self._estimate_remaining()
+            if remaining is not None and self.completed_count < self.total_count:
+                print(f"  预计剩余: {format_duration(remaining)}")
+        
+        # 用实际耗时在线更新时间预估模型（缓存命中的耗时不代表转换成本）
+        if self.estimator is not None and result.success and not result.cache_hit and task.features:
+            self.estimator.observe(PdfFeatures(**task.features), result.duration, task.backend, task.method)
+        
+        # 记录日志
+        if logger:
+            self._log_conversion(logger, task, result)
+        
+        # 更新转换清单
+        if self.manifest is not None and result.success and result.output_path:
+            try:
+                self.manifest.record(
+                    task.file_path, result.output_path, self.options_fingerprint,
+                    extra_paths=result.extra_paths
+                )
+            except Exception as e:
+                print(f"更新转换清单失败: {e}")
     
     def _find_pdf_files(self, input_dir: Path) -> List[Path]:
         """递归查找PDF文件"""
@@ -138,65 +639,14 @@ class BatchProcessor:
             print(f"错误：输入目录 '{input_dir}' 不存在")
             return pdf_files
         
-        for file_path in input_dir.rglob("*.pdf"):
-            if file_path.is_file():
-                pdf_files.append(file_path)
+        for file_path, _ in iter_pdf_files(input_dir):
+            pdf_files.append(file_path)
         
         return pdf_files
     
     def _process_single_file(self, task: FileTask) -> FileResult:
         """处理单个PDF文件（工作进程/线程函数）"""
-        start_time = time.time()
-        
-        try:
-            # 创建输出目录结构
-            relative_path = task.file_path.relative_to(task.file_path.parents[len(task.file_path.parts) - len(task.output_dir.parts) - 1])
-            output_path = task.output_dir / relative_path.with_suffix('.md')
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 创建临时输出目录
-            temp_output_dir = output_path.parent / f"{task.file_path.stem}_temp"
-            temp_output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 调用mineru进行转换
-            parse_doc(
-                path_list=[task.file_path],
-                output_dir=str(temp_output_dir),
-                lang="ch",
-                backend="pipeline",
-                method="auto"
-            )
-            
-            # 查找生成的markdown文件
-            md_file = temp_output_dir / f"{task.file_path.stem}.md"
-            if md_file.exists():
-                # 移动文件到目标位置
-                import shutil
-                shutil.move(str(md_file), str(output_path))
-                
-                # 清理临时目录
-                shutil.rmtree(temp_output_dir)
-                
-                duration = time.time() - start_time
-                return FileResult(
-                    task_id=task.task_id,
-                    file_path=task.file_path,
-                    success=True,
-                    duration=duration,
-                    output_path=output_path
-                )
-            else:
-                raise Exception(f"mineru未生成markdown文件: {md_file}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return FileResult(
-                task_id=task.task_id,
-                file_path=task.file_path,
-                success=False,
-                duration=duration,
-                error_message=str(e)
-            )
+        return convert_file_task(task)
     
     def _log_conversion(
         self, 
@@ -204,9 +654,14 @@ class BatchProcessor:
         task: FileTask, 
         result: FileResult
     ) -> None:
-        """记录转换日志"""
+        """记录转换日志（附带后端、方法和PDF特征，供时间预估模型学习）"""
         try:
             file_size = task.file_path.stat().st_size
+            details = dict(task.features or {})
+            details.pop("size_mb", None)
+            details.update(backend=task.backend, method=task.method, cache_hit=result.cache_hit)
+            if task.doc_kind:
+                details["doc_kind"] = task.doc_kind
             
             if result.success:
                 logger.log_conversion(
@@ -215,7 +670,8 @@ class BatchProcessor:
                     duration=result.duration,
                     success=True,
                     output_path=str(result.output_path) if result.output_path else None,
-                    use_gpu=task.use_gpu
+                    use_gpu=task.use_gpu,
+                    **details
                 )
             else:
                 logger.log_conversion(
@@ -224,7 +680,8 @@ class BatchProcessor:
                     duration=result.duration,
                     success=False,
                     error_message=result.error_message,
-                    use_gpu=task.use_gpu
+                    use_gpu=task.use_gpu,
+                    **details
                 )
         except Exception as e:
             print(f"记录日志失败: {e}")
@@ -232,8 +689,22 @@ class BatchProcessor:
 
 def create_batch_processor(
     workers: int = 4,
-    use_processes: bool = False,  # 默认使用线程池
-    gpu_available: bool = False
+    use_processes: bool = False,  # CPU模式下可使用进程池
+    gpu_available: bool = False,
+    worker_pool: Optional[ModelWorkerPool] = None,
+    batch_pages: int = 0,
+    cache_dir: Optional[Path] = None,
+    cache_max_size_mb: int = 10240,
+    incremental: bool = False,
+    shard_threshold_pages: int = 0,
+    shard_pages: int = 100,
+    output_profile: str = DEFAULT_OUTPUT_PROFILE,
+    estimator: Optional[LearnedTimeEstimator] = None,
+    longest_first: bool = True,
+    schedule_window: int = 0,
+    triage: bool = False,
+    window_pages: int = 0,
+    serialization: str = DEFAULT_SERIALIZATION
 ) -> BatchProcessor:
     """创建批量处理器"""
     
@@ -243,13 +714,26 @@ def create_batch_processor(
         use_processes = False
         workers = min(workers, 4)  # GPU模式下限制并发数
     else:
-        # CPU模式下默认使用线程池，避免pickle问题
-        use_processes = False
+        # CPU模式下按调用方选择执行器，进程池的任务和结果均可pickle
         workers = min(workers, os.cpu_count() or 4)
     
     return BatchProcessor(
         max_workers=workers,
-        use_processes=use_processes
+        use_processes=use_processes,
+        worker_pool=worker_pool,
+        batch_pages=batch_pages,
+        cache_dir=cache_dir,
+        cache_max_size_mb=cache_max_size_mb,
+        incremental=incremental,
+        shard_threshold_pages=shard_threshold_pages,
+        shard_pages=shard_pages,
+        output_profile=output_profile,
+        estimator=estimator,
+        longest_first=longest_first,
+        schedule_window=schedule_window,
+        triage=triage,
+        window_pages=window_pages,
+        serialization=serialization
     )
 
 
@@ -282,19 +766,93 @@ def process_pdfs_batch(
     output_dir: Path,
     use_gpu: bool = False,
     workers: int = 1,
-    logger: Optional[ConversionLogger] = None
+    logger: Optional[ConversionLogger] = None,
+    use_worker_pool: bool = False,
+    lang: str = "ch",
+    formula_enable: bool = True,
+    table_enable: bool = True,
+    batch_pages: int = 0,
+    cache_dir: Optional[Path] = None,
+    cache_max_size_mb: int = 10240,
+    incremental: bool = False,
+    shard_threshold_pages: int = 0,
+    shard_pages: int = 100,
+    use_processes: bool = False,
+    output_profile: str = DEFAULT_OUTPUT_PROFILE,
+    estimator: Optional[LearnedTimeEstimator] = None,
+    longest_first: bool = True,
+    schedule_window: int = 0,
+    triage: bool = False,
+    window_pages: int = 0,
+    serialization: str = DEFAULT_SERIALIZATION
 ) -> Tuple[int, int, float]:
     """批量处理PDF文件（主函数）"""
     
+    if cache_dir is not None:
+        print(f"结果缓存目录: {cache_dir}")
+    
     # 创建处理器
     gpu_available = check_gpu_availability() if use_gpu else False
-    processor = create_batch_processor(workers, gpu_available=gpu_available)
+    
+    if use_worker_pool:
+        # 常驻模型进程池：每个工作进程只加载一次模型
+        pool_workers = min(workers, 4) if gpu_available else min(workers, os.cpu_count() or 4)
+        print(f"使用常驻模型进程池 (工作进程数: {pool_workers})")
+        with ModelWorkerPool(
+            max_workers=pool_workers,
+            lang=lang,
+            formula_enable=formula_enable,
+            table_enable=table_enable,
+            use_gpu=gpu_available
+        ) as pool:
+            processor = create_batch_processor(
+                workers,
+                gpu_available=gpu_available,
+                worker_pool=pool,
+                batch_pages=batch_pages,
+                cache_dir=cache_dir,
+                cache_max_size_mb=cache_max_size_mb,
+                incremental=incremental,
+                shard_threshold_pages=shard_threshold_pages,
+                shard_pages=shard_pages,
+                output_profile=output_profile,
+                estimator=estimator,
+                longest_first=longest_first,
+                schedule_window=schedule_window,
+                triage=triage,
+                window_pages=window_pages,
+                serialization=serialization
+            )
+            result = processor.process_directory(input_dir, output_dir, use_gpu, logger)
+            pool.print_statistics()
+        return result
+    
+    processor = create_batch_processor(
+        workers,
+        use_processes=use_processes,
+        gpu_available=gpu_available,
+        batch_pages=batch_pages,
+        cache_dir=cache_dir,
+        cache_max_size_mb=cache_max_size_mb,
+        incremental=incremental,
+        shard_threshold_pages=shard_threshold_pages,
+        shard_pages=shard_pages,
+        output_profile=output_profile,
+        estimator=estimator,
+        longest_first=longest_first,
+        schedule_window=schedule_window,
+        triage=triage,
+        window_pages=window_pages,
+        serialization=serialization
+    )
     
     print(f"使用批量处理 (工作进程数: {workers})")
     if gpu_available:
         print("检测到GPU可用，使用线程池避免GPU资源冲突")
+    elif processor.use_processes:
+        print("使用进程池并行转换")
     else:
-        print("使用线程池避免pickle序列化问题")
+        print("使用线程池并行转换")
     
     # 处理文件
-    return processor.process_directory(input_dir, output_dir, use_gpu, logger) 
\ No newline at end of file
+    return processor.process_directory(input_dir, output_dir, use_gpu, logger)
@@ -0,0 +1,178 @@
+"""
+跨文档批量推理模块
+把排队的PDF按目标页数分组，每组只调用一次do_parse，再把结果拆回各个文件
+"""
+
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List
+
+
+# 无法读取页数时按文件大小估算（每页约100KB）
+_ESTIMATED_BYTES_PER_PAGE = 100 * 1024
+
+
+@dataclass
+class InferenceBatch:
+    """推理批次数据类"""
+    batch_id: int
+    tasks: List[Any] = field(default_factory=list)
+    page_counts: List[int] = field(default_factory=list)
+    page_count: int = 0
+
+
+def count_pdf_pages(file_path: Path) -> int:
+    """获取PDF页数，失败时按文件大小估算"""
+    try:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(str(file_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        try:
+            return max(1, file_path.stat().st_size // _ESTIMATED_BYTES_PER_PAGE)
+        except Exception:
+            return 1
+
+
+def _options_key(task: Any) -> tuple:
+    """一次parse_doc调用内所有文档必须共用的转换参数"""
+    return (
+        task.lang, task.backend, task.method, task.formula_enable, task.table_enable,
+        task.output_profile, task.serialization
+    )
+
+
+def iter_inference_batches(
+    tasks: Iterable[Any],
+    target_pages: int = 200,
+    max_files: int = 64
+) -> Iterator[InferenceBatch]:
+    """按目标页数把任务分组为推理批次，每凑满一个批次就立即产出
+
+    任务按原顺序装入当前批次，页数达到target_pages或文件数达到max_files时开始新批次；
+    单个超过目标页数的文件单独成批。同一批次内不放文件名（stem）相同的文件，
+    因为mineru按文件名组织输出目录；转换参数不同的任务也不会分到同一批次。
+    """
+    batch_id = 1
+    current = InferenceBatch(batch_id=batch_id)
+    stems = set()
+
+    for task in tasks:
+        pages = count_pdf_pages(task.file_path)
+        stem = task.file_path.stem
+
+        if current.tasks and (
+            current.page_count + pages > target_pages
+            or len(current.tasks) >= max_files
+            or stem in stems
+            or _options_key(task) != _options_key(current.tasks[0])
+        ):
+            yield current
+            batch_id += 1
+            current = InferenceBatch(batch_id=batch_id)
+            stems = set()
+
+        current.tasks.append(task)
+        current.page_counts.append(pages)
+        current.page_count += pages
+        stems.add(stem)
+
+    if current.tasks:
+        yield current
+
+
+def plan_inference_batches(
+    tasks: List[Any],
+    target_pages: int = 200,
+    max_files: int = 64
+) -> List[InferenceBatch]:
+    """按目标页数把任务分组为推理批次（规则见iter_inference_batches）"""
+    return list(iter_inference_batches(tasks, target_pages=target_pages, max_files=max_files))
+
+
+def convert_batch(batch: InferenceBatch) -> list:
+    """转换一个推理批次（模块级函数，可被进程池pickle调用）
+
+    命中结果缓存的文件直接恢复，其余文件只调用一次parse_doc，模型对这些文档的页面一起做批量推理；
+    批次调用不使用pypdf备选方案：mineru失败时整批文件逐个按单文件流程重试（其中包含备选方案），
+    批次中没有产出mineru markdown的文件也单独重试一次。返回的结果顺序与batch.tasks一致。
+    """
+    from .batch_processor import (
+        FileResult, convert_file_task, find_markdown_output, open_task_cache, task_layout
+    )
+    from .mineru_wrapper import parse_doc
+
+    results = {}
+    pending = []
+    for task, pages in zip(batch.tasks, batch.page_counts):
+        cache = open_task_cache(task)
+        if cache is not None and cache.contains(task.cache_key):
+            results[task.task_id] = convert_file_task(task)
+        else:
+            pending.append((task, pages))
+
+    if not pending:
+        return [results[task.task_id] for task in batch.tasks]
+
+    start_time = time.time()
+    first = pending[0][0]
+    pending_pages = sum(pages for _, pages in pending)
+    staging_dir = first.output_dir / f".batch_{batch.batch_id}_{first.task_id}"
+    staging_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        try:
+            parse_doc(
+                path_list=[task.file_path for task, _ in pending],
+                output_dir=str(staging_dir),
+                lang=first.lang,
+                backend=first.backend,
+                method=first.method,
+                formula_enable=first.formula_enable,
+                table_enable=first.table_enable,
+                output_profile=first.output_profile,
+                window_pages=first.window_pages,
+                serialization=first.serialization,
+                pypdf_fallback=False
+            )
+        except Exception as e:
+            # 一个文件失败会让整批失败，不能让其余文件一起退回pypdf，逐个重试
+            print(f"  批次 {batch.batch_id} 转换失败，逐个文件重试: {e}")
+            for task, _ in pending:
+                results[task.task_id] = convert_file_task(task)
+            return [results[task.task_id] for task in batch.tasks]
+        batch_duration = time.time() - start_time
+
+        for task, pages in pending:
+            md_file = find_markdown_output(staging_dir, task.file_path.stem, task.method, include_pypdf=False)
+            if md_file is None:
+                # 批次中没有mineru输出的文件单独重试
+                results[task.task_id] = convert_file_task(task)
+                continue
+
+            cache = open_task_cache(task)
+            if cache is not None:
+                cache.store(task.cache_key, md_file.parent)
+
+            layout = task_layout(task)
+            extra_paths = layout.publish(task.file_path, md_file)
+
+            # 按页数分摊批次耗时，便于日志和时间预估使用
+            share = pages / pending_pages if pending_pages else 1 / len(pending)
+            results[task.task_id] = FileResult(
+                task_id=task.task_id,
+                file_path=task.file_path,
+                success=True,
+                duration=batch_duration * share,
+                output_path=layout.markdown_path(task.file_path),
+                extra_paths=extra_paths
+            )
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    return [results[task.task_id] for task in batch.tasks]
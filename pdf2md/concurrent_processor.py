@@ -7,7 +7,7 @@ import os
 import time
 import signal
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 import threading
@@ -15,6 +15,9 @@ from queue import Queue
 
 from .logger import ConversionLogger
 from .mineru_wrapper import parse_doc
+from .batch_processor import FileResult, FileTask, find_markdown_output
+from .batching import convert_batch, iter_inference_batches
+from .output_layout import OutputLayout
 
 
 @dataclass
@@ -25,6 +28,7 @@ class ConversionTask:
     use_gpu: bool
     task_id: int
     total_tasks: int
+    input_dir: Optional[Path] = None  # 输入根目录，输出按其下的相对路径镜像
 
 
 @dataclass
@@ -41,9 +45,10 @@ class ConversionResult:
 class ConcurrentProcessor:
     """并发处理器"""
     
-    def __init__(self, max_workers: int = 4, use_processes: bool = True):
+    def __init__(self, max_workers: int = 4, use_processes: bool = True, batch_pages: int = 0):
         self.max_workers = max_workers
         self.use_processes = use_processes
+        self.batch_pages = batch_pages  # 跨文档批量推理的目标页数，0表示逐文件调用parse_doc
         self.results_queue = Queue()
         self.progress_lock = threading.Lock()
         self.completed_count = 0
@@ -64,7 +69,8 @@ class ConcurrentProcessor:
         self.total_count = len(pdf_files)
         self.completed_count = 0
         
-        # 创建任务列表
+        # 创建任务列表（以所有文件的公共父目录作为输入根目录）
+        input_dir = OutputLayout.for_files(pdf_files, output_dir).input_dir
         tasks = []
         for i, pdf_file in enumerate(pdf_files):
             task = ConversionTask(
@@ -72,7 +78,8 @@ class ConcurrentProcessor:
                 output_dir=output_dir,
                 use_gpu=use_gpu,
                 task_id=i + 1,
-                total_tasks=len(pdf_files)
+                total_tasks=len(pdf_files),
+                input_dir=input_dir
             )
             tasks.append(task)
         
@@ -85,18 +92,34 @@ class ConcurrentProcessor:
         
         try:
             with executor_class(max_workers=self.max_workers) as executor:
-                # 提交所有任务
-                future_to_task = {
-                    executor.submit(self._convert_single_pdf, task): task 
-                    for task in tasks
-                }
+                # 提交所有任务：开启批量推理时按目标页数分组，每组只调用一次parse_doc（与BatchProcessor相同）
+                future_to_tasks = {}
+                if self.batch_pages > 0:
+                    tasks_by_id = {task.task_id: task for task in tasks}
+                    file_tasks = [self._file_task(task) for task in tasks]
+                    for batch in iter_inference_batches(file_tasks, target_pages=self.batch_pages):
+                        future = executor.submit(convert_batch, batch)
+                        future_to_tasks[future] = [tasks_by_id[t.task_id] for t in batch.tasks]
+                else:
+                    for task in tasks:
+                        future_to_tasks[executor.submit(self._convert_single_pdf, task)] = [task]
                 
                 # 处理完成的任务
-                for future in as_completed(future_to_task):
-                    task = future_to_task[future]
+                for future in as_completed(future_to_tasks):
+                    item_tasks = future_to_tasks[future]
                     try:
-                        result = future.result()
-                        
+                        results = future.result()
+                        if not isinstance(results, list):
+                            results = [results]
+                    except Exception as e:
+                        for task in item_tasks:
+                            failed += 1
+                            print(f"✗ 任务异常 ({self.completed_count}/{self.total_count}): {task.pdf_path.name}")
+                            print(f"  异常: {str(e)}")
+                        continue
+                    
+                    for task, result in zip(item_tasks, results):
+                        result = self._conversion_result(result)
                         with self.progress_lock:
                             self.completed_count += 1
                             if result.success:
@@ -111,11 +134,6 @@ class ConcurrentProcessor:
                         # 记录日志
                         if logger:
                             self._log_conversion(logger, task, result)
-                            
-                    except Exception as e:
-                        failed += 1
-                        print(f"✗ 任务异常 ({self.completed_count}/{self.total_count}): {task.pdf_path.name}")
-                        print(f"  异常: {str(e)}")
         
         except KeyboardInterrupt:
             print("\n用户中断处理")
@@ -125,38 +143,56 @@ class ConcurrentProcessor:
         
         return successful, failed, total_duration
     
+    @staticmethod
+    def _file_task(task: ConversionTask) -> FileTask:
+        """转换为批量推理使用的FileTask（语言、后端和解析方法与_convert_single_pdf相同）"""
+        return FileTask(
+            file_path=task.pdf_path,
+            output_dir=task.output_dir,
+            task_id=task.task_id,
+            total_files=task.total_tasks,
+            use_gpu=task.use_gpu,
+            input_dir=task.input_dir
+        )
+    
+    @staticmethod
+    def _conversion_result(result: Union[ConversionResult, FileResult]) -> ConversionResult:
+        """把批量推理返回的FileResult转换为ConversionResult"""
+        if isinstance(result, ConversionResult):
+            return result
+        return ConversionResult(
+            task_id=result.task_id,
+            pdf_path=result.file_path,
+            success=result.success,
+            duration=result.duration,
+            error_message=result.error_message,
+            output_path=result.output_path
+        )
+    
     def _convert_single_pdf(self, task: ConversionTask) -> ConversionResult:
         """转换单个PDF文件（工作进程/线程函数）"""
         start_time = time.time()
+        layout = OutputLayout(task.input_dir, task.output_dir)
+        staging_dir = None
         
         try:
-            # 创建输出目录结构
-            relative_path = task.pdf_path.relative_to(task.pdf_path.parents[len(task.pdf_path.parts) - len(task.output_dir.parts) - 1])
-            output_path = task.output_dir / relative_path.with_suffix('.md')
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 创建临时输出目录
-            temp_output_dir = output_path.parent / f"{task.pdf_path.stem}_temp"
-            temp_output_dir.mkdir(parents=True, exist_ok=True)
+            # mineru写入目标目录旁的暂存目录
+            staging_dir = layout.create_staging_dir(task.pdf_path)
             
             # 调用mineru进行转换
             parse_doc(
                 path_list=[task.pdf_path],
-                output_dir=str(temp_output_dir),
+                output_dir=str(staging_dir),
                 lang="ch",
                 backend="pipeline",
                 method="auto"
             )
             
-            # 查找生成的markdown文件
-            md_file = temp_output_dir / f"{task.pdf_path.stem}.md"
-            if md_file.exists():
-                # 移动文件到目标位置
-                import shutil
-                shutil.move(str(md_file), str(output_path))
-                
-                # 清理临时目录
-                shutil.rmtree(temp_output_dir)
+            # 查找生成的markdown文件，连同图片发布到最终位置
+            md_file = find_markdown_output(staging_dir, task.pdf_path.stem)
+            if md_file is not None:
+                layout.publish(task.pdf_path, md_file)
+                output_path = layout.markdown_path(task.pdf_path)
                 
                 duration = time.time() - start_time
                 return ConversionResult(
@@ -167,7 +203,7 @@ class ConcurrentProcessor:
                     output_path=output_path
                 )
             else:
-                raise Exception(f"mineru未生成markdown文件: {md_file}")
+                raise Exception(f"mineru未生成markdown文件: {staging_dir}")
                 
         except Exception as e:
             duration = time.time() - start_time
@@ -178,6 +214,9 @@ class ConcurrentProcessor:
                 duration=duration,
                 error_message=str(e)
             )
+        finally:
+            if staging_dir is not None:
+                layout.discard(staging_dir)
     
     def _log_conversion(
         self, 
@@ -214,7 +253,8 @@ class ConcurrentProcessor:
 def create_concurrent_processor(
     workers: int = 4,
     use_processes: bool = True,
-    gpu_available: bool = False
+    gpu_available: bool = False,
+    batch_pages: int = 0
 ) -> ConcurrentProcessor:
     """创建并发处理器"""
     
@@ -230,7 +270,8 @@ def create_concurrent_processor(
     
     return ConcurrentProcessor(
         max_workers=workers,
-        use_processes=use_processes
+        use_processes=use_processes,
+        batch_pages=batch_pages
     )
 
 
@@ -23,7 +23,10 @@ class Config:
                 "workers": 1,
                 "verbose": False,
                 "estimate_time": True,
-                "log_conversions": True
+                "log_conversions": True,
+                "worker_pool": False,
+                "use_processes": False,
+                "incremental": False
             },
             "paths": {
                 "input": "./pdfs",
@@ -31,7 +34,53 @@ class Config:
                 "log_dir": "./logs"
             },
             "mineru_options": {
-                "use_gpu": False
+                "use_gpu": False,
+                "batch_pages": 0,  # 跨文档批量推理的目标页数，0表示逐文件推理
+                "output_profile": "md+images",  # 输出配置档: md-only / md+images / full-debug
+                "serialization": "compact"  # JSON产物编码: json / compact / orjson / msgpack，可加 +gzip / +zstd
+            },
+            "scheduling": {
+                "longest_first": True,  # 按预估耗时从长到短提交任务
+                "window": 0  # 调度预读窗口（文件数），遍历到的文件先在窗口内排序；0表示工作进程数的4倍
+            },
+            "fallback": {
+                "strategy": "race",  # 备选处理器策略: sequential 依次尝试 / race 文本提取器同时运行
+                "race_timeout": 120.0,  # 同时运行文本提取器时等待的最长时间（秒）
+                "min_text_coverage": 0.5,  # 提取到文本的页数比例达到该值才采用
+                "extraction_workers": 4  # pypdf逐页提取的进程数上限，在转换进程池的工作进程中时串行提取
+            },
+            "ocr": {
+                "dpi": 200,  # Tesseract识别前渲染页面的分辨率
+                "grayscale": True,  # 灰度渲染，位图大小只有RGB的三分之一
+                "lang": "eng+chi_sim",
+                "workers": 0,  # OCR进程数，0表示按CPU核心数
+                "max_queued_pages": 0  # 已渲染等待识别的最大页数，0表示OCR进程数的两倍
+            },
+            "triage": {
+                "enabled": True  # 转换前采样页面预分类，文字型PDF走txt方法，扫描型走OCR
+            },
+            "sharding": {
+                "threshold_pages": 300,  # 超过该页数的PDF拆分为分片并行转换，0表示不分片
+                "shard_pages": 100  # 每个分片的页数
+            },
+            "streaming": {
+                "window_pages": 0  # 超过该页数的PDF按窗口逐段推理并写出，峰值内存取决于窗口页数，0表示不分窗口
+            },
+            "output_writer": {
+                "workers": 2,  # 写出图片、markdown和JSON产物的I/O线程数，推理线程不等待写盘
+                "max_pending_mb": 256  # 排队待写的数据超过该大小时推理线程等待（背压）
+            },
+            "vlm_client": {
+                "max_in_flight": 16,  # vlm-sglang-client同时在途的页面请求数（跨文档），0表示使用mineru逐文档请求
+                "retries": 3,  # 页面请求失败（连接错误、429/5xx）后的重试次数
+                "backoff": 0.5,  # 第一次重试前等待的秒数，之后每次翻倍
+                "timeout": 600,  # 单个页面请求的超时时间（秒）
+                "lookahead_docs": 2  # 提前渲染并提交页面的文档数
+            },
+            "cache": {
+                "enabled": True,
+                "dir": "./conversion_cache",
+                "max_size_mb": 10240  # 超出后按最近访问时间淘汰
             },
             "logging": {
                 "level": "INFO",
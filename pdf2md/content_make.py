@@ -0,0 +1,209 @@
+"""
+内容生成模块
+一次遍历pdf_info同时生成markdown、content_list和结构化JSON（STRUCTURED_JSON）。
+mineru的union_make每种模式各遍历一次，两次遍历对每个段落都要合并文本（含语言检测），长文档上耗时明显；
+这里每个段落只合并一次文本，输出与mineru对应模式的结果相同
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 与 mineru.utils.enum_class 中的取值一致，本模块不依赖mineru即可导入
+MM_MD = "mm_markdown"
+NLP_MD = "nlp_markdown"
+
+TEXT = "text"
+TITLE = "title"
+LIST = "list"
+INDEX = "index"
+IMAGE = "image"
+TABLE = "table"
+INTERLINE_EQUATION = "interline_equation"
+IMAGE_BODY = "image_body"
+IMAGE_CAPTION = "image_caption"
+IMAGE_FOOTNOTE = "image_footnote"
+TABLE_BODY = "table_body"
+TABLE_CAPTION = "table_caption"
+TABLE_FOOTNOTE = "table_footnote"
+
+STRUCTURED_NAME = "structured"  # 结构化JSON产物名后缀：{name}_structured.json
+
+
+@dataclass(frozen=True)
+class ContentFlavour:
+    """后端之间生成内容的差异：段落文本合并方式、公式和表格的处理"""
+    merge_text: Callable[[Dict[str, Any]], str]
+    title_level: Callable[[Dict[str, Any]], int]
+    equation_image: bool = False  # pipeline: 行间公式没有latex时引用截图，content_list带img_path
+    table_latex: bool = False  # pipeline: content_list的table_body优先使用latex
+
+
+def content_flavour(backend: str) -> ContentFlavour:
+    """pipeline或VLM后端对应的生成方式（需要安装mineru）"""
+    if backend == "pipeline":
+        from mineru.backend.pipeline import pipeline_middle_json_mkcontent as mkcontent
+        return ContentFlavour(mkcontent.merge_para_with_text, mkcontent.get_title_level, equation_image=True, table_latex=True)
+    from mineru.backend.vlm import vlm_middle_json_mkcontent as mkcontent
+    return ContentFlavour(mkcontent.merge_para_with_text, mkcontent.get_title_level)
+
+
+class SectionTracker:
+    """根据标题层级（text_level）维护当前所在章节的标题路径"""
+
+    def __init__(self):
+        self._stack: List[Tuple[int, str]] = []
+
+    def update(self, item: Dict[str, Any]) -> List[str]:
+        """处理一个content_list元素，返回它所属章节的标题路径（标题本身包含在路径中）"""
+        level = item.get("text_level")
+        if level:
+            while self._stack and self._stack[-1][0] >= level:
+                self._stack.pop()
+            self._stack.append((level, item.get("text", "")))
+        return [title for _, title in self._stack]
+
+
+def assign_sections(items: List[Dict[str, Any]], tracker: SectionTracker) -> List[Dict[str, Any]]:
+    """重新计算结构化JSON元素的章节路径（分片拼接时章节跨越分片）"""
+    for item in items:
+        item["section"] = tracker.update(item)
+    return items
+
+
+@dataclass
+class MadeContent:
+    """一次遍历的生成结果，未请求的输出为None"""
+    markdown: Optional[str] = None
+    content_list: Optional[List[Dict[str, Any]]] = None
+    structured: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class ContentMaker:
+    """一次遍历生成多种输出；章节状态跨make调用保留，分窗口转换时依次传入各窗口的pdf_info"""
+    flavour: ContentFlavour
+    make_md_mode: str = MM_MD
+    img_buket_path: str = ""
+    markdown: bool = True
+    content_list: bool = True
+    structured: bool = False
+    sections: SectionTracker = field(default_factory=SectionTracker)
+
+    def make(self, pdf_info: List[Dict[str, Any]]) -> MadeContent:
+        paragraphs: List[str] = []
+        content_list: List[Dict[str, Any]] = []
+        structured: List[Dict[str, Any]] = []
+        for page_info in pdf_info:
+            para_blocks = page_info.get("para_blocks")
+            if not para_blocks:
+                continue
+            page_idx = page_info.get("page_idx")
+            for para_block in para_blocks:
+                text, item = self._make_block(para_block)
+                text = text.strip()
+                if self.markdown and text:
+                    paragraphs.append(text)
+                if item is None:
+                    continue
+                item["page_idx"] = page_idx
+                if self.content_list:
+                    content_list.append(item)
+                if self.structured:
+                    structured.append({**item, "markdown": text, "section": self.sections.update(item)})
+        return MadeContent(
+            markdown="\n\n".join(paragraphs) if self.markdown else None,
+            content_list=content_list if self.content_list else None,
+            structured=structured if self.structured else None,
+        )
+
+    def _make_block(self, para_block: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """一个段落的markdown文本和content_list元素（不含page_idx），元素为None表示不输出"""
+        merge_text = self.flavour.merge_text
+        para_type = para_block["type"]
+        if para_type in (TEXT, LIST, INDEX):
+            text = merge_text(para_block)
+            return text, {"type": "text", "text": text}
+        if para_type == TITLE:
+            text = merge_text(para_block)
+            title_level = self.flavour.title_level(para_block)
+            item = {"type": "text", "text": text}
+            if title_level != 0:
+                item["text_level"] = title_level
+            return f'{"#" * title_level} {text}', item
+        if para_type == INTERLINE_EQUATION:
+            return self._make_equation(para_block)
+        if para_type == IMAGE:
+            return self._make_image(para_block)
+        if para_type == TABLE:
+            return self._make_table(para_block)
+        return "", {}
+
+    def _make_equation(self, para_block: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if not self.flavour.equation_image:
+            text = self.flavour.merge_text(para_block)
+            return text, {"type": "equation", "text": text, "text_format": "latex"}
+        if len(para_block["lines"]) == 0 or len(para_block["lines"][0]["spans"]) == 0:
+            return "", None
+        span = para_block["lines"][0]["spans"][0]
+        item = {"type": "equation", "img_path": f"{self.img_buket_path}/{span.get('image_path', '')}"}
+        if span.get("content", ""):
+            text = self.flavour.merge_text(para_block)
+            item["text"] = text
+            item["text_format"] = "latex"
+            return text, item
+        return f"![]({self.img_buket_path}/{span['image_path']})", item
+
+    def _body_spans(self, para_block: Dict[str, Any], body_type: str, span_type: str):
+        for block in para_block["blocks"]:
+            if block["type"] == body_type:
+                for line in block["lines"]:
+                    for span in line["spans"]:
+                        if span["type"] == span_type:
+                            yield span
+
+    def _merge_blocks(self, para_block: Dict[str, Any], block_type: str) -> List[str]:
+        return [self.flavour.merge_text(block) for block in para_block["blocks"] if block["type"] == block_type]
+
+    def _make_image(self, para_block: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        image_paths = [
+            span["image_path"] for span in self._body_spans(para_block, IMAGE_BODY, IMAGE) if span.get("image_path", "")
+        ]
+        captions = self._merge_blocks(para_block, IMAGE_CAPTION)
+        footnotes = self._merge_blocks(para_block, IMAGE_FOOTNOTE)
+        item = {
+            "type": "image",
+            "img_path": f"{self.img_buket_path}/{image_paths[-1]}" if image_paths else "",
+            "img_caption": captions,
+            "img_footnote": footnotes,
+        }
+        if self.make_md_mode != MM_MD:
+            return "", item
+        body = "".join(f"![]({self.img_buket_path}/{path})" for path in image_paths)
+        if footnotes:
+            # 有图片脚注时：标题、图片、脚注
+            text = "".join(f"{caption}  \n" for caption in captions) + body + "".join(f"  \n{note}" for note in footnotes)
+        else:
+            text = body + "".join(f"  \n{caption}" for caption in captions)
+        return text, item
+
+    def _make_table(self, para_block: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        captions = self._merge_blocks(para_block, TABLE_CAPTION)
+        footnotes = self._merge_blocks(para_block, TABLE_FOOTNOTE)
+        item = {"type": "table", "img_path": "", "table_caption": captions, "table_footnote": footnotes}
+        body = ""
+        for span in self._body_spans(para_block, TABLE_BODY, TABLE):
+            if self.flavour.table_latex and span.get("latex", ""):
+                item["table_body"] = f"{span['latex']}"
+            elif span.get("html", ""):
+                item["table_body"] = f"{span['html']}"
+            if span.get("image_path", ""):
+                item["img_path"] = f"{self.img_buket_path}/{span['image_path']}"
+
+            if span.get("html", ""):
+                body += f"\n{span['html']}\n"
+            elif span.get("image_path", ""):
+                body += f"![]({self.img_buket_path}/{span['image_path']})"
+        if self.make_md_mode != MM_MD:
+            return "", item
+        text = "".join(f"{caption}  \n" for caption in captions) + body + "".join(f"\n{note}  " for note in footnotes)
+        return text, item
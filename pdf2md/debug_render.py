@@ -0,0 +1,152 @@
+"""
+调试PDF延迟渲染模块
+转换时只保存绘制版面/span标注所需的pdf_info几何信息（{name}_bbox产物），不在转换过程中重新渲染整个PDF；
+需要查看时用 pdf2md render-debug 为选定的文档并行生成 _layout.pdf 和 _span.pdf
+"""
+
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .pdf_source import PdfSource
+from .serialization import Serializer, artifact_name, find_artifact, load_artifact
+from .worker_pool import create_process_executor
+
+# 几何信息产物名后缀：{name}_bbox.json（编码和压缩方式与其他JSON产物相同）
+GEOMETRY_NAME = "bbox"
+
+
+def geometry_name(pdf_file_name: str) -> str:
+    return f"{pdf_file_name}_{GEOMETRY_NAME}"
+
+
+def render_request(
+    source: PdfSource,
+    backend: str,
+    start_page_id: int,
+    end_page_id: Optional[int],
+    layout: bool,
+    span: bool
+) -> Dict[str, Any]:
+    """几何信息产物中pdf_info以外的字段：渲染时需要的原PDF位置、页码范围和要绘制的标注"""
+    return {
+        "source": str(source.path.resolve()) if source.path is not None else None,
+        "backend": backend,
+        "start_page_id": start_page_id,
+        "end_page_id": end_page_id,
+        "layout": layout,
+        "span": span and backend == "pipeline",  # VLM后端没有span信息
+    }
+
+
+def save_geometry(
+    serializer: Serializer,
+    md_dir: Path,
+    pdf_file_name: str,
+    pdf_info: List[Any],
+    request: Dict[str, Any]
+) -> Path:
+    """保存一个文档的标注几何信息"""
+    return serializer.dump({"pdf_info": pdf_info, **request}, serializer.path_for(md_dir, geometry_name(pdf_file_name)))
+
+
+@dataclass
+class RenderResult:
+    """调试PDF渲染结果数据类"""
+    geometry_path: Path
+    success: bool
+    duration: float
+    outputs: List[Path] = field(default_factory=list)
+    error_message: Optional[str] = None
+
+
+def _geometry_stem(geometry_path: Path) -> str:
+    """几何信息文件对应的文档名，例如 doc_bbox.json.gz -> doc"""
+    name = artifact_name(geometry_path) or geometry_path.stem
+    return name[:-len(GEOMETRY_NAME) - 1] if name.endswith(f"_{GEOMETRY_NAME}") else name
+
+
+def _load_pdf_bytes(geometry: Dict[str, Any], directory: Path, stem: str) -> bytes:
+    """取得与pdf_info页面对应的PDF内容：优先使用原PDF，已移动或删除时使用转换时转储的 _origin.pdf"""
+    source_path = geometry.get("source")
+    if source_path and Path(source_path).exists():
+        with PdfSource(source_path) as source:
+            return source.range_bytes(geometry.get("start_page_id", 0), geometry.get("end_page_id"))
+    origin = directory / f"{stem}_origin.pdf"
+    if origin.exists():
+        # _origin.pdf就是实际解析的页码范围
+        return origin.read_bytes()
+    raise FileNotFoundError(f"找不到原PDF: {source_path}（也没有 {origin.name}）")
+
+
+def render_geometry(geometry_path: Path, output_dir: Optional[Path] = None) -> RenderResult:
+    """按保存的几何信息绘制调试PDF（模块级函数，可被进程池pickle调用）"""
+    start_time = time.time()
+    geometry_path = Path(geometry_path)
+    try:
+        from mineru.utils.draw_bbox import draw_layout_bbox, draw_span_bbox
+
+        stem = _geometry_stem(geometry_path)
+        output_dir = Path(output_dir) if output_dir is not None else geometry_path.parent
+        output_dir.mkdir(parents=True, exist_ok=True)
+        geometry = load_artifact(geometry_path)
+        pdf_info = geometry["pdf_info"]
+        pdf_bytes = _load_pdf_bytes(geometry, geometry_path.parent, stem)
+
+        outputs = []
+        if geometry.get("layout", True):
+            draw_layout_bbox(pdf_info, pdf_bytes, str(output_dir), f"{stem}_layout.pdf")
+            outputs.append(output_dir / f"{stem}_layout.pdf")
+        if geometry.get("span", True):
+            draw_span_bbox(pdf_info, pdf_bytes, str(output_dir), f"{stem}_span.pdf")
+            outputs.append(output_dir / f"{stem}_span.pdf")
+        return RenderResult(geometry_path, True, time.time() - start_time, outputs)
+    except Exception as e:
+        return RenderResult(geometry_path, False, time.time() - start_time, error_message=str(e))
+
+
+def _is_geometry_file(path: Path) -> bool:
+    return (artifact_name(path) or "").endswith(f"_{GEOMETRY_NAME}")
+
+
+def find_geometry_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """根据命令行给出的文档找到几何信息文件
+
+    可以是几何信息文件本身、转换输出的markdown（在其旁边查找 {stem}_bbox）或输出目录（递归查找）。
+    """
+    seen = set()
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            candidates = sorted(p for p in path.rglob(f"*_{GEOMETRY_NAME}.*") if p.is_file() and _is_geometry_file(p))
+        elif _is_geometry_file(path):
+            candidates = [path] if path.exists() else []
+        else:
+            found = find_artifact(path.parent, geometry_name(path.stem))
+            candidates = [found] if found is not None else []
+        if not candidates:
+            print(f"  未找到几何信息: {path}（转换时需启用 f_draw_layout_bbox/f_draw_span_bbox，例如full-debug配置档）")
+        for candidate in candidates:
+            if candidate not in seen:
+                seen.add(candidate)
+                yield candidate
+
+
+def render_debug_pdfs(
+    paths: Iterable[Path],
+    workers: int = 1,
+    output_dir: Optional[Path] = None
+) -> List[RenderResult]:
+    """为选定的文档渲染调试PDF，多个文档在进程池中并行渲染"""
+    geometry_files = list(find_geometry_files(paths))
+    if workers <= 1 or len(geometry_files) <= 1:
+        return [render_geometry(path, output_dir) for path in geometry_files]
+
+    results = []
+    with create_process_executor(min(workers, len(geometry_files)), use_gpu=False) as executor:
+        futures = [executor.submit(render_geometry, path, output_dir) for path in geometry_files]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
@@ -0,0 +1,124 @@
+"""
+文件发现模块
+用os.scandir流式遍历目录树，后台线程把发现的PDF放入有界队列，转换不必等整棵目录树遍历完成
+"""
+
+import os
+import threading
+from pathlib import Path
+from queue import Full, Queue
+from typing import Iterator, List, Optional, Tuple
+
+
+# 队列结束标记
+_DONE = object()
+
+
+def iter_pdf_files(
+    input_dir: Path,
+    errors: Optional[List[Tuple[str, OSError]]] = None
+) -> Iterator[Tuple[Path, int]]:
+    """流式遍历目录树，逐个产出 (PDF路径, 文件大小)
+
+    文件大小取自遍历时的目录项，后续预估时间不必再对每个文件调用stat()；
+    不跟随目录符号链接，避免链接成环时无限遍历。
+    无法读取的目录和条目被跳过，传入errors时记录到其中（调用方据此判断遍历是否完整）。
+    """
+    stack = [str(input_dir)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                            yield Path(entry.path), entry.stat().st_size
+                    except OSError as e:
+                        # 遍历过程中被删除或无权限的条目直接跳过
+                        if errors is not None:
+                            errors.append((entry.path, e))
+                        continue
+                # 倒序压栈，使子目录按目录项顺序依次遍历
+                stack.extend(reversed(subdirs))
+        except OSError as e:
+            print(f"警告：无法读取目录 {directory}: {e}")
+            if errors is not None:
+                errors.append((directory, e))
+
+
+def find_pdf_files(input_dir: Path) -> List[Path]:
+    """递归查找PDF文件（需要完整列表时使用）"""
+    if not input_dir.exists():
+        print(f"错误：输入目录 '{input_dir}' 不存在")
+        return []
+    return [path for path, _ in iter_pdf_files(input_dir)]
+
+
+class FileDiscovery:
+    """后台文件发现器
+
+    后台线程遍历目录并把结果放入有界队列，消费方迭代本对象即可边发现边转换；
+    队列满时遍历暂停，避免在超大目录上占用过多内存。已发现的文件数和总大小随遍历实时更新。
+    遍历中无法读取的目录记录在errors中，complete为False时发现的文件列表可能不完整。
+    """
+
+    def __init__(self, input_dir: Path, max_queued: int = 10000):
+        self.input_dir = input_dir
+        self.discovered_count = 0
+        self.discovered_bytes = 0
+        self.finished = False
+        self.errors: List[Tuple[str, Exception]] = []
+        self._queue: Queue = Queue(maxsize=max(1, max_queued))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FileDiscovery":
+        """启动后台遍历线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._walk, name="pdf-discovery", daemon=True)
+            self._thread.start()
+        return self
+
+    def _walk(self) -> None:
+        try:
+            for path, size in iter_pdf_files(self.input_dir, self.errors):
+                if self._stop.is_set():
+                    break
+                self.discovered_count += 1
+                self.discovered_bytes += size
+                self._put((path, size))
+        except Exception as e:
+            print(f"警告：遍历目录 {self.input_dir} 时出错: {e}")
+            self.errors.append((str(self.input_dir), e))
+        finally:
+            self.finished = True
+            self._put(_DONE)
+
+    @property
+    def complete(self) -> bool:
+        """遍历已结束、没有被停止，且没有无法读取的目录"""
+        return self.finished and not self._stop.is_set() and not self.errors
+
+    def _put(self, item: object) -> None:
+        """放入队列，停止后不再阻塞"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except Full:
+                continue
+
+    def __iter__(self) -> Iterator[Tuple[Path, int]]:
+        self.start()
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def stop(self) -> None:
+        """停止遍历（例如用户中断时）"""
+        self._stop.set()
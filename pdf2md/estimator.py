@@ -2,9 +2,14 @@
 时间预估模块
 """
 
+import heapq
+import threading
 import time
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from .triage import TriageResult, triage_pdf
 
 
 class TimeEstimator:
@@ -92,4 +97,192 @@ class TimeEstimator:
         print(f"  并发数: {workers}")
         
         if workers > 1:
-            print(f"  (考虑并发加速)") 
\ No newline at end of file
+            print(f"  (考虑并发加速)") 
+
+# 无法读取PDF时按文件大小估算页数（每页约100KB）
+_ESTIMATED_BYTES_PER_PAGE = 100 * 1024
+
+# 采样判断图片密度和文字层的最大页数
+_FEATURE_SAMPLE_PAGES = 8
+
+
+@dataclass
+class PdfFeatures:
+    """影响转换耗时的PDF特征"""
+    pages: int
+    size_mb: float
+    image_density: float = 0.0  # 平均每页图片数
+    has_text_layer: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def vector(self) -> List[float]:
+        """回归特征向量：常数项、页数、大小、图片数、无文字层页数（需要OCR）"""
+        return [
+            1.0,
+            float(self.pages),
+            self.size_mb,
+            self.pages * self.image_density,
+            0.0 if self.has_text_layer else float(self.pages),
+        ]
+
+
+def extract_pdf_features(
+    file_path: Path,
+    file_size: Optional[int] = None,
+    triage: Optional[TriageResult] = None
+) -> PdfFeatures:
+    """提取PDF特征，复用预分类的页面采样结果；无法解析时按文件大小估算"""
+    if file_size is None:
+        try:
+            file_size = file_path.stat().st_size
+        except OSError:
+            file_size = 0
+    size_mb = file_size / (1024 * 1024)
+
+    if triage is None:
+        triage = triage_pdf(file_path, _FEATURE_SAMPLE_PAGES)
+    if triage is None:
+        return PdfFeatures(pages=max(1, file_size // _ESTIMATED_BYTES_PER_PAGE), size_mb=size_mb)
+
+    return PdfFeatures(
+        pages=triage.pages,
+        size_mb=size_mb,
+        image_density=triage.image_density,
+        has_text_layer=triage.text_coverage >= 0.5
+    )
+
+
+def estimate_makespan(durations: List[float], workers: int = 1) -> float:
+    """预估一组任务在workers个工作进程上按最长任务优先分配时的总耗时"""
+    loads = [0.0] * max(1, workers)
+    for duration in sorted(durations, reverse=True):
+        heapq.heapreplace(loads, loads[0] + duration)
+    return max(loads)
+
+
+class _OnlineRegression:
+    """在线岭回归：累积 XᵀX 与 Xᵀy，新样本到来时直接更新"""
+
+    def __init__(self, dimension: int, ridge: float = 1e-3):
+        self.dimension = dimension
+        self.ridge = ridge
+        self.xtx = [[0.0] * dimension for _ in range(dimension)]
+        self.xty = [0.0] * dimension
+        self.samples = 0
+        self._weights: Optional[List[float]] = None
+
+    def add(self, x: List[float], y: float) -> None:
+        for i in range(self.dimension):
+            self.xty[i] += x[i] * y
+            for j in range(self.dimension):
+                self.xtx[i][j] += x[i] * x[j]
+        self.samples += 1
+        self._weights = None
+
+    def weights(self) -> List[float]:
+        """高斯消元求解 (XᵀX + λI)w = Xᵀy"""
+        if self._weights is not None:
+            return self._weights
+
+        n = self.dimension
+        matrix = [self.xtx[i][:] + [self.xty[i]] for i in range(n)]
+        for i in range(1, n):
+            # 常数项不做正则
+            matrix[i][i] += self.ridge * max(1.0, matrix[i][i])
+
+        for col in range(n):
+            pivot = max(range(col, n), key=lambda r: abs(matrix[r][col]))
+            if abs(matrix[pivot][col]) < 1e-12:
+                continue
+            matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+            for row in range(n):
+                if row != col:
+                    factor = matrix[row][col] / matrix[col][col]
+                    for k in range(col, n + 1):
+                        matrix[row][k] -= factor * matrix[col][k]
+
+        self._weights = [
+            matrix[i][n] / matrix[i][i] if abs(matrix[i][i]) >= 1e-12 else 0.0
+            for i in range(n)
+        ]
+        return self._weights
+
+    def predict(self, x: List[float]) -> float:
+        return sum(w * v for w, v in zip(self.weights(), x))
+
+
+class LearnedTimeEstimator(TimeEstimator):
+    """基于历史转换记录学习的时间预估器
+
+    按 (backend, method) 分别拟合回归模型，特征为页数、文件大小、图片数量和需要OCR的页数；
+    样本不足时退回按文件大小的固定系数预估。转换过程中可调用observe在线更新模型。
+    """
+
+    def __init__(self, config: Dict[str, Any], min_samples: int = 5):
+        super().__init__(config)
+        self.min_samples = min_samples
+        self.models: Dict[Tuple[str, str], _OnlineRegression] = {}
+        self._lock = threading.Lock()
+
+    def fit_from_log(self, logger: Any) -> int:
+        """用ConversionLogger中带特征的成功记录拟合模型，返回使用的样本数"""
+        used = 0
+        for record in logger.iter_records():
+            # 缓存命中的耗时只是复制文件，不代表转换成本
+            if not record.get("success") or "pages" not in record or record.get("cache_hit"):
+                continue
+            features = PdfFeatures(
+                pages=record["pages"],
+                size_mb=record.get("file_size", 0) / (1024 * 1024),
+                image_density=record.get("image_density", 0.0),
+                has_text_layer=record.get("has_text_layer", True)
+            )
+            self.observe(
+                features,
+                record.get("duration", 0.0),
+                backend=record.get("backend", "pipeline"),
+                method=record.get("method", "auto")
+            )
+            used += 1
+        return used
+
+    def observe(self, features: PdfFeatures, duration: float,
+                backend: str = "pipeline", method: str = "auto") -> None:
+        """加入一个实际耗时样本"""
+        with self._lock:
+            model = self.models.get((backend, method))
+            if model is None:
+                model = _OnlineRegression(len(features.vector()))
+                self.models[(backend, method)] = model
+            model.add(features.vector(), duration)
+
+    def predict(self, features: PdfFeatures, backend: str = "pipeline", method: str = "auto") -> float:
+        """预估单个文件的转换耗时"""
+        with self._lock:
+            model = self.models.get((backend, method))
+            if model is not None and model.samples >= self.min_samples:
+                return max(self.min_time_per_file, model.predict(features.vector()))
+
+        estimated_time = features.size_mb * self.avg_time_per_mb
+        return min(max(estimated_time, self.min_time_per_file), self.max_time_per_file)
+
+    def estimate_file_time(self, file_path: Path) -> float:
+        """预估单个文件转换时间"""
+        return self.predict(extract_pdf_features(file_path))
+
+    def estimate_total_time(self, pdf_files: List[Path], workers: int = 1) -> Dict[str, Any]:
+        """预估总转换时间，total_time为按最长任务优先分配到各工作进程后的总耗时"""
+        if not pdf_files:
+            return super().estimate_total_time(pdf_files, workers)
+
+        features = [extract_pdf_features(f) for f in pdf_files]
+        durations = [self.predict(f) for f in features]
+        return {
+            "total_time": estimate_makespan(durations, workers),
+            "avg_time_per_file": sum(durations) / len(durations),
+            "total_size_mb": sum(f.size_mb for f in features),
+            "files_count": len(pdf_files),
+            "workers": workers
+        }
@@ -3,42 +3,87 @@
 """
 
 import json
-import time
+import os
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
 
 class ConversionLogger:
-    """转换日志记录器"""
-    
-    def __init__(self, log_dir: Path):
+    """转换日志记录器
+
+    每条转换记录以一行JSON追加到 conversions.jsonl，不再整体重写；
+    文件超过 max_bytes 时轮转为 conversions.1.jsonl、conversions.2.jsonl ...
+    """
+
+    def __init__(self, log_dir: Path, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 20):
         self.log_dir = log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True)
-        self.conversion_log = self.log_dir / "conversions.json"
-        self.conversions = self._load_conversions()
-    
-    def _load_conversions(self) -> Dict[str, Any]:
-        """加载历史转换记录"""
-        if self.conversion_log.exists():
-            try:
-                with open(self.conversion_log, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"警告：加载转换记录失败: {e}")
-        return {}
-    
-    def _save_conversions(self) -> None:
-        """保存转换记录"""
+        self.conversion_log = self.log_dir / "conversions.jsonl"
+        self.legacy_log = self.log_dir / "conversions.json"
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._migrate_legacy_log()
+
+    def _migrate_legacy_log(self) -> None:
+        """把旧版 conversions.json 转换为JSONL格式"""
+        if not self.legacy_log.exists():
+            return
         try:
-            with open(self.conversion_log, 'w', encoding='utf-8') as f:
-                json.dump(self.conversions, f, ensure_ascii=False, indent=2)
+            with open(self.legacy_log, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in legacy.values()]
+            with self._lock:
+                with open(self.conversion_log, 'a', encoding='utf-8') as f:
+                    f.writelines(lines)
+            self.legacy_log.rename(self.legacy_log.with_suffix(".json.migrated"))
         except Exception as e:
-            print(f"警告：保存转换记录失败: {e}")
-    
-    def log_conversion(self, file_path: str, file_size: int, duration: float, 
-                      success: bool, output_path: Optional[str] = None, 
-                      error_message: Optional[str] = None, use_gpu: bool = False) -> None:
+            print(f"警告：迁移旧版转换记录失败: {e}")
+
+    def _rotated_path(self, index: int) -> Path:
+        return self.log_dir / f"conversions.{index}.jsonl"
+
+    def _rotate_if_needed(self) -> None:
+        """文件超过大小上限时轮转"""
+        try:
+            if self.conversion_log.stat().st_size < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+
+        try:
+            oldest = self._rotated_path(self.backup_count)
+            if oldest.exists():
+                oldest.unlink()
+            for index in range(self.backup_count - 1, 0, -1):
+                source = self._rotated_path(index)
+                if source.exists():
+                    os.replace(source, self._rotated_path(index + 1))
+            os.replace(self.conversion_log, self._rotated_path(1))
+        except FileNotFoundError:
+            # 其他进程已经完成了轮转
+            pass
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """追加一条记录
+
+        以O_APPEND方式一次写入整行，多个工作进程同时写入时各行不会交错。
+        """
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        with self._lock:
+            self._rotate_if_needed()
+            fd = os.open(self.conversion_log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def log_conversion(self, file_path: str, file_size: int, duration: float,
+                      success: bool, output_path: Optional[str] = None,
+                      error_message: Optional[str] = None, use_gpu: bool = False,
+                      **extra: Any) -> None:
         """记录转换信息"""
         record = {
             "file_path": file_path,
@@ -50,29 +95,65 @@ class ConversionLogger:
             "use_gpu": use_gpu,
             "timestamp": datetime.now().isoformat()
         }
-        
-        record_id = f"{file_path}_{int(time.time())}"
-        self.conversions[record_id] = record
-        self._save_conversions()
-    
+        record.update(extra)
+
+        try:
+            self._append(record)
+        except Exception as e:
+            print(f"警告：保存转换记录失败: {e}")
+
+    def _log_files(self) -> List[Path]:
+        """按时间顺序（从旧到新）列出所有日志文件"""
+        files = []
+        for index in range(self.backup_count, 0, -1):
+            path = self._rotated_path(index)
+            if path.exists():
+                files.append(path)
+        if self.conversion_log.exists():
+            files.append(self.conversion_log)
+        return files
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """流式读取所有历史转换记录（从旧到新）"""
+        for path in self._log_files():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            # 跳过写入中断留下的残行
+                            continue
+            except FileNotFoundError:
+                # 读取过程中文件被轮转
+                continue
+
     def get_statistics(self) -> Dict[str, Any]:
-        """获取转换统计信息"""
-        if not self.conversions:
+        """获取转换统计信息（流式扫描，不把全部记录载入内存）"""
+        total_files = 0
+        successful = 0
+        total_size = 0
+        total_time = 0.0
+
+        for record in self.iter_records():
+            total_files += 1
+            if record.get('success', False):
+                successful += 1
+            total_size += record.get('file_size', 0)
+            total_time += record.get('duration', 0)
+
+        if total_files == 0:
             return {}
-        
-        successful = [r for r in self.conversions.values() if r.get('success', False)]
-        failed = [r for r in self.conversions.values() if not r.get('success', False)]
-        
-        total_files = len(self.conversions)
-        total_size = sum(r.get('file_size', 0) for r in self.conversions.values())
-        total_time = sum(r.get('duration', 0) for r in self.conversions.values())
-        
+
         return {
             "total_files": total_files,
-            "successful": len(successful),
-            "failed": len(failed),
-            "success_rate": len(successful) / total_files if total_files > 0 else 0,
+            "successful": successful,
+            "failed": total_files - successful,
+            "success_rate": successful / total_files,
             "total_size_mb": total_size / (1024 * 1024),
             "total_time_seconds": total_time,
-            "avg_time_per_file": total_time / total_files if total_files > 0 else 0
-        } 
\ No newline at end of file
+            "avg_time_per_file": total_time / total_files
+        }
@@ -16,33 +16,28 @@ import click
 
 from .config import config
 from .logger import ConversionLogger
-from .estimator import TimeEstimator
+from .estimator import LearnedTimeEstimator
 from .shutdown import ShutdownManager
 from .mineru_wrapper import parse_doc
-from .batch_processor import process_pdfs_batch, get_optimal_worker_count
-from .estimator import TimeEstimator
-from .shutdown import ShutdownManager
+from .batch_processor import process_pdfs_batch, get_optimal_worker_count, find_markdown_output
+from .output_layout import OutputLayout
+from .triage import triage_pdf
+from . import discovery
+from .output_profiles import DEFAULT_OUTPUT_PROFILE, output_profile_names
+from .serialization import DEFAULT_SERIALIZATION, Serializer
 
 
 def find_pdf_files(input_dir: Path) -> List[Path]:
     """递归查找指定目录下的所有PDF文件。"""
-    pdf_files = []
-    if not input_dir.exists():
-        print(f"错误：输入目录 '{input_dir}' 不存在")
-        return pdf_files
-    
-    for file_path in input_dir.rglob("*.pdf"):
-        if file_path.is_file():
-            pdf_files.append(file_path)
-    
-    return pdf_files
+    return discovery.find_pdf_files(input_dir)
 
 
 def convert_pdf_to_markdown(
     input_path: Path,
     output_dir: Path,
     use_gpu: bool = False,
-    logger: Optional[ConversionLogger] = None
+    logger: Optional[ConversionLogger] = None,
+    triage: Optional[bool] = None
 ) -> Tuple[bool, float]:
     """
     转换单个PDF文件为Markdown
@@ -52,39 +47,40 @@ def convert_pdf_to_markdown(
         output_dir: 输出目录
         use_gpu: 是否使用GPU
         logger: 日志记录器
+        triage: 是否预分类选择解析方法，None表示使用配置 triage.enabled；关闭时使用auto
         
     Returns:
         (success, duration): 转换是否成功和耗时
     """
     start_time = time.time()
+    layout = OutputLayout(None, output_dir)
+    staging_dir = None
     
     try:
-        # 创建输出目录
-        output_dir.mkdir(parents=True, exist_ok=True)
+        # mineru写入目标目录旁的暂存目录
+        staging_dir = layout.create_staging_dir(input_path)
         
-        # 创建临时输出目录
-        temp_output_dir = output_dir / f"{input_path.stem}_temp"
-        temp_output_dir.mkdir(parents=True, exist_ok=True)
+        # 预分类选择解析方法：文字型走txt，扫描型走OCR
+        if triage is None:
+            triage = config.get('triage.enabled', True)
+        result = triage_pdf(input_path) if triage else None
+        method = result.method if result is not None else "auto"
         
         # 导入并调用mineru
         parse_doc(
             path_list=[input_path],
-            output_dir=str(temp_output_dir),
+            output_dir=str(staging_dir),
             lang="ch",
             backend="pipeline",
-            method="auto"
+            method=method,
+            window_pages=config.get('streaming.window_pages', 0)
         )
         
-        # 查找生成的markdown文件
-        md_file = temp_output_dir / f"{input_path.stem}.md"
-        if md_file.exists():
-            # 移动文件到目标位置
-            import shutil
-            output_path = output_dir / f"{input_path.stem}.md"
-            shutil.move(str(md_file), str(output_path))
-            
-            # 清理临时目录
-            shutil.rmtree(temp_output_dir)
+        # 查找生成的markdown文件，连同图片发布到最终位置
+        md_file = find_markdown_output(staging_dir, input_path.stem, method)
+        if md_file is not None:
+            layout.publish(input_path, md_file)
+            output_path = layout.markdown_path(input_path)
             
             duration = time.time() - start_time
             
@@ -102,7 +98,7 @@ def convert_pdf_to_markdown(
             
             return True, duration
         else:
-            raise Exception(f"mineru未生成markdown文件: {md_file}")
+            raise Exception(f"mineru未生成markdown文件: {staging_dir}")
             
     except Exception as e:
         duration = time.time() - start_time
@@ -123,6 +119,9 @@ def convert_pdf_to_markdown(
                 print(f"记录日志失败: {log_error}")
         
         return False, duration
+    finally:
+        if staging_dir is not None:
+            layout.discard(staging_dir)
 
 
 def convert_directory(
@@ -144,21 +143,7 @@ def convert_directory(
     Returns:
         (successful, failed, total_duration): 成功数、失败数和总耗时
     """
-    # 查找所有PDF文件
-    pdf_files = list(input_dir.rglob("*.pdf"))
-    
-    if not pdf_files:
-        print("警告：在指定目录中未找到PDF文件")
-        return 0, 0, 0.0
-    
-    print(f"找到 {len(pdf_files)} 个PDF文件")
-    
-    # 估算总转换时间
-    total_size = sum(f.stat().st_size for f in pdf_files)
-    estimator = TimeEstimator({})
-    estimated_time = estimator.estimate_total_time(pdf_files, workers)["total_time"]
-    print(f"估算总转换时间: {estimated_time:.1f} 秒")
-    
+    # 文件边遍历边转换，总数和剩余时间由批量处理器随遍历推进更新
     return process_pdfs_batch(
         input_dir=input_dir,
         output_dir=output_dir,
@@ -206,6 +191,41 @@ def convert_directory(
     is_flag=True,
     help="禁用转换日志记录"
 )
+@click.option(
+    "--worker-pool",
+    is_flag=True,
+    help="使用常驻模型进程池（每个工作进程只加载一次模型）"
+)
+@click.option(
+    "--processes",
+    is_flag=True,
+    help="CPU模式下使用进程池代替线程池（不受GIL限制）"
+)
+@click.option(
+    "--batch-pages",
+    type=int,
+    help="跨文档批量推理的目标页数（如200），0表示逐文件推理"
+)
+@click.option(
+    "--output-profile",
+    type=click.Choice(output_profile_names()),
+    help="输出配置档: md-only（只要markdown）、md+images（markdown和图片）、full-debug（mineru全部产物）"
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="转换结果缓存目录（按PDF内容和转换参数缓存）"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="禁用转换结果缓存"
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="增量模式：跳过未变化的文件，并清理源PDF已删除的输出"
+)
 @click.option(
     "--config",
     "config_file",
@@ -241,6 +261,13 @@ def main(
     verbose: bool = False,
     estimate_time: bool = True,
     no_log: bool = False,
+    worker_pool: bool = False,
+    processes: bool = False,
+    batch_pages: Optional[int] = None,
+    output_profile: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+    no_cache: bool = False,
+    incremental: bool = False,
     config_file: Optional[Path] = None,
     shutdown: bool = False,
     shutdown_delay: int = 1,
@@ -270,6 +297,34 @@ def main(
         estimate_time = config.get('defaults.estimate_time', True)
     
     log_conversions = not no_log and config.get('defaults.log_conversions', True)
+    use_worker_pool = worker_pool or config.get('defaults.worker_pool', False)
+    use_processes = processes or config.get('defaults.use_processes', False)
+    if batch_pages is None:
+        batch_pages = config.get('mineru_options.batch_pages', 0)
+    if output_profile is None:
+        output_profile = config.get('mineru_options.output_profile', DEFAULT_OUTPUT_PROFILE)
+    if output_profile not in output_profile_names():
+        print(f"错误：未知的输出配置档 '{output_profile}'（可选: {', '.join(output_profile_names())}）")
+        sys.exit(1)
+    
+    # 结果缓存设置
+    use_cache = not no_cache and config.get('cache.enabled', True)
+    if cache_dir is None:
+        cache_dir = Path(config.get('cache.dir', './conversion_cache'))
+    if not use_cache:
+        cache_dir = None
+    incremental = incremental or config.get('defaults.incremental', False)
+    shard_threshold_pages = config.get('sharding.threshold_pages', 300)
+    shard_pages = config.get('sharding.shard_pages', 100)
+    window_pages = config.get('streaming.window_pages', 0)
+    serialization = config.get('mineru_options.serialization', DEFAULT_SERIALIZATION)
+    try:
+        serialization = Serializer.parse(serialization).spec
+    except ValueError as e:
+        print(f"错误：{e}")
+        sys.exit(1)
+    longest_first = config.get('scheduling.longest_first', True)
+    triage = config.get('triage.enabled', True)
     
     # 关机设置
     shutdown_enabled = shutdown or config.get('shutdown.enabled', False)
@@ -286,7 +341,20 @@ def main(
     print(f"输出目录: {output_dir}")
     print(f"使用GPU: {'是' if use_gpu else '否'}")
     print(f"并发数: {workers}")
+    print(f"常驻模型进程池: {'是' if use_worker_pool else '否'}")
+    print(f"进程池: {'是' if use_processes else '否'}")
+    print(f"批量推理页数: {batch_pages if batch_pages > 0 else '否'}")
+    print(f"输出配置档: {output_profile}")
+    print(f"JSON产物编码: {serialization}")
+    print(f"结果缓存: {cache_dir if cache_dir else '否'}")
+    print(f"增量模式: {'是' if incremental else '否'}")
+    if shard_threshold_pages > 0:
+        print(f"大文档分片: 超过 {shard_threshold_pages} 页时每 {shard_pages} 页一片")
+    if window_pages > 0:
+        print(f"流式转换: 超过 {window_pages} 页的文档每 {window_pages} 页推理并写出一次")
     print(f"时间预估: {'是' if estimate_time else '否'}")
+    print(f"最长任务优先: {'是' if longest_first else '否'}")
+    print(f"预分类: {'是' if triage else '否'}")
     print(f"日志记录: {'是' if log_conversions else '否'}")
     print(f"自动关机: {'是' if shutdown_enabled else '否'}")
     if shutdown_enabled:
@@ -294,6 +362,16 @@ def main(
         print(f"  强制关机: {'是' if shutdown_force else '否'}")
     print()
     
+    logger = ConversionLogger(Path(config.get('paths.log_dir', './logs'))) if log_conversions else None
+    
+    # 学习型时间预估：用历史转换记录拟合，转换过程中继续在线更新
+    estimator = None
+    if estimate_time:
+        estimator = LearnedTimeEstimator(config.config)
+        if logger is not None:
+            samples = estimator.fit_from_log(logger)
+            print(f"时间预估模型: 已从历史记录学习 {samples} 个样本")
+    
     # 开始转换
     try:
         successful, failed, total_duration = process_pdfs_batch(
@@ -301,7 +379,24 @@ def main(
             output_dir=output_dir,
             use_gpu=use_gpu,
             workers=workers,
-            logger=None
+            logger=logger,
+            use_worker_pool=use_worker_pool,
+            formula_enable=config.get('mineru_options.formula_enable', True),
+            table_enable=config.get('mineru_options.table_enable', True),
+            batch_pages=batch_pages,
+            cache_dir=cache_dir,
+            cache_max_size_mb=config.get('cache.max_size_mb', 10240),
+            incremental=incremental,
+            shard_threshold_pages=shard_threshold_pages,
+            shard_pages=shard_pages,
+            use_processes=use_processes,
+            output_profile=output_profile,
+            estimator=estimator,
+            longest_first=longest_first,
+            schedule_window=config.get('scheduling.window', 0),
+            triage=triage,
+            window_pages=window_pages,
+            serialization=serialization
         )
         
         # 处理关机
@@ -337,5 +432,48 @@ def main(
         sys.exit(1)
 
 
+@click.command()
+@click.argument("docs", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--workers", "-w",
+    type=int,
+    default=1,
+    help="并行渲染的进程数"
+)
+@click.option(
+    "--output", "-o",
+    "output_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="调试PDF输出目录（默认放在几何信息文件旁）"
+)
+def render_debug(docs: Tuple[Path, ...], workers: int = 1, output_dir: Optional[Path] = None):
+    """为选定的文档渲染版面/span标注调试PDF
+
+    DOCS可以是转换输出的markdown、{name}_bbox 几何信息文件或输出目录（递归查找）。
+    """
+    from .debug_render import render_debug_pdfs
+
+    start_time = time.time()
+    results = render_debug_pdfs(docs, workers=workers, output_dir=output_dir)
+    for result in results:
+        if result.success:
+            print(f"✓ {result.geometry_path.name} -> {', '.join(p.name for p in result.outputs)} ({result.duration:.1f}s)")
+        else:
+            print(f"✗ {result.geometry_path.name}: {result.error_message}")
+
+    failed = sum(1 for r in results if not r.success)
+    print(f"渲染完成: 成功 {len(results) - failed} 个，失败 {failed} 个，耗时 {time.time() - start_time:.1f}s")
+    if failed or not results:
+        sys.exit(1)
+
+
+def cli():
+    """命令行入口：pdf2md render-debug ... 渲染调试PDF，其余参数交给转换命令"""
+    if len(sys.argv) > 1 and sys.argv[1] == "render-debug":
+        render_debug(args=sys.argv[2:], prog_name="pdf2md render-debug")
+    else:
+        main()
+
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    cli()
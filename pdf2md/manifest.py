@@ -0,0 +1,184 @@
+"""
+增量同步清单模块
+记录每个已转换PDF的源文件信息和输出路径，用于跳过未变化的文件并清理已删除源文件的输出
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .utils import get_file_hash
+
+
+MANIFEST_FILENAME = ".pdf2md_manifest.jsonl"
+
+
+class ConversionManifest:
+    """转换清单（追加写入的JSONL，结束时压缩）"""
+
+    def __init__(self, output_dir: Path, input_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.input_dir = Path(input_dir)
+        self.manifest_path = self.output_dir / MANIFEST_FILENAME
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """加载清单，同一源文件以最后一条记录为准"""
+        entries: Dict[str, Dict[str, Any]] = {}
+        if not self.manifest_path.exists():
+            return entries
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 忽略中断写入留下的残行
+                        continue
+                    source = record.get("source")
+                    if not source:
+                        continue
+                    if record.get("deleted"):
+                        entries.pop(source, None)
+                    else:
+                        entries[source] = record
+        except Exception as e:
+            print(f"警告：加载转换清单失败: {e}")
+        return entries
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """追加一条记录"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def source_key(self, file_path: Path) -> str:
+        """源文件在清单中的键（相对输入目录的路径）"""
+        try:
+            return Path(file_path).relative_to(self.input_dir).as_posix()
+        except ValueError:
+            return Path(file_path).as_posix()
+
+    def needs_conversion(self, file_path: Path, fingerprint: str) -> bool:
+        """判断文件是否需要（重新）转换
+
+        大小和修改时间都未变时直接跳过；只有修改时间变化时再比较内容哈希，
+        内容相同则只更新清单中的修改时间。
+        """
+        entry = self.entries.get(self.source_key(file_path))
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return True
+
+        output_path = entry.get("output_path")
+        if not output_path or not (self.output_dir / output_path).exists():
+            return True
+
+        try:
+            stat = Path(file_path).stat()
+        except OSError:
+            return True
+
+        if stat.st_size != entry.get("size"):
+            return True
+        if stat.st_mtime == entry.get("mtime"):
+            return False
+
+        try:
+            if get_file_hash(file_path) != entry.get("hash"):
+                return True
+        except OSError:
+            return True
+
+        with self._lock:
+            updated = dict(entry, mtime=stat.st_mtime)
+            self.entries[updated["source"]] = updated
+            self._append(updated)
+        return False
+
+    def record(self, file_path: Path, output_path: Path, fingerprint: str,
+               file_hash: Optional[str] = None, extra_paths: Iterable[Path] = ()) -> None:
+        """记录一次成功的转换"""
+        stat = Path(file_path).stat()
+        record = {
+            "source": self.source_key(file_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "hash": file_hash or get_file_hash(file_path),
+            "fingerprint": fingerprint,
+            "output_path": self._relative_output(output_path),
+            "extra_paths": [self._relative_output(p) for p in extra_paths],
+            "converted_at": time.time()
+        }
+        with self._lock:
+            self.entries[record["source"]] = record
+            self._append(record)
+
+    def _relative_output(self, path: Path) -> str:
+        """输出路径以相对输出目录的形式保存，便于整体移动输出目录"""
+        try:
+            return Path(path).relative_to(self.output_dir).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def remove_orphans(self, existing_files: Iterable[Path]) -> List[str]:
+        """删除源PDF已不存在的输出，返回被清理的源文件键
+
+        同目录文档共用的图片只有在没有其他文档引用时才删除。
+        """
+        existing = {self.source_key(f) for f in existing_files}
+        removed = []
+
+        with self._lock:
+            orphans = [s for s in self.entries if s not in existing]
+            referenced = {
+                rel_path
+                for source, entry in self.entries.items() if source in existing
+                for rel_path in [entry.get("output_path")] + entry.get("extra_paths", [])
+            }
+            for source in orphans:
+                entry = self.entries.pop(source)
+                for rel_path in [entry.get("output_path")] + entry.get("extra_paths", []):
+                    if rel_path and rel_path not in referenced:
+                        self._remove_output(self.output_dir / rel_path)
+                self._append({"source": source, "deleted": True})
+                removed.append(source)
+
+        return removed
+
+    def _remove_output(self, path: Path) -> None:
+        """删除输出文件或目录，并清理留下的空目录"""
+        try:
+            if path.is_dir():
+                import shutil
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
+        except OSError as e:
+            print(f"警告：删除输出失败 {path}: {e}")
+            return
+
+        parent = path.parent
+        while parent != self.output_dir and self.output_dir in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+    def compact(self) -> None:
+        """用当前状态重写清单，去掉被覆盖的历史记录"""
+        with self._lock:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_suffix(".jsonl.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.manifest_path)
@@ -3,171 +3,456 @@
 Mineru wrapper module for PDF to Markdown conversion.
 """
 
-import copy
-import json
 import os
+from collections import deque
+from contextlib import nullcontext
 from pathlib import Path
-import fitz
 import io
 from typing import Union, List, Tuple, Optional
 
 from loguru import logger
 
-from mineru.cli.common import convert_pdf_bytes_to_bytes_by_pypdfium2, prepare_env, read_fn
-from mineru.data.data_reader_writer import FileBasedDataWriter
-from mineru.utils.draw_bbox import draw_layout_bbox, draw_span_bbox
+from mineru.cli.common import prepare_env
+from mineru.data.data_reader_writer import DataWriter, FileBasedDataWriter
 from mineru.utils.enum_class import MakeMode
-from mineru.backend.vlm.vlm_analyze import doc_analyze as vlm_doc_analyze
+from mineru.backend.vlm.vlm_analyze import ModelSingleton as VlmModelSingleton, doc_analyze as vlm_doc_analyze
+from mineru.backend.vlm.token_to_middle_json import result_to_middle_json as vlm_result_to_middle_json
 from mineru.backend.pipeline.pipeline_analyze import doc_analyze as pipeline_doc_analyze
-from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make as pipeline_union_make
 from mineru.backend.pipeline.model_json_to_middle_json import result_to_middle_json as pipeline_result_to_middle_json
-from mineru.backend.vlm.vlm_middle_json_mkcontent import union_make as vlm_union_make
 from mineru.utils.models_download_utils import auto_download_and_get_model_root_path
+from mineru.utils.pdf_image_tools import load_images_from_pdf
 from mineru import parse_doc
 
+from .config import config
+from .content_make import STRUCTURED_NAME, ContentFlavour, ContentMaker, content_flavour
+from .debug_render import render_request, save_geometry
+from .output_profiles import get_output_flags
+from .output_writer import DEFAULT_IO_WORKERS, DEFAULT_MAX_PENDING_MB, AsyncOutputWriter
+from .pdf_source import PdfSource, as_pdf_source
+from .serialization import DEFAULT_SERIALIZATION, Serializer
+from .streaming import StreamingOutput, group_documents, page_windows, write_json_array
+from .vlm_client import ConcurrentVlmClient, VlmClientOptions
+
+
+class NullDataWriter(DataWriter):
+    """丢弃写入内容的DataWriter，用于不保留图片的输出配置档"""
+
+    def write(self, path: str, data: bytes) -> None:
+        pass
+
+
+class QueuedDataWriter(DataWriter):
+    """把写入交给AsyncOutputWriter的DataWriter，排队的数据按字节数计入背压上限"""
+
+    def __init__(self, writer: DataWriter, output: AsyncOutputWriter):
+        self.writer = writer
+        self.output = output
+
+    def write(self, path: str, data: bytes) -> None:
+        self.output.submit(self.writer.write, path, data, cost=len(data))
+
+
+def _submit_document_outputs(
+    output: AsyncOutputWriter,
+    serializer: Serializer,
+    flavour: ContentFlavour,
+    local_image_dir: str,
+    local_md_dir: str,
+    pdf_file_name: str,
+    middle_json: dict,
+    f_dump_md: bool,
+    f_dump_content_list: bool,
+    f_dump_structured_json: bool,
+    f_dump_middle_json: bool,
+    f_make_md_mode
+) -> None:
+    """把markdown拼装和JSON产物序列化交给I/O线程
+
+    这些任务只读取middle_json，提交后推理线程不再修改它，可以在多个I/O线程中同时进行。
+    markdown、content_list和结构化JSON由一次遍历同时生成。
+    """
+    maker = ContentMaker(
+        flavour,
+        make_md_mode=f_make_md_mode,
+        img_buket_path=str(os.path.basename(local_image_dir)),
+        markdown=f_dump_md,
+        content_list=f_dump_content_list,
+        structured=f_dump_structured_json
+    )
+
+    def write_content():
+        content = maker.make(middle_json["pdf_info"])
+        if content.markdown is not None:
+            FileBasedDataWriter(local_md_dir).write_string(f"{pdf_file_name}.md", content.markdown)
+        if content.content_list is not None:
+            serializer.dump(content.content_list, serializer.path_for(local_md_dir, f"{pdf_file_name}_content_list"))
+        if content.structured is not None:
+            serializer.dump(content.structured, serializer.path_for(local_md_dir, f"{pdf_file_name}_{STRUCTURED_NAME}"))
+
+    if f_dump_md or f_dump_content_list or f_dump_structured_json:
+        output.submit(write_content)
+    if f_dump_middle_json:
+        output.submit(serializer.dump, middle_json, serializer.path_for(local_md_dir, f"{pdf_file_name}_middle"))
+
+
+def _vlm_client(backend: str, server_url: Optional[str], options: Optional[VlmClientOptions]) -> Optional[ConcurrentVlmClient]:
+    """sglang-client后端的并发客户端，请求体使用mineru的提示词和默认采样参数；其他后端或未启用时返回None"""
+    if backend != "sglang-client" or options is None or not options.enabled:
+        return None
+    # 通过mineru创建predictor完成服务健康检查，并取得提示词和采样参数
+    predictor = VlmModelSingleton().get_model(backend, None, server_url)
+    prompt = predictor.build_prompt("")
+    sampling_params = predictor.build_sampling_params(None, None, None, None, None, None, None)
+
+    def build_body(image_base64: str) -> dict:
+        return {"text": prompt, "image_data": image_base64, "sampling_params": sampling_params, "modalities": ["image"]}
+
+    return ConcurrentVlmClient(predictor.server_url, build_body, options)
+
+
+def _vlm_submit(client: ConcurrentVlmClient, pdf_bytes: bytes):
+    """渲染页面并提交全部页面请求，返回 analyze(image_writer) -> (middle_json, 模型输出)，调用时才等待请求结果"""
+    images_list, pdf_doc = load_images_from_pdf(pdf_bytes)
+    futures = client.submit_pages([image["img_base64"] for image in images_list])
+
+    def analyze(image_writer):
+        results = [future.result() for future in futures]
+        return vlm_result_to_middle_json(results, images_list, pdf_doc, image_writer), results
+
+    return analyze
+
+
+def _iter_vlm_documents(sources, start_page_id, end_page_id, backend, server_url, client, lookahead_docs):
+    """按顺序产出 (idx, pdf_bytes, full_document, analyze)
+
+    有并发客户端时，当前文档之后lookahead_docs个文档的页面提前渲染并提交，与当前文档的请求同时在途；
+    否则由mineru逐个文档请求。
+    """
+    pending = deque()
+    for idx, source in enumerate(sources):
+        pdf_bytes = source.range_bytes(start_page_id, end_page_id)
+        full_document = source.covers(start_page_id, end_page_id)
+        if client is None:
+            def analyze(image_writer, pdf_bytes=pdf_bytes):
+                return vlm_doc_analyze(pdf_bytes, image_writer=image_writer, backend=backend, server_url=server_url)
+            yield idx, pdf_bytes, full_document, analyze
+            continue
+        pending.append((idx, pdf_bytes, full_document, _vlm_submit(client, pdf_bytes)))
+        if len(pending) > lookahead_docs:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
 
 def do_parse(
     output_dir,  # Output directory for storing parsing results
     pdf_file_names: list[str],  # List of PDF file names to be parsed
-    pdf_bytes_list: list[bytes],  # List of PDF bytes to be parsed
+    pdf_bytes_list: list,  # List of PdfSource handles (or PDF bytes) to be parsed
     p_lang_list: list[str],  # List of languages for each PDF, default is 'ch' (Chinese)
     backend="pipeline",  # The backend for parsing PDF, default is 'pipeline'
     parse_method="auto",  # The method for parsing PDF, default is 'auto'
     p_formula_enable=True,  # Enable formula parsing
     p_table_enable=True,  # Enable table parsing
     server_url=None,  # Server URL for vlm-sglang-client backend
-    f_draw_layout_bbox=True,  # Whether to draw layout bounding boxes
-    f_draw_span_bbox=True,  # Whether to draw span bounding boxes
+    f_draw_layout_bbox=True,  # Whether to keep layout bbox geometry for `pdf2md render-debug`
+    f_draw_span_bbox=True,  # Whether to keep span bbox geometry for `pdf2md render-debug`
     f_dump_md=True,  # Whether to dump markdown files
     f_dump_middle_json=True,  # Whether to dump middle JSON files
     f_dump_model_output=True,  # Whether to dump model output files
     f_dump_orig_pdf=True,  # Whether to dump original PDF files
     f_dump_content_list=True,  # Whether to dump content list files
+    f_dump_structured_json=False,  # Whether to dump the structured JSON (content list with markdown and section paths)
+    f_dump_images=True,  # Whether to write extracted images (the markdown links to them)
     f_make_md_mode=MakeMode.MM_MD,  # The mode for making markdown content, default is MM_MD
     start_page_id=0,  # Start page ID for parsing, default is 0
     end_page_id=None,  # End page ID for parsing, default is None (parse all pages until the end of the document)
+    window_pages=0,  # Documents with more pages than this are parsed and written window by window, 0 disables
+    serializer=None,  # Serializer (or spec such as "compact+gzip") for the middle/content_list/model dumps
+    io_workers=DEFAULT_IO_WORKERS,  # Threads writing images, markdown and JSON dumps while inference continues
+    max_pending_mb=DEFAULT_MAX_PENDING_MB,  # Queued output above this size blocks inference until writes catch up
+    vlm_client_options=None,  # VlmClientOptions for concurrent vlm-sglang-client page requests across documents, None disables
 ):
 
-    if backend == "pipeline":
-        for idx, pdf_bytes in enumerate(pdf_bytes_list):
-            new_pdf_bytes = convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_bytes, start_page_id, end_page_id)
-            pdf_bytes_list[idx] = new_pdf_bytes
-
-        infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list = pipeline_doc_analyze(pdf_bytes_list, p_lang_list, parse_method=parse_method, formula_enable=p_formula_enable,table_enable=p_table_enable)
-
-        for idx, model_list in enumerate(infer_results):
-            model_json = copy.deepcopy(model_list)
-            pdf_file_name = pdf_file_names[idx]
-            local_image_dir, local_md_dir = prepare_env(output_dir, pdf_file_name, parse_method)
-            image_writer, md_writer = FileBasedDataWriter(local_image_dir), FileBasedDataWriter(local_md_dir)
-
-            images_list = all_image_lists[idx]
-            pdf_doc = all_pdf_docs[idx]
-            _lang = lang_list[idx]
-            _ocr_enable = ocr_enabled_list[idx]
-            middle_json = pipeline_result_to_middle_json(model_list, images_list, pdf_doc, image_writer, _lang, _ocr_enable, p_formula_enable)
-
-            pdf_info = middle_json["pdf_info"]
-
-            pdf_bytes = pdf_bytes_list[idx]
-            if f_draw_layout_bbox:
-                draw_layout_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_layout.pdf")
-
-            if f_draw_span_bbox:
-                draw_span_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_span.pdf")
-
-            if f_dump_orig_pdf:
-                md_writer.write(
-                    f"{pdf_file_name}_origin.pdf",
-                    pdf_bytes,
-                )
-
-            if f_dump_md:
-                image_dir = str(os.path.basename(local_image_dir))
-                md_content_str = pipeline_union_make(pdf_info, f_make_md_mode, image_dir)
-                md_writer.write_string(
-                    f"{pdf_file_name}.md",
-                    str(md_content_str),
-                )
-
-            if f_dump_content_list:
-                image_dir = str(os.path.basename(local_image_dir))
-                content_list = pipeline_union_make(pdf_info, MakeMode.CONTENT_LIST, image_dir)
-                md_writer.write_string(
-                    f"{pdf_file_name}_content_list.json",
-                    json.dumps(content_list, ensure_ascii=False, indent=4),
-                )
-
-            if f_dump_middle_json:
-                md_writer.write_string(
-                    f"{pdf_file_name}_middle.json",
-                    json.dumps(middle_json, ensure_ascii=False, indent=4),
-                )
+    sources = [as_pdf_source(item) for item in pdf_bytes_list]
+    if not isinstance(serializer, Serializer):
+        serializer = Serializer.parse(serializer)
+
+    if window_pages > 0:
+        # 超过窗口页数的文档逐个分窗口流式转换，其余文档照常一起推理
+        regular = []
+        for idx, source in enumerate(sources):
+            first_page, last_page = _requested_pages(source, start_page_id, end_page_id)
+            if last_page - first_page + 1 <= window_pages:
+                regular.append(idx)
+                continue
+            do_parse_windowed(
+                output_dir, pdf_file_names[idx], source, p_lang_list[idx],
+                backend=backend,
+                parse_method=parse_method,
+                p_formula_enable=p_formula_enable,
+                p_table_enable=p_table_enable,
+                server_url=server_url,
+                window_pages=window_pages,
+                f_draw_layout_bbox=f_draw_layout_bbox,
+                f_draw_span_bbox=f_draw_span_bbox,
+                f_dump_md=f_dump_md,
+                f_dump_middle_json=f_dump_middle_json,
+                f_dump_model_output=f_dump_model_output,
+                f_dump_orig_pdf=f_dump_orig_pdf,
+                f_dump_content_list=f_dump_content_list,
+                f_dump_structured_json=f_dump_structured_json,
+                f_dump_images=f_dump_images,
+                f_make_md_mode=f_make_md_mode,
+                start_page_id=start_page_id,
+                end_page_id=end_page_id,
+                serializer=serializer,
+                io_workers=io_workers,
+                max_pending_mb=max_pending_mb,
+                vlm_client_options=vlm_client_options,
+            )
+            source.release()
+        if not regular:
+            return
+        pdf_file_names = [pdf_file_names[idx] for idx in regular]
+        sources = [sources[idx] for idx in regular]
+        p_lang_list = [p_lang_list[idx] for idx in regular]
 
-            if f_dump_model_output:
-                md_writer.write_string(
-                    f"{pdf_file_name}_model.json",
-                    json.dumps(model_json, ensure_ascii=False, indent=4),
+    if backend == "pipeline":
+        # 按mineru的推理批大小把文档分组逐组推理：I/O线程写出上一组的产物时，推理线程已经在处理下一组；
+        # 每组页数不少于一个推理批，跨文档批量推理的效率不变
+        page_counts = [
+            last_page - first_page + 1
+            for first_page, last_page in (_requested_pages(source, start_page_id, end_page_id) for source in sources)
+        ]
+        groups = group_documents(page_counts, _pipeline_group_pages())
+
+        # 图片、markdown和JSON产物由I/O线程写出，推理线程提交后继续处理下一组文档；退出前等待全部写完
+        with AsyncOutputWriter(io_workers, max_pending_mb) as output:
+            for group in groups:
+                # 请求整份文档时直接使用原内容，只有页码范围才需要pypdfium2重新编码
+                full_documents = [sources[idx].covers(start_page_id, end_page_id) for idx in group]
+                pdf_bytes_list = [sources[idx].range_bytes(start_page_id, end_page_id) for idx in group]
+
+                infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list = pipeline_doc_analyze(
+                    pdf_bytes_list, [p_lang_list[idx] for idx in group],
+                    parse_method=parse_method, formula_enable=p_formula_enable, table_enable=p_table_enable
                 )
 
-            logger.info(f"local output dir is {local_md_dir}")
+                for pos, idx in enumerate(group):
+                    model_list = infer_results[pos]
+                    source = sources[idx]
+                    pdf_file_name = pdf_file_names[idx]
+                    local_image_dir, local_md_dir = prepare_env(output_dir, pdf_file_name, parse_method)
+                    image_writer = QueuedDataWriter(FileBasedDataWriter(local_image_dir), output) if f_dump_images else NullDataWriter()
+
+                    if f_dump_model_output:
+                        # pipeline_result_to_middle_json会修改模型输出，在此之前逐页写出，不需要深拷贝（因此不能交给I/O线程）
+                        write_json_array(serializer.path_for(local_md_dir, f"{pdf_file_name}_model"), model_list, serializer)
+
+                    middle_json = pipeline_result_to_middle_json(
+                        model_list, all_image_lists[pos], all_pdf_docs[pos], image_writer, lang_list[pos], ocr_enabled_list[pos], p_formula_enable
+                    )
+
+                    pdf_info = middle_json["pdf_info"]
+
+                    pdf_bytes = pdf_bytes_list[pos]
+                    if f_draw_layout_bbox or f_draw_span_bbox:
+                        # 只保存标注几何信息，调试PDF由 pdf2md render-debug 按需渲染
+                        request = render_request(source, "pipeline", start_page_id, end_page_id, f_draw_layout_bbox, f_draw_span_bbox)
+                        output.submit(save_geometry, serializer, local_md_dir, pdf_file_name, pdf_info, request)
+
+                    # 没有原PDF路径时渲染调试PDF需要转储的 _origin.pdf
+                    if f_dump_orig_pdf or ((f_draw_layout_bbox or f_draw_span_bbox) and source.path is None):
+                        output.submit(
+                            source.dump, Path(local_md_dir) / f"{pdf_file_name}_origin.pdf", pdf_bytes, full_documents[pos],
+                            cost=len(pdf_bytes)
+                        )
+
+                    _submit_document_outputs(
+                        output, serializer, content_flavour("pipeline"), local_image_dir, local_md_dir, pdf_file_name, middle_json,
+                        f_dump_md, f_dump_content_list, f_dump_structured_json, f_dump_middle_json, f_make_md_mode
+                    )
+
+                    logger.info(f"local output dir is {local_md_dir}")
+
+                # 本组的模型输出、渲染图片和PDF内容不再需要（排队中的写入任务持有各自需要的数据）
+                del infer_results, all_image_lists, all_pdf_docs, pdf_bytes_list
+                for idx in group:
+                    sources[idx].release()
     else:
         if backend.startswith("vlm-"):
             backend = backend[4:]
 
         f_draw_span_bbox = False
         parse_method = "vlm"
-        for idx, pdf_bytes in enumerate(pdf_bytes_list):
-            pdf_file_name = pdf_file_names[idx]
-            pdf_bytes = convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_bytes, start_page_id, end_page_id)
-            local_image_dir, local_md_dir = prepare_env(output_dir, pdf_file_name, parse_method)
-            image_writer, md_writer = FileBasedDataWriter(local_image_dir), FileBasedDataWriter(local_md_dir)
-            middle_json, infer_result = vlm_doc_analyze(pdf_bytes, image_writer=image_writer, backend=backend, server_url=server_url)
-
-            pdf_info = middle_json["pdf_info"]
+        client = _vlm_client(backend, server_url, vlm_client_options)
+        lookahead_docs = vlm_client_options.lookahead_docs if client is not None else 0
+        with AsyncOutputWriter(io_workers, max_pending_mb) as output, client or nullcontext():
+            documents = _iter_vlm_documents(sources, start_page_id, end_page_id, backend, server_url, client, lookahead_docs)
+            for idx, pdf_bytes, full_document, analyze in documents:
+                source = sources[idx]
+                pdf_file_name = pdf_file_names[idx]
+                local_image_dir, local_md_dir = prepare_env(output_dir, pdf_file_name, parse_method)
+                image_writer = QueuedDataWriter(FileBasedDataWriter(local_image_dir), output) if f_dump_images else NullDataWriter()
+                md_writer = FileBasedDataWriter(local_md_dir)
+                middle_json, infer_result = analyze(image_writer)
+
+                pdf_info = middle_json["pdf_info"]
+
+                if f_draw_layout_bbox:
+                    request = render_request(source, "vlm", start_page_id, end_page_id, f_draw_layout_bbox, False)
+                    output.submit(save_geometry, serializer, local_md_dir, pdf_file_name, pdf_info, request)
+
+                if f_dump_orig_pdf or (f_draw_layout_bbox and source.path is None):
+                    output.submit(
+                        source.dump, Path(local_md_dir) / f"{pdf_file_name}_origin.pdf", pdf_bytes, full_document,
+                        cost=len(pdf_bytes)
+                    )
+
+                _submit_document_outputs(
+                    output, serializer, content_flavour("vlm"), local_image_dir, local_md_dir, pdf_file_name, middle_json,
+                    f_dump_md, f_dump_content_list, f_dump_structured_json, f_dump_middle_json, f_make_md_mode
+                )
 
-            if f_draw_layout_bbox:
-                draw_layout_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_layout.pdf")
+                if f_dump_model_output:
+                    model_output = ("\n" + "-" * 50 + "\n").join(infer_result)
+                    output.submit(md_writer.write_string, f"{pdf_file_name}_model_output.txt", model_output)
+
+                logger.info(f"local output dir is {local_md_dir}")
+                # 逐个文档解析，处理完立即释放，不让整批文档的内容同时留在内存中（排队中的写入任务持有各自需要的数据）
+                del pdf_bytes, analyze
+                source.release()
+
+
+def _pipeline_group_pages() -> int:
+    """每组文档的最少页数：与mineru的推理批大小（MINERU_MIN_BATCH_INFERENCE_SIZE，默认100）一致"""
+    return max(1, int(os.environ.get('MINERU_MIN_BATCH_INFERENCE_SIZE', 100)))
+
+
+def _requested_pages(source: PdfSource, start_page_id: int, end_page_id: Optional[int]) -> Tuple[int, int]:
+    """实际解析的首页和末页（包含），与mineru对end_page_id的处理一致"""
+    last_page = source.page_count() - 1
+    if end_page_id is not None and end_page_id >= 0:
+        last_page = min(end_page_id, last_page)
+    return start_page_id, last_page
+
+
+def do_parse_windowed(
+    output_dir,
+    pdf_file_name: str,
+    source: PdfSource,
+    lang: str,
+    backend="pipeline",
+    parse_method="auto",
+    p_formula_enable=True,
+    p_table_enable=True,
+    server_url=None,
+    window_pages=100,
+    f_draw_layout_bbox=True,
+    f_draw_span_bbox=True,
+    f_dump_md=True,
+    f_dump_middle_json=True,
+    f_dump_model_output=True,
+    f_dump_orig_pdf=True,
+    f_dump_content_list=True,
+    f_dump_structured_json=False,
+    f_dump_images=True,
+    f_make_md_mode=MakeMode.MM_MD,
+    start_page_id=0,
+    end_page_id=None,
+    serializer=None,
+    io_workers=DEFAULT_IO_WORKERS,
+    max_pending_mb=DEFAULT_MAX_PENDING_MB,
+    vlm_client_options=None,
+):
+    """按页码窗口流式转换一个文档，输出文件与do_parse相同
 
-            if f_draw_span_bbox:
-                draw_span_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_span.pdf")
+    每个窗口推理完立即追加写出markdown、content_list、middle.json、模型输出和标注几何信息，图片随窗口写出，
+    窗口的模型输出、渲染图片和PDF内容释放后才推理下一个窗口。图片交给I/O线程写出，其余产物按窗口顺序追加。
+    PDF文件只按路径打开一次，页数、各窗口的页面和转储的原PDF都来自这个句柄，不物化整个文件，内存不随文件大小增长。
+    """
+    vlm = backend != "pipeline"
+    if vlm:
+        if backend.startswith("vlm-"):
+            backend = backend[4:]
+        parse_method = "vlm"
 
-            if f_dump_orig_pdf:
-                md_writer.write(
-                    f"{pdf_file_name}_origin.pdf",
-                    pdf_bytes,
+    local_image_dir, local_md_dir = prepare_env(output_dir, pdf_file_name, parse_method)
+    # 章节路径跨窗口延续，整个文档使用同一个ContentMaker
+    maker = ContentMaker(
+        content_flavour("vlm" if vlm else "pipeline"),
+        make_md_mode=f_make_md_mode,
+        img_buket_path=str(os.path.basename(local_image_dir)),
+        markdown=f_dump_md,
+        content_list=f_dump_content_list,
+        structured=f_dump_structured_json
+    )
+    first_page, last_page = _requested_pages(source, start_page_id, end_page_id)
+    keep_geometry = f_draw_layout_bbox or (f_draw_span_bbox and not vlm)
+    geometry = None
+    if keep_geometry:
+        geometry = render_request(
+            source, "vlm" if vlm else "pipeline", start_page_id, end_page_id, f_draw_layout_bbox, f_draw_span_bbox
+        )
+
+    client = _vlm_client(backend, server_url, vlm_client_options) if vlm else None
+    with AsyncOutputWriter(io_workers, max_pending_mb) as images, client or nullcontext(), StreamingOutput(
+        Path(local_md_dir),
+        pdf_file_name,
+        dump_md=f_dump_md,
+        dump_content_list=f_dump_content_list,
+        dump_structured_json=f_dump_structured_json,
+        dump_middle_json=f_dump_middle_json,
+        dump_model_output=f_dump_model_output,
+        model_output_as_text=vlm,
+        serializer=serializer,
+        geometry=geometry
+    ) as output:
+        image_writer = QueuedDataWriter(FileBasedDataWriter(local_image_dir), images) if f_dump_images else NullDataWriter()
+        for window_start, window_end in page_windows(first_page, last_page, window_pages):
+            pdf_bytes = source.range_bytes(window_start, window_end)
+            if vlm:
+                if client is not None:
+                    middle_json, model_output = _vlm_submit(client, pdf_bytes)(image_writer)
+                else:
+                    middle_json, model_output = vlm_doc_analyze(pdf_bytes, image_writer=image_writer, backend=backend, server_url=server_url)
+                output.write_model_output(model_output, window_start)
+            else:
+                infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list = pipeline_doc_analyze(
+                    [pdf_bytes], [lang], parse_method=parse_method, formula_enable=p_formula_enable, table_enable=p_table_enable
                 )
-
-            if f_dump_md:
-                image_dir = str(os.path.basename(local_image_dir))
-                md_content_str = vlm_union_make(pdf_info, f_make_md_mode, image_dir)
-                md_writer.write_string(
-                    f"{pdf_file_name}.md",
-                    str(md_content_str),
+                model_output = infer_results[0]
+                # 在生成middle_json修改模型输出之前写出，不需要深拷贝
+                output.write_model_output(model_output, window_start)
+                middle_json = pipeline_result_to_middle_json(
+                    model_output, all_image_lists[0], all_pdf_docs[0], image_writer, lang_list[0], ocr_enabled_list[0], p_formula_enable
                 )
+                del infer_results, all_image_lists, all_pdf_docs
 
-            if f_dump_content_list:
-                image_dir = str(os.path.basename(local_image_dir))
-                content_list = vlm_union_make(pdf_info, MakeMode.CONTENT_LIST, image_dir)
-                md_writer.write_string(
-                    f"{pdf_file_name}_content_list.json",
-                    json.dumps(content_list, ensure_ascii=False, indent=4),
-                )
+            pdf_info = middle_json["pdf_info"]
+            output.write_content(maker.make(pdf_info), window_start)
+            output.write_middle(middle_json, window_start)
 
-            if f_dump_middle_json:
-                md_writer.write_string(
-                    f"{pdf_file_name}_middle.json",
-                    json.dumps(middle_json, ensure_ascii=False, indent=4),
-                )
+            # 释放本窗口的模型输出、渲染图片和PDF内容后再处理下一个窗口
+            del pdf_bytes, model_output, middle_json, pdf_info
+            logger.info(f"{pdf_file_name}: 第 {window_start + 1}-{window_end + 1} 页已写出")
 
-            if f_dump_model_output:
-                model_output = ("\n" + "-" * 50 + "\n").join(infer_result)
-                md_writer.write_string(
-                    f"{pdf_file_name}_model_output.txt",
-                    model_output,
-                )
+    if f_dump_orig_pdf or (keep_geometry and source.path is None):
+        source.dump_pages(Path(local_md_dir) / f"{pdf_file_name}_origin.pdf", first_page, last_page)
 
-            logger.info(f"local output dir is {local_md_dir}")
+    logger.info(f"local output dir is {local_md_dir}")
+
+
+def _vlm_client_options() -> VlmClientOptions:
+    """从配置读取VLM并发客户端参数"""
+    defaults = VlmClientOptions()
+    return VlmClientOptions(
+        max_in_flight=config.get('vlm_client.max_in_flight', defaults.max_in_flight),
+        retries=config.get('vlm_client.retries', defaults.retries),
+        backoff=config.get('vlm_client.backoff', defaults.backoff),
+        timeout=config.get('vlm_client.timeout', defaults.timeout),
+        lookahead_docs=config.get('vlm_client.lookahead_docs', defaults.lookahead_docs)
+    )
 
 
 def parse_doc(
@@ -178,7 +463,16 @@ def parse_doc(
         method="auto",
         server_url=None,
         start_page_id=0,  # Start page ID for parsing, default is 0
-        end_page_id=None  # End page ID for parsing, default is None (parse all pages until the end of the document)
+        end_page_id=None,  # End page ID for parsing, default is None (parse all pages until the end of the document)
+        formula_enable=True,  # Enable formula parsing
+        table_enable=True,  # Enable table parsing
+        output_profile="full-debug",  # Which artefacts to write, see pdf2md.output_profiles
+        window_pages=0,  # Stream documents longer than this many pages window by window, 0 disables
+        serialization=DEFAULT_SERIALIZATION,  # Encoding of the JSON dumps, see pdf2md.serialization
+        io_workers=None,  # Output writer threads, default output_writer.workers from the config
+        max_pending_mb=None,  # Output writer backpressure limit, default output_writer.max_pending_mb from the config
+        vlm_client_options=None,  # VlmClientOptions for vlm-sglang-client, default vlm_client.* from the config
+        pypdf_fallback=True  # Fall back to pypdf when mineru fails; False re-raises the mineru error instead
 ):
     """
         Parameter description:
@@ -201,16 +495,31 @@ def parse_doc(
             Without method specified, 'auto' will be used by default.
             Adapted only for the case where the backend is set to "pipeline".
         server_url: When the backend is `sglang-client`, you need to specify the server_url, for example:`http://127.0.0.1:30000`
+        formula_enable / table_enable: Enable formula / table parsing. A warm worker pool loads its models
+            for one (lang, formula_enable, table_enable) combination, so pass the same values to reuse them.
+        output_profile: Named set of artefacts to write: md-only, md+images or full-debug (all of them).
+            Artefacts outside the profile are never rendered or serialised.
+        window_pages: Documents with more pages than this are inferred and written in windows of this many pages,
+            so peak memory is bounded by the window instead of the document length. 0 disables.
+        serialization: "format[+compression]" for the middle/content_list/model dumps: json (indented, as mineru writes it),
+            compact, orjson or msgpack, optionally +gzip or +zstd. Readers detect the encoding from the file itself.
+        io_workers / max_pending_mb: Images, markdown and JSON dumps are written by a thread pool while inference moves
+            on to the next document; once more than max_pending_mb of output is queued, inference waits for the writers.
+        vlm_client_options: With vlm-sglang-client, page requests of all documents share one client that keeps
+            max_in_flight requests in flight over keep-alive connections and retries failed pages with backoff.
+            max_in_flight 0 falls back to mineru's per-document requests.
+        pypdf_fallback: When mineru fails, convert every document in path_list with pypdf and swallow the error.
+            Pass False to get the exception instead (for callers that retry the documents one by one).
     """
     try:
+        output_flags = get_output_flags(output_profile)
         file_name_list = []
-        pdf_bytes_list = []
+        sources = []
         lang_list = []
         for path in path_list:
             file_name = str(Path(path).stem)
-            pdf_bytes = read_fn(path)
             file_name_list.append(file_name)
-            pdf_bytes_list.append(pdf_bytes)
+            sources.append(PdfSource(path))
             lang_list.append(lang)
         
         # 尝试使用mineru处理
@@ -218,15 +527,28 @@ def parse_doc(
             do_parse(
                 output_dir=output_dir,
                 pdf_file_names=file_name_list,
-                pdf_bytes_list=pdf_bytes_list,
+                pdf_bytes_list=sources,
                 p_lang_list=lang_list,
                 backend=backend,
                 parse_method=method,
+                p_formula_enable=formula_enable,
+                p_table_enable=table_enable,
                 server_url=server_url,
                 start_page_id=start_page_id,
-                end_page_id=end_page_id
+                end_page_id=end_page_id,
+                window_pages=window_pages,
+                serializer=Serializer.parse(serialization),
+                io_workers=io_workers if io_workers is not None else config.get('output_writer.workers', DEFAULT_IO_WORKERS),
+                max_pending_mb=(
+                    max_pending_mb if max_pending_mb is not None
+                    else config.get('output_writer.max_pending_mb', DEFAULT_MAX_PENDING_MB)
+                ),
+                vlm_client_options=vlm_client_options if vlm_client_options is not None else _vlm_client_options(),
+                **output_flags
             )
         except Exception as mineru_error:
+            if not pypdf_fallback:
+                raise
             logger.warning(f"mineru处理失败，尝试使用pypdf备选方案: {mineru_error}")
             
             # 使用pypdf作为备选方案
@@ -250,8 +572,13 @@ def parse_doc(
             except Exception as pypdf_error:
                 logger.error(f"pypdf备选方案也失败了: {pypdf_error}")
                 raise mineru_error
+        finally:
+            for source in sources:
+                source.close()
                 
     except Exception as e:
+        if not pypdf_fallback:
+            raise
         logger.exception(e)
 
 
@@ -272,17 +599,13 @@ def convert_pdf_to_markdown(
         Tuple[bool, str, Optional[List[str]]]: (是否成功, 消息, 生成的文件列表)
     """
     try:
-        # 读取 PDF 文件
-        with open(input_file, 'rb') as f:
-            pdf_bytes = f.read()
-            
-        # 使用 PyMuPDF 验证 PDF
-        pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        if not pdf_doc.is_pdf:
-            return False, "无效的 PDF 文件", None
-            
-        # 调用 mineru 进行转换
-        result = parse_doc(pdf_bytes)
+        # 只检查内存映射的文件头验证 PDF，不把整个文件读入内存再解析一遍
+        with PdfSource(input_file) as source:
+            if not source.looks_like_pdf():
+                return False, "无效的 PDF 文件", None
+
+            # 调用 mineru 进行转换
+            result = parse_doc(source.data())
         if not result:
             return False, "mineru 转换失败", None
             
@@ -310,7 +633,4 @@ def convert_pdf_to_markdown(
         
     except Exception as e:
         logger.error(f"转换过程中出错: {str(e)}")
-        return False, f"转换失败: {str(e)}", None
-    finally:
-        if 'pdf_doc' in locals():
-            pdf_doc.close() 
\ No newline at end of file
+        return False, f"转换失败: {str(e)}", None 
\ No newline at end of file
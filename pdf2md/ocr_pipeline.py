@@ -0,0 +1,162 @@
+"""
+并行OCR流水线模块
+后台渲染线程把页面渲染为位图放入有界队列，进程池中的Tesseract同时识别多页；
+渲染与识别重叠进行，队列深度和在途页数都有上限，内存占用不随文档页数增长
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Full, Queue
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from .page_extraction import iter_ordered
+from .worker_pool import create_process_executor
+
+logger = logging.getLogger(__name__)
+
+# 渲染队列结束标记
+_DONE = object()
+
+
+@dataclass
+class OcrOptions:
+    """OCR参数数据类"""
+    dpi: int = 200
+    grayscale: bool = True  # 灰度位图只有RGB的三分之一大小，对识别效果影响很小
+    lang: str = "eng+chi_sim"
+    workers: int = 0  # OCR进程数，0表示按CPU核心数
+    max_queued_pages: int = 0  # 已渲染等待识别的最大页数，0表示OCR进程数的两倍
+
+    def resolved_workers(self, page_count: int) -> int:
+        workers = self.workers if self.workers > 0 else (os.cpu_count() or 1)
+        return max(1, min(workers, page_count))
+
+    def resolved_queue_depth(self, workers: int) -> int:
+        return self.max_queued_pages if self.max_queued_pages > 0 else workers * 2
+
+
+@dataclass
+class RenderedPage:
+    """渲染后的页面位图（原始像素，可pickle发送到OCR进程）"""
+    page_num: int  # 页码，从1开始
+    mode: str  # PIL模式: L / RGB
+    width: int
+    height: int
+    stride: int
+    samples: bytes
+
+
+def render_pages(pdf_path: Path, page_indices: List[int], options: OcrOptions) -> Iterator[RenderedPage]:
+    """用PyMuPDF按指定DPI逐页渲染"""
+    import fitz
+
+    colorspace = fitz.csGRAY if options.grayscale else fitz.csRGB
+    doc = fitz.open(pdf_path)
+    try:
+        for index in page_indices:
+            pix = doc.load_page(index).get_pixmap(dpi=options.dpi, colorspace=colorspace, alpha=False)
+            yield RenderedPage(
+                page_num=index + 1,
+                mode="L" if options.grayscale else "RGB",
+                width=pix.width,
+                height=pix.height,
+                stride=pix.stride,
+                samples=pix.samples
+            )
+    finally:
+        doc.close()
+
+
+def ocr_rendered_page(page: RenderedPage, lang: str) -> Tuple[int, str]:
+    """识别一页位图（模块级函数，可被进程池pickle调用）；识别失败时返回空文本"""
+    try:
+        import pytesseract
+        from PIL import Image
+
+        image = Image.frombytes(page.mode, (page.width, page.height), page.samples, "raw", page.mode, page.stride)
+        return page.page_num, pytesseract.image_to_string(image, lang=lang)
+    except Exception as e:
+        logger.debug(f"PyTesseract: 第 {page.page_num} 页OCR失败: {e}")
+        return page.page_num, ""
+
+
+class _RenderThread:
+    """后台渲染线程，渲染结果放入有界队列，队列满时暂停渲染"""
+
+    def __init__(self, pages: Iterable[RenderedPage], max_queued: int):
+        self._pages = pages
+        self._queue: Queue = Queue(maxsize=max(1, max_queued))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="ocr-render", daemon=True)
+
+    def _run(self) -> None:
+        try:
+            for page in self._pages:
+                if self._stop.is_set():
+                    return
+                self._put(page)
+        except BaseException as e:
+            self._error = e
+        finally:
+            close = getattr(self._pages, "close", None)
+            if close is not None:
+                close()
+            self._put(_DONE)
+
+    def _put(self, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except Full:
+                continue
+
+    def __iter__(self) -> Iterator[RenderedPage]:
+        self._thread.start()
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def iter_ocr_pages(
+    pdf_path: Path,
+    page_count: int,
+    page_numbers: Optional[Iterable[int]] = None,
+    options: Optional[OcrOptions] = None
+) -> Iterator[Tuple[int, str]]:
+    """按页码顺序产出 (页码, OCR文本)
+
+    page_numbers指定只识别哪些页（页码从1开始），None表示全部页面。只有一个OCR进程可用时在当前进程内识别。
+    """
+    options = options or OcrOptions()
+    if page_numbers is None:
+        page_indices = list(range(page_count))
+    else:
+        page_indices = sorted({p - 1 for p in page_numbers if 1 <= p <= page_count})
+    if not page_indices:
+        return
+
+    workers = options.resolved_workers(len(page_indices))
+    if workers <= 1:
+        for page in render_pages(pdf_path, page_indices, options):
+            yield ocr_rendered_page(page, options.lang)
+        return
+
+    renderer = _RenderThread(render_pages(pdf_path, page_indices, options), options.resolved_queue_depth(workers))
+    try:
+        with create_process_executor(workers, use_gpu=False) as executor:
+            args_list = ((page, options.lang) for page in renderer)
+            yield from iter_ordered(executor, ocr_rendered_page, args_list, window=workers * 2)
+    finally:
+        renderer.stop()
@@ -0,0 +1,101 @@
+"""
+输出布局模块
+按输入目录结构在输出目录中镜像生成markdown，mineru直接写到目标目录旁的暂存目录，
+完成后用同一文件系统内的重命名放到最终位置
+"""
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+
+IMAGES_DIRNAME = "images"
+
+
+class OutputLayout:
+    """输出布局管理器
+
+    输入 {input_dir}/a/b/doc.pdf 对应输出 {output_dir}/a/b/doc.md；
+    图片放在markdown同级的 images/ 目录，与mineru的输出结构一致，markdown中的 images/xxx.jpg 引用无需改写。
+    mineru按图片内容哈希命名，同一目录下多个文档的图片可以安全共用该目录。
+    """
+
+    def __init__(self, input_dir: Optional[Path], output_dir: Path):
+        self.input_dir = Path(input_dir) if input_dir is not None else None
+        self.output_dir = Path(output_dir)
+
+    @classmethod
+    def for_files(cls, files: Iterable[Path], output_dir: Path) -> "OutputLayout":
+        """以一组文件的公共父目录作为输入根目录"""
+        parents = [str(Path(f).resolve().parent) for f in files]
+        input_dir = Path(os.path.commonpath(parents)) if parents else None
+        return cls(input_dir, output_dir)
+
+    def relative_path(self, file_path: Path) -> Path:
+        """文件相对输入根目录的路径，不在输入目录下时只保留文件名"""
+        file_path = Path(file_path)
+        if self.input_dir is not None:
+            for base, path in ((self.input_dir, file_path), (self.input_dir.resolve(), file_path.resolve())):
+                try:
+                    return path.relative_to(base)
+                except ValueError:
+                    continue
+        return Path(file_path.name)
+
+    def markdown_path(self, file_path: Path) -> Path:
+        """文件对应的最终markdown路径"""
+        return self.output_dir / self.relative_path(file_path).with_suffix(".md")
+
+    def create_staging_dir(self, file_path: Path) -> Path:
+        """在最终目录旁创建唯一的暂存目录（同一文件系统，保证重命名是原子操作）"""
+        target_dir = self.markdown_path(file_path).parent
+        staging = target_dir / f".{Path(file_path).stem}.{uuid.uuid4().hex[:8]}.tmp"
+        staging.mkdir(parents=True, exist_ok=False)
+        return staging
+
+    def discard(self, staging: Path) -> None:
+        """删除暂存目录中未发布的剩余内容"""
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def publish(self, file_path: Path, md_file: Path) -> List[Path]:
+        """把mineru输出目录（md_file所在目录）中的产物放到最终位置
+
+        图片合并到目标目录的 images/ 下，其余以文件名为前缀的产物（JSON、调试PDF）放在markdown旁，
+        markdown最后通过原子重命名发布，出现即代表完整。返回markdown之外属于该文档的产物路径，
+        包括该文档的图片（可能与同目录其他文档共用，清理时由清单判断是否还被引用）。
+        """
+        target_md = self.markdown_path(file_path)
+        target_dir = target_md.parent
+        target_dir.mkdir(parents=True, exist_ok=True)
+        source_dir = md_file.parent
+        prefix = f"{md_file.stem}_"
+
+        extra_paths = []
+        for item in source_dir.iterdir():
+            if item == md_file:
+                continue
+            if item.is_dir() and item.name == IMAGES_DIRNAME:
+                extra_paths.extend(self._merge_images(item, target_dir / IMAGES_DIRNAME))
+            elif item.is_file() and item.name.startswith(prefix):
+                target = target_dir / f"{target_md.stem}_{item.name[len(prefix):]}"
+                os.replace(item, target)
+                extra_paths.append(target)
+
+        os.replace(md_file, target_md)
+        return extra_paths
+
+    def _merge_images(self, source: Path, target: Path) -> List[Path]:
+        """把图片移到目标images目录，返回文档的全部图片路径；同名图片内容相同（按哈希命名），已存在时跳过"""
+        images = []
+        for image in source.iterdir():
+            if not image.is_file():
+                continue
+            destination = target / image.name
+            images.append(destination)
+            if destination.exists():
+                continue
+            target.mkdir(parents=True, exist_ok=True)
+            os.replace(image, destination)
+        return images
@@ -0,0 +1,61 @@
+"""
+输出配置档模块
+决定do_parse为每个文档生成哪些产物，不需要的产物不渲染、不序列化
+"""
+
+from typing import Dict, List
+
+
+# 配置档 -> do_parse的输出开关
+OUTPUT_PROFILES: Dict[str, Dict[str, bool]] = {
+    # 只要markdown：图片不落盘，不生成任何JSON和调试PDF
+    "md-only": {
+        "f_dump_md": True,
+        "f_dump_images": False,
+        "f_dump_content_list": False,
+        "f_dump_structured_json": False,
+        "f_dump_middle_json": False,
+        "f_dump_model_output": False,
+        "f_dump_orig_pdf": False,
+        "f_draw_layout_bbox": False,
+        "f_draw_span_bbox": False,
+    },
+    # markdown及其引用的图片
+    "md+images": {
+        "f_dump_md": True,
+        "f_dump_images": True,
+        "f_dump_content_list": False,
+        "f_dump_structured_json": False,
+        "f_dump_middle_json": False,
+        "f_dump_model_output": False,
+        "f_dump_orig_pdf": False,
+        "f_draw_layout_bbox": False,
+        "f_draw_span_bbox": False,
+    },
+    # mineru的全部产物，用于排查解析问题；标注调试PDF只保存几何信息，用 pdf2md render-debug 按需渲染
+    "full-debug": {
+        "f_dump_md": True,
+        "f_dump_images": True,
+        "f_dump_content_list": True,
+        "f_dump_structured_json": True,
+        "f_dump_middle_json": True,
+        "f_dump_model_output": True,
+        "f_dump_orig_pdf": True,
+        "f_draw_layout_bbox": True,
+        "f_draw_span_bbox": True,
+    },
+}
+
+DEFAULT_OUTPUT_PROFILE = "md+images"
+
+
+def output_profile_names() -> List[str]:
+    """所有配置档名称"""
+    return list(OUTPUT_PROFILES)
+
+
+def get_output_flags(profile: str) -> Dict[str, bool]:
+    """返回配置档对应的do_parse输出开关"""
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"未知的输出配置档: {profile}（可选: {', '.join(OUTPUT_PROFILES)}）")
+    return dict(OUTPUT_PROFILES[profile])
@@ -0,0 +1,89 @@
+"""
+异步输出写入模块
+do_parse的图片写入、markdown拼装和JSON产物序列化交给专用的I/O线程池，推理线程提交后立即继续处理下一个文档；
+排队中的数据按字节数计入上限，超过上限时提交方阻塞等待（背压），不会无限缓存图片内容
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+DEFAULT_IO_WORKERS = 2
+DEFAULT_MAX_PENDING_MB = 256
+
+# 大小未知的任务（markdown、JSON产物）按该字节数计入上限
+DEFAULT_TASK_COST = 1 << 20
+
+
+class AsyncOutputWriter:
+    """有界的异步输出队列
+
+    同时在途的任务按cost累计，累计值超过max_pending_bytes时submit阻塞，直到已有任务完成；
+    队列为空时单个超大任务也可以提交。任务异常在flush时抛出。
+    """
+
+    def __init__(self, workers: int = DEFAULT_IO_WORKERS, max_pending_mb: int = DEFAULT_MAX_PENDING_MB):
+        self.max_pending_bytes = max(1, max_pending_mb) << 20
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pdf2md-io")
+        self._condition = threading.Condition()
+        self._pending_bytes = 0
+        self._futures: List[Future] = []
+        self.blocked_seconds = 0.0  # 提交方因背压等待的总时间
+
+    def submit(self, fn: Callable[..., Any], *args: Any, cost: int = DEFAULT_TASK_COST) -> Future:
+        """提交写入任务，在途数据超过上限时阻塞"""
+        with self._condition:
+            if self._pending_bytes > 0 and self._pending_bytes + cost > self.max_pending_bytes:
+                start = time.time()
+                self._condition.wait_for(
+                    lambda: self._pending_bytes == 0 or self._pending_bytes + cost <= self.max_pending_bytes
+                )
+                self.blocked_seconds += time.time() - start
+            self._pending_bytes += cost
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._release(cost))
+        if len(self._futures) >= 1024:
+            # 只保留未完成或失败的任务，文档很多时不无限积累
+            self._futures = [f for f in self._futures if not f.done() or f.exception() is not None]
+        self._futures.append(future)
+        return future
+
+    def _release(self, cost: int) -> None:
+        with self._condition:
+            self._pending_bytes -= cost
+            self._condition.notify_all()
+
+    @property
+    def pending_bytes(self) -> int:
+        with self._condition:
+            return self._pending_bytes
+
+    def flush(self) -> None:
+        """等待所有已提交的写入完成，有失败时抛出第一个异常"""
+        futures, self._futures = self._futures, []
+        error: Optional[BaseException] = None
+        for future in futures:
+            exception = future.exception()
+            if exception is not None and error is None:
+                error = exception
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "AsyncOutputWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is not None:
+            # 已经有异常时只等待写入结束，不再用写入错误覆盖原异常
+            self._executor.shutdown(wait=True)
+            return
+        self.close()
+
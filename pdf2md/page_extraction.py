@@ -0,0 +1,246 @@
+"""
+并行逐页文本提取模块
+mineru失败时的pypdf备选方案按页码范围拆分到进程池，每个工作进程在同一文件的只读mmap上打开自己的PdfReader；
+各页文本按页码顺序流式写入markdown文件，不在内存中拼接整个文档。
+PageStore在磁盘上逐页保存备选处理器链的结果，后面的处理器只处理缺失或质量不足的页
+"""
+
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .config import config
+from .triage import MIN_TEXT_CHARS
+from .worker_pool import _worker_state, create_process_executor
+
+
+# 页数不超过该值时在当前进程内串行提取，启动进程池的开销比提取本身还大
+PARALLEL_MIN_PAGES = 64
+
+# 每个工作单元提取的页数
+CHUNK_PAGES = 32
+
+# 未指定时提取进程数的上限
+DEFAULT_EXTRACTION_WORKERS = 4
+
+
+def plan_page_chunks(page_indices: Sequence[int], chunk_pages: int = CHUNK_PAGES) -> List[List[int]]:
+    """把页面索引按顺序拆分为每份最多chunk_pages页"""
+    chunk_pages = max(1, chunk_pages)
+    return [list(page_indices[i:i + chunk_pages]) for i in range(0, len(page_indices), chunk_pages)]
+
+
+def _open_reader(pdf_path: Path):
+    """在文件的只读mmap上打开PdfReader，多个进程共享操作系统页缓存，不各自复制文件内容"""
+    from pypdf import PdfReader
+
+    with open(pdf_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return PdfReader(buffer), buffer
+
+
+def _extract_pages(reader: Any, page_indices: List[int]) -> List[Tuple[int, str]]:
+    """提取指定页面（索引从0开始）的文本，返回 (页码, 文本)，页码从1开始；提取失败的页返回空文本"""
+    pages = []
+    for index in page_indices:
+        try:
+            text = reader.pages[index].extract_text() or ""
+        except Exception:
+            text = ""
+        pages.append((index + 1, text))
+    return pages
+
+
+def extract_pages(pdf_path: Path, page_indices: List[int]) -> List[Tuple[int, str]]:
+    """提取一组页面（模块级函数，可被进程池pickle调用）"""
+    reader, buffer = _open_reader(pdf_path)
+    try:
+        return _extract_pages(reader, page_indices)
+    finally:
+        del reader
+        buffer.close()
+
+
+def extraction_workers(workers: Optional[int] = None) -> int:
+    """确定提取进程数
+
+    已经在转换进程池的工作进程中时串行提取，否则每个工作进程再各开一个进程池，进程数成倍增加；
+    未指定时使用配置 fallback.extraction_workers，且不超过CPU核心数。
+    """
+    if _worker_state:
+        return 1
+    if not workers:
+        workers = config.get('fallback.extraction_workers', DEFAULT_EXTRACTION_WORKERS)
+    return max(1, min(workers, os.cpu_count() or 1))
+
+
+def iter_ordered(
+    executor: Executor,
+    fn: Callable[..., Any],
+    args_list: Iterable[Tuple[Any, ...]],
+    window: int
+) -> Iterator[Any]:
+    """按提交顺序产出结果，同时在途的工作单元不超过window个，先完成的结果不会无限堆积在内存中"""
+    pending: deque = deque()
+    for args in args_list:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_page_texts(
+    pdf_path: Path,
+    workers: Optional[int] = None,
+    chunk_pages: int = CHUNK_PAGES,
+    page_numbers: Optional[Iterable[int]] = None
+) -> Iterator[Tuple[int, str]]:
+    """按页码顺序产出 (页码, 文本)；大文档拆分到进程池并行提取
+
+    page_numbers指定只提取哪些页（页码从1开始），None表示全部页面；进程数见extraction_workers。
+    """
+    reader, buffer = _open_reader(pdf_path)
+    try:
+        page_count = len(reader.pages)
+        if page_numbers is None:
+            page_indices = list(range(page_count))
+        else:
+            page_indices = sorted({p - 1 for p in page_numbers if 1 <= p <= page_count})
+        workers = extraction_workers(workers)
+        if len(page_indices) <= PARALLEL_MIN_PAGES or workers <= 1:
+            for chunk in plan_page_chunks(page_indices, chunk_pages):
+                yield from _extract_pages(reader, chunk)
+            return
+    finally:
+        del reader
+        buffer.close()
+
+    chunks = plan_page_chunks(page_indices, chunk_pages)
+    workers = min(workers, len(chunks))
+    with create_process_executor(workers, use_gpu=False) as executor:
+        args_list = ((pdf_path, chunk) for chunk in chunks)
+        for pages in iter_ordered(executor, extract_pages, args_list, window=workers * 2):
+            yield from pages
+
+
+def write_markdown_pages(output_path: Path, title: str, pages: Iterable[Tuple[int, str]]) -> int:
+    """把逐页文本流式写入markdown，返回有文本的页数
+
+    先写入同目录的临时文件，至少有一页文本时才原子替换为output_path，失败不会留下半个文件。
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(f".{output_path.name}.tmp")
+    written = 0
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(f"# {title}\n\n")
+            for page_num, text in pages:
+                text = text.strip()
+                if not text:
+                    continue
+                if written:
+                    f.write("\n")
+                f.write(f"# 第 {page_num} 页\n\n{text}\n")
+                written += 1
+        if written:
+            os.replace(temp_path, output_path)
+        return written
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def extract_pdf_to_markdown(pdf_path: Path, output_path: Path, workers: Optional[int] = None) -> Tuple[int, int, float]:
+    """用pypdf把PDF逐页提取为markdown，返回 (有文本的页数, 总页数, 耗时)"""
+    start_time = time.time()
+    page_count = 0
+
+    def counted(pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+        nonlocal page_count
+        for page in pages:
+            page_count += 1
+            yield page
+
+    written = write_markdown_pages(output_path, pdf_path.stem, counted(iter_page_texts(pdf_path, workers)))
+    return written, page_count, time.time() - start_time
+
+
+class PageStore:
+    """备选处理器链的逐页结果缓存
+
+    每页文本单独保存为暂存目录中的一个文件，内存中只保留页码和来源。文字层字符数达到阈值的页视为合格，
+    之后不再交给其他处理器；不合格的页先保留，后面的处理器得到更长的文本时替换。
+    """
+
+    def __init__(self, directory: Path, min_chars: int = MIN_TEXT_CHARS):
+        self.directory = directory
+        self.min_chars = min_chars
+        self.page_count = 0  # 文档总页数，0表示还不知道
+        self.sources: Dict[int, str] = {}
+        self._lengths: Dict[int, int] = {}
+        self._provisional: Set[int] = set()
+
+    @classmethod
+    def create_for(cls, output_path: Path, min_chars: int = MIN_TEXT_CHARS) -> "PageStore":
+        """在输出文件旁创建暂存目录"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        directory = tempfile.mkdtemp(prefix=f".{output_path.stem}.pages.", dir=output_path.parent)
+        return cls(Path(directory), min_chars)
+
+    def _page_file(self, page_num: int) -> Path:
+        return self.directory / f"{page_num:06d}.txt"
+
+    def add(self, page_num: int, text: str, source: str) -> bool:
+        """保存一页结果，返回是否采用"""
+        text = text.strip()
+        if not text:
+            return False
+        if page_num in self.sources and (
+            page_num not in self._provisional or len(text) <= self._lengths[page_num]
+        ):
+            return False
+
+        self._page_file(page_num).write_text(text, encoding='utf-8')
+        self.sources[page_num] = source
+        self._lengths[page_num] = len(text)
+        if len(text) >= self.min_chars:
+            self._provisional.discard(page_num)
+        else:
+            self._provisional.add(page_num)
+        return True
+
+    def missing(self) -> Optional[List[int]]:
+        """缺失或质量不足的页码；总页数未知时返回None（下一个处理器处理全部页面）"""
+        if self.page_count <= 0:
+            return None
+        return [
+            p for p in range(1, self.page_count + 1)
+            if p not in self.sources or p in self._provisional
+        ]
+
+    def processors(self) -> List[str]:
+        """实际提供了页面的处理器，按首次出现的页码排序"""
+        used: List[str] = []
+        for page_num in sorted(self.sources):
+            if self.sources[page_num] not in used:
+                used.append(self.sources[page_num])
+        return used
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """按页码顺序产出 (页码, 文本)"""
+        for page_num in sorted(self.sources):
+            yield page_num, self._page_file(page_num).read_text(encoding='utf-8')
+
+    def close(self) -> None:
+        """删除暂存目录"""
+        shutil.rmtree(self.directory, ignore_errors=True)
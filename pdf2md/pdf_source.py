@@ -0,0 +1,158 @@
+"""
+PDF文档句柄模块
+在parse_doc和do_parse之间传递文档句柄而不是反复读取、复制的字节串：
+文件以只读mmap打开，校验和哈希直接在内存映射上进行；需要bytes的mineru接口只物化一次；
+请求整份文档时不再经过pypdfium2重新编码，转储原始PDF时直接复制文件；
+页码范围从按路径打开的pypdfium2文档句柄导入，不需要物化整个文件
+"""
+
+import io
+import mmap
+import os
+import shutil
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+
+class PdfSource:
+    """PDF文档句柄
+
+    由文件路径创建时内容通过只读mmap访问；也可以包装已有的bytes（例如调用方传入的字节串）。
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, data: Optional[bytes] = None):
+        if path is None and data is None:
+            raise ValueError("PdfSource需要文件路径或字节内容")
+        self.path = Path(path) if path is not None else None
+        self._data = data
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._page_count: Optional[int] = None
+        self._pdf: Any = None  # pypdfium2.PdfDocument
+
+    @property
+    def name(self) -> str:
+        return self.path.stem if self.path is not None else "document"
+
+    @property
+    def is_pdf_file(self) -> bool:
+        """文件本身就是PDF（图片等其他格式需要先由mineru转换为PDF）"""
+        return self.path is not None and self.path.suffix.lower() == ".pdf"
+
+    def view(self) -> memoryview:
+        """文件内容的只读视图，不复制数据"""
+        if self.path is None:
+            return memoryview(self._data)
+        if self._mmap is None:
+            if os.path.getsize(self.path) == 0:
+                # 空文件无法映射
+                return memoryview(b"")
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def looks_like_pdf(self) -> bool:
+        """检查文件头部的PDF标记（只读取映射的前1KB）"""
+        with self.view() as view:
+            return b"%PDF-" in bytes(view[:1024])
+
+    def data(self) -> bytes:
+        """文档内容（mineru接口需要bytes），只物化一次"""
+        if self._data is None:
+            if self.is_pdf_file:
+                with self.view() as view:
+                    self._data = view.tobytes()
+            else:
+                from mineru.cli.common import read_fn
+                self._data = read_fn(self.path)
+        return self._data
+
+    def document(self) -> Any:
+        """pypdfium2文档句柄，只打开一次；PDF文件按路径打开，由pdfium按需读取，不物化文件内容"""
+        if self._pdf is None:
+            import pypdfium2 as pdfium
+            self._pdf = pdfium.PdfDocument(str(self.path) if self.is_pdf_file else self.data())
+        return self._pdf
+
+    def page_count(self) -> int:
+        if self._page_count is None:
+            self._page_count = len(self.document())
+        return self._page_count
+
+    def covers(self, start_page_id: int = 0, end_page_id: Optional[int] = None) -> bool:
+        """页码范围是否覆盖整份文档（与mineru一样，end_page_id为None或负数表示到最后一页）"""
+        if start_page_id > 0:
+            return False
+        if end_page_id is None or end_page_id < 0:
+            return True
+        return end_page_id >= self.page_count() - 1
+
+    def range_bytes(self, start_page_id: int = 0, end_page_id: Optional[int] = None) -> bytes:
+        """指定页码范围的PDF内容，覆盖整份文档时直接返回原内容，不重新编码；否则只导入范围内的页"""
+        if self.covers(start_page_id, end_page_id):
+            return self.data()
+        buffer = io.BytesIO()
+        self._save_pages(buffer, start_page_id, end_page_id)
+        return buffer.getvalue()
+
+    def _save_pages(self, dest: BinaryIO, start_page_id: int, end_page_id: Optional[int]) -> None:
+        """从文档句柄导入页码范围到新文档并保存（末页超出范围时截断，与mineru一致）"""
+        import pypdfium2 as pdfium
+        last_page = self.page_count() - 1
+        if end_page_id is not None and end_page_id >= 0:
+            last_page = min(end_page_id, last_page)
+        output = pdfium.PdfDocument.new()
+        try:
+            output.import_pages(self.document(), list(range(start_page_id, last_page + 1)))
+            output.save(dest)
+        finally:
+            output.close()
+
+    def dump(self, target: Path, pdf_bytes: bytes, full_document: bool) -> None:
+        """转储实际解析的PDF：整份PDF文件直接复制（由内核完成，不经过Python缓冲区），否则写入pdf_bytes"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if full_document and self.is_pdf_file:
+            shutil.copyfile(self.path, target)
+        else:
+            target.write_bytes(pdf_bytes)
+
+    def dump_pages(self, target: Path, start_page_id: int = 0, end_page_id: Optional[int] = None) -> None:
+        """转储页码范围，不需要调用方准备bytes：整份PDF文件直接复制，页码范围从文档句柄导入后直接写入文件"""
+        full_document = self.covers(start_page_id, end_page_id)
+        if full_document:
+            self.dump(target, b"" if self.is_pdf_file else self.data(), full_document)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'wb') as f:
+            self._save_pages(f, start_page_id, end_page_id)
+
+    def release(self) -> None:
+        """释放物化的bytes、文档句柄和内存映射（文档处理完后调用，大文件不必等到整批结束才释放）"""
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        if self.path is not None:
+            self._data = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    close = release
+
+    def __enter__(self) -> "PdfSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def as_pdf_source(item: Union["PdfSource", bytes, str, Path]) -> PdfSource:
+    """把路径、bytes或句柄统一为PdfSource"""
+    if isinstance(item, PdfSource):
+        return item
+    if isinstance(item, (bytes, bytearray)):
+        return PdfSource(data=bytes(item))
+    return PdfSource(path=item)
@@ -9,7 +9,8 @@ import time
 from pathlib import Path
 from typing import List, Optional, Tuple
 import logging
-from pypdf import PdfReader
+
+from .page_extraction import extract_pdf_to_markdown, iter_page_texts
 
 logger = logging.getLogger(__name__)
 
@@ -20,35 +21,27 @@ class PypdfProcessor:
         self.name = "pypdf"
     
     def extract_text_from_pdf(self, pdf_path: Path) -> Optional[str]:
-        """从PDF文件提取文本"""
+        """从PDF文件提取文本（大文档按页码范围并行提取）"""
         try:
-            reader = PdfReader(pdf_path)
-            page_count = len(reader.pages)
+            text_parts = []
+            page_count = 0
+            
+            for page_num, text in iter_page_texts(pdf_path):
+                page_count += 1
+                if text.strip():
+                    text_parts.append(f"# 第 {page_num} 页\n\n{text.strip()}\n")
+                else:
+                    logger.debug(f"第 {page_num} 页没有文本内容")
             
             if page_count == 0:
                 logger.warning(f"PDF文件没有页面: {pdf_path}")
                 return None
             
-            text_parts = []
-            successful_pages = 0
-            
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    text = page.extract_text()
-                    if text and text.strip():
-                        text_parts.append(f"# 第 {page_num} 页\n\n{text.strip()}\n")
-                        successful_pages += 1
-                    else:
-                        logger.debug(f"第 {page_num} 页没有文本内容")
-                except Exception as e:
-                    logger.warning(f"提取第 {page_num} 页文本失败: {e}")
-                    continue
-            
             if not text_parts:
                 logger.warning(f"PDF文件没有可提取的文本: {pdf_path}")
                 return None
             
-            logger.info(f"成功提取 {successful_pages}/{page_count} 页的文本")
+            logger.info(f"成功提取 {len(text_parts)}/{page_count} 页的文本")
             return "\n".join(text_parts)
             
         except Exception as e:
@@ -56,28 +49,19 @@ class PypdfProcessor:
             return None
     
     def process_pdf_to_markdown(self, pdf_path: Path, output_path: Path) -> bool:
-        """将PDF转换为Markdown"""
+        """将PDF转换为Markdown（逐页按顺序流式写入输出文件）"""
         logger.info(f"开始处理PDF文件: {pdf_path}")
         start_time = time.time()
         
         try:
-            # 提取文本
-            text = self.extract_text_from_pdf(pdf_path)
+            written, page_count, _ = extract_pdf_to_markdown(pdf_path, output_path)
             
-            if not text:
+            if not written:
                 logger.error(f"无法从PDF提取文本: {pdf_path}")
                 return False
             
-            # 创建输出目录
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 写入markdown文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(f"# {pdf_path.stem}\n\n")
-                f.write(text)
-            
             duration = time.time() - start_time
-            logger.info(f"成功处理PDF文件: {pdf_path} (耗时: {duration:.2f}秒)")
+            logger.info(f"成功处理PDF文件: {pdf_path} ({written}/{page_count} 页, 耗时: {duration:.2f}秒)")
             return True
             
         except Exception as e:
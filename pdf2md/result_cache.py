@@ -0,0 +1,202 @@
+"""
+转换结果缓存模块
+按PDF内容哈希和转换参数指纹缓存mineru输出，命中时直接恢复结果而不再推理
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils import get_file_hash
+
+
+# 缓存格式版本，输出结构变化时递增使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+
+_ENTRY_META = "entry.json"
+
+# 恢复时用硬链接代替复制的文件类型（图片不会被用户就地修改）
+_LINKABLE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+# 每个进程内复用缓存实例，避免重复扫描缓存目录
+_cache_instances: Dict[Tuple[str, int], "ConversionCache"] = {}
+_instances_lock = threading.Lock()
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """图片优先硬链接到缓存条目，失败（如跨文件系统）时复制"""
+    if Path(src).suffix.lower() in _LINKABLE_SUFFIXES:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+def options_fingerprint(options: Dict[str, Any]) -> str:
+    """计算转换参数指纹"""
+    payload = dict(options)
+    payload["cache_format_version"] = CACHE_FORMAT_VERSION
+    try:
+        from mineru.version import __version__ as mineru_version
+        payload["mineru_version"] = mineru_version
+    except Exception:
+        pass
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    """计算目录总大小"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ConversionCache:
+    """基于内容寻址的转换结果缓存（带容量上限的LRU淘汰）"""
+
+    def __init__(self, cache_dir: Path, max_size_mb: int = 10240):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.entries_dir = self.cache_dir / "entries"
+        self.tmp_dir = self.cache_dir / "tmp"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._current_size: Optional[int] = None
+
+    def make_key(self, file_path: Path, options: Dict[str, Any]) -> str:
+        """由文件内容哈希和参数指纹生成缓存键"""
+        return f"{get_file_hash(file_path)}_{options_fingerprint(options)}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / key[:2] / key
+
+    def contains(self, key: str) -> bool:
+        """检查缓存中是否存在该键"""
+        return (self._entry_path(key) / _ENTRY_META).exists()
+
+    def restore(self, key: str, dest_dir: Path) -> bool:
+        """命中时把缓存的输出（markdown、图片、JSON）恢复到dest_dir，返回是否命中"""
+        entry = self._entry_path(key)
+        meta_file = entry / _ENTRY_META
+        if not meta_file.exists():
+            return False
+
+        try:
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            for item in entry.iterdir():
+                if item.name == _ENTRY_META:
+                    continue
+                target = dest_dir / item.name
+                if item.is_dir():
+                    shutil.copytree(item, target, dirs_exist_ok=True, copy_function=_link_or_copy)
+                else:
+                    _link_or_copy(str(item), str(target))
+            # 更新访问时间，供LRU淘汰使用
+            os.utime(meta_file)
+            return True
+        except Exception as e:
+            print(f"警告：恢复缓存失败 {key}: {e}")
+            return False
+
+    def store(self, key: str, source_dir: Path) -> bool:
+        """把一次转换的输出目录存入缓存"""
+        entry = self._entry_path(key)
+        if (entry / _ENTRY_META).exists():
+            return True
+
+        staging = self.tmp_dir / f"{key}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            shutil.copytree(source_dir, staging)
+            size = _dir_size(staging)
+            with open(staging / _ENTRY_META, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "size": size, "created": time.time()}, f)
+
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                # 同一文件系统内的rename是原子的，并发写入同一键时只有一个成功
+                os.rename(staging, entry)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)
+                return (entry / _ENTRY_META).exists()
+
+            with self._lock:
+                if self._current_size is not None:
+                    self._current_size += size
+            self._maybe_evict()
+            return True
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            print(f"警告：写入缓存失败 {key}: {e}")
+            return False
+
+    def _scan_entries(self) -> List[Tuple[float, int, Path]]:
+        """扫描所有缓存条目，返回(最近访问时间, 大小, 路径)"""
+        entries = []
+        for meta_file in self.entries_dir.glob(f"*/*/{_ENTRY_META}"):
+            try:
+                with open(meta_file, "r", encoding="utf-8") as f:
+                    size = json.load(f).get("size", 0)
+                entries.append((meta_file.stat().st_mtime, size, meta_file.parent))
+            except Exception:
+                continue
+        return entries
+
+    def get_size(self) -> int:
+        """获取缓存总大小（字节）"""
+        with self._lock:
+            if self._current_size is None:
+                self._current_size = sum(size for _, size, _ in self._scan_entries())
+            return self._current_size
+
+    def _maybe_evict(self) -> None:
+        """超出容量上限时淘汰最久未访问的条目"""
+        if self.get_size() <= self.max_size_bytes:
+            return
+        self.evict(target_bytes=int(self.max_size_bytes * 0.9))
+
+    def evict(self, target_bytes: int) -> int:
+        """按LRU淘汰条目直到总大小不超过target_bytes，返回淘汰条目数"""
+        with self._lock:
+            entries = sorted(self._scan_entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= target_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                removed += 1
+            self._current_size = total
+            return removed
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            shutil.rmtree(self.entries_dir, ignore_errors=True)
+            self.entries_dir.mkdir(parents=True, exist_ok=True)
+            self._current_size = 0
+
+
+def get_conversion_cache(cache_dir: Path, max_size_mb: int = 10240) -> ConversionCache:
+    """获取（当前进程内共享的）缓存实例"""
+    key = (str(Path(cache_dir).resolve()), max_size_mb)
+    with _instances_lock:
+        cache = _cache_instances.get(key)
+        if cache is None:
+            cache = ConversionCache(Path(cache_dir), max_size_mb)
+            _cache_instances[key] = cache
+        return cache
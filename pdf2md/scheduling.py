@@ -0,0 +1,47 @@
+"""
+任务调度模块
+按预估耗时把任务以最长任务优先（LPT）的顺序提交，避免大文件排在最后拖长整批的总耗时
+"""
+
+import heapq
+import itertools
+from typing import Any, Callable, Iterable, Iterator
+
+# 自动确定预读窗口时每个工作进程对应的文件数
+WINDOW_PER_WORKER = 4
+
+
+def schedule_window_for(window: int, max_workers: int) -> int:
+    """确定预读窗口：window<=0时取工作进程数的WINDOW_PER_WORKER倍
+
+    窗口填满之前不会产出第一个任务，窗口过大时工作进程要等遍历完大量文件才能开始转换；
+    在途工作单元最多为工作进程数的两倍，几倍于此的窗口已足够让大文件排到前面。
+    """
+    if window > 0:
+        return window
+    return max(2, max_workers * WINDOW_PER_WORKER)
+
+
+def iter_longest_first(
+    items: Iterable[Any],
+    key: Callable[[Any], float],
+    window: int = 8
+) -> Iterator[Any]:
+    """在有界的预读窗口内按key从大到小产出任务
+
+    窗口内缓存最多window个任务，每次取出预估耗时最长的一个；输入结束后按耗时从大到小依次产出剩余任务。
+    任务总数不超过window时等价于完整的LPT排序；window<=1时保持原顺序。
+    """
+    if window <= 1:
+        yield from items
+        return
+
+    heap: list = []
+    order = itertools.count()  # 耗时相同时保持发现顺序
+    for item in items:
+        heapq.heappush(heap, (-key(item), next(order), item))
+        if len(heap) >= window:
+            yield heapq.heappop(heap)[2]
+
+    while heap:
+        yield heapq.heappop(heap)[2]
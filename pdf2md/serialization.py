@@ -0,0 +1,315 @@
+"""
+产物序列化模块
+middle.json、content_list.json和模型输出的序列化格式可配置：带缩进的json（与mineru一致）、紧凑json、orjson或msgpack，
+可选gzip/zstd压缩；序列化直接流式写入文件，不在内存中生成整个文档的字符串。
+读取时根据文件头自动识别压缩方式和编码，调用方不需要知道写入时的配置
+"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+JSON = "json"
+COMPACT = "compact"
+ORJSON = "orjson"
+MSGPACK = "msgpack"
+
+NO_COMPRESSION = "none"
+GZIP = "gzip"
+ZSTD = "zstd"
+
+DEFAULT_SERIALIZATION = JSON
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# 写入文件前合并的编码块大小，json逐块编码产生大量很短的字符串，逐个写入压缩流很慢
+_WRITE_BUFFER = 1 << 16
+
+_COMPRESSION_SUFFIXES = {
+    NO_COMPRESSION: "",
+    GZIP: ".gz",
+    ZSTD: ".zst",
+}
+
+
+def _json_chunks(indent: Optional[int]) -> Callable[[Any], Iterator[bytes]]:
+    separators = (",", ": ") if indent is not None else (",", ":")
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=indent, separators=separators)
+    return lambda obj: (chunk.encode("utf-8") for chunk in encoder.iterencode(obj))
+
+
+def _orjson_chunks(obj: Any) -> Iterator[bytes]:
+    import orjson
+    yield orjson.dumps(obj)
+
+
+def _msgpack_chunks(obj: Any) -> Iterator[bytes]:
+    import msgpack
+    yield msgpack.packb(obj, use_bin_type=True)
+
+
+@dataclass(frozen=True)
+class EncodingFormat:
+    """编码格式：文件后缀、逐块编码函数、依赖的可选模块，以及JSON文本数组元素之间的分隔符"""
+    suffix: str
+    encode: Callable[[Any], Iterable[bytes]]
+    module: Optional[str] = None
+    separator: bytes = b","  # msgpack不使用
+
+
+# 格式名 -> 编码格式，可用register_format添加新格式
+FORMATS: Dict[str, EncodingFormat] = {
+    JSON: EncodingFormat(".json", _json_chunks(4), separator=b",\n"),
+    COMPACT: EncodingFormat(".json", _json_chunks(None)),
+    ORJSON: EncodingFormat(".json", _orjson_chunks, module="orjson"),
+    MSGPACK: EncodingFormat(".msgpack", _msgpack_chunks, module="msgpack"),
+}
+
+
+def register_format(name: str, encoding: EncodingFormat) -> None:
+    """注册新的编码格式（读取时仍按文件头识别，新格式须是JSON文本或msgpack）"""
+    FORMATS[name] = encoding
+
+
+def _module_available(name: Optional[str]) -> bool:
+    if name is None:
+        return True
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def _write_chunks(f: BinaryIO, chunks: Iterable[bytes]) -> None:
+    """合并成较大的块再写入"""
+    buffer: List[bytes] = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= _WRITE_BUFFER:
+            f.write(b"".join(buffer))
+            buffer.clear()
+            size = 0
+    if buffer:
+        f.write(b"".join(buffer))
+
+
+def _open_compressed(path: Path, compression: str) -> BinaryIO:
+    """打开写入压缩流的文件对象"""
+    if compression == GZIP:
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == ZSTD:
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """产物序列化器：编码格式 + 压缩方式"""
+    format: str = DEFAULT_SERIALIZATION
+    compression: str = NO_COMPRESSION
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "Serializer":
+        """解析 "格式[+压缩]" 形式的配置，例如 compact、orjson+zstd、msgpack+gzip
+
+        依赖模块未安装的格式退回紧凑json，未安装zstandard时退回gzip。
+        """
+        if not spec:
+            return cls()
+        format_name, _, compression = spec.lower().partition("+")
+        compression = compression or NO_COMPRESSION
+        if format_name not in FORMATS:
+            raise ValueError(f"未知的序列化格式: {format_name}（可选: {', '.join(FORMATS)}）")
+        if compression not in _COMPRESSION_SUFFIXES:
+            raise ValueError(f"未知的压缩方式: {compression}（可选: {', '.join(_COMPRESSION_SUFFIXES)}）")
+        if not _module_available(FORMATS[format_name].module):
+            logger.warning(f"未安装 {FORMATS[format_name].module}，序列化格式改用 {COMPACT}")
+            format_name = COMPACT
+        if compression == ZSTD and not _module_available("zstandard"):
+            logger.warning(f"未安装 zstandard，压缩方式改用 {GZIP}")
+            compression = GZIP
+        return cls(format_name, compression)
+
+    @property
+    def spec(self) -> str:
+        return self.format if self.compression == NO_COMPRESSION else f"{self.format}+{self.compression}"
+
+    @property
+    def suffix(self) -> str:
+        return FORMATS[self.format].suffix + _COMPRESSION_SUFFIXES[self.compression]
+
+    def path_for(self, directory: Path, name: str) -> Path:
+        """产物文件路径，name不含后缀，例如 doc_middle"""
+        return Path(directory) / f"{name}{self.suffix}"
+
+    def dump(self, obj: Any, path: Path) -> Path:
+        """把整个对象流式写入文件"""
+        with _open_compressed(path, self.compression) as f:
+            _write_chunks(f, FORMATS[self.format].encode(obj))
+        return path
+
+    def array_writer(self, path: Path, key: Optional[str] = None) -> "ArrayWriter":
+        """逐段追加元素的数组文件，key不为None时写成 {key: [...], 其他字段} 的对象"""
+        if self.format == MSGPACK:
+            return _MsgpackArrayWriter(path, self.compression, key)
+        return ArrayWriter(path, self, key)
+
+
+class ArrayWriter:
+    """逐段追加元素的JSON数组文件，其他字段在close时写入（用于middle.json的pdf_info）"""
+
+    def __init__(self, path: Path, serializer: Serializer, key: Optional[str] = None):
+        self.path = path
+        self.key = key
+        self.count = 0
+        self._encoding = FORMATS[serializer.format]
+        self._file = _open_compressed(path, serializer.compression)
+        self._file.write(b"{" + json.dumps(key).encode("utf-8") + b":[" if key is not None else b"[")
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            if self.count:
+                self._file.write(self._encoding.separator)
+            _write_chunks(self._file, self._encoding.encode(item))
+            self.count += 1
+
+    def close(self, extra: Optional[Dict[str, Any]] = None) -> None:
+        if self._file.closed:
+            return
+        self._file.write(b"]")
+        if self.key is not None:
+            for name, value in (extra or {}).items():
+                self._file.write(b"," + json.dumps(name).encode("utf-8") + b":")
+                _write_chunks(self._file, self._encoding.encode(value))
+            self._file.write(b"}")
+        self._file.close()
+
+
+class _MsgpackArrayWriter:
+    """逐段追加元素的msgpack数组
+
+    msgpack的数组头和映射头包含元素个数，先写占位的32位数组头和16位映射头，关闭时回填；需要回填所以先写入未压缩的临时文件，
+    关闭时再流式压缩到目标文件。
+    """
+
+    def __init__(self, path: Path, compression: str, key: Optional[str] = None):
+        import msgpack
+
+        self.path = path
+        self.key = key
+        self.count = 0
+        self._compression = compression
+        self._packer = msgpack.Packer(use_bin_type=True)
+        if compression == NO_COMPRESSION:
+            self._raw_path = path
+        else:
+            fd, raw = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+            os.close(fd)
+            self._raw_path = Path(raw)
+        self._file = open(self._raw_path, "w+b")
+        if key is not None:
+            self._file.write(b"\xde\x00\x00")  # map16占位，关闭时回填键数
+            self._file.write(self._packer.pack(key))
+        self._array_header = self._file.tell()
+        self._file.write(b"\xdd\x00\x00\x00\x00")
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self._file.write(self._packer.pack(item))
+            self.count += 1
+
+    def close(self, extra: Optional[Dict[str, Any]] = None) -> None:
+        if self._file.closed:
+            return
+        extra = extra or {}
+        if self.key is not None:
+            for name, value in extra.items():
+                self._file.write(self._packer.pack(name))
+                self._file.write(self._packer.pack(value))
+            self._file.seek(0)
+            self._file.write(b"\xde" + struct.pack(">H", 1 + len(extra)))
+        self._file.seek(self._array_header)
+        self._file.write(b"\xdd" + struct.pack(">I", self.count))
+        if self._raw_path != self.path:
+            self._file.seek(0)
+            with _open_compressed(self.path, self._compression) as target:
+                shutil.copyfileobj(self._file, target)
+            self._file.close()
+            self._raw_path.unlink()
+        else:
+            self._file.close()
+
+
+def artifact_suffixes() -> List[str]:
+    """产物文件所有可能的后缀（编码 + 压缩），较长的在前"""
+    suffixes = {
+        encoding.suffix + compressed
+        for encoding in FORMATS.values()
+        for compressed in _COMPRESSION_SUFFIXES.values()
+    }
+    return sorted(suffixes, key=lambda suffix: (-len(suffix), suffix))
+
+
+def artifact_candidates(directory: Path, name: str) -> List[Path]:
+    """产物name（不含后缀）所有可能的文件路径"""
+    return [Path(directory) / f"{name}{suffix}" for suffix in artifact_suffixes()]
+
+
+def artifact_name(path: Path) -> Optional[str]:
+    """产物文件名去掉编码和压缩后缀，例如 doc_middle.json.gz -> doc_middle；不是产物文件时返回None"""
+    for suffix in artifact_suffixes():
+        if path.name.endswith(suffix):
+            return path.name[:-len(suffix)]
+    return None
+
+
+def find_artifact(directory: Path, name: str) -> Optional[Path]:
+    """查找产物文件，不论写入时使用的格式和压缩方式"""
+    for path in artifact_candidates(directory, name):
+        if path.exists():
+            return path
+    return None
+
+
+def _sniff_compression(head: bytes) -> str:
+    if head.startswith(_GZIP_MAGIC):
+        return GZIP
+    if head.startswith(_ZSTD_MAGIC):
+        return ZSTD
+    return NO_COMPRESSION
+
+
+def load_artifact(path: Path) -> Any:
+    """读取产物文件，根据文件头识别压缩方式，再根据首字节区分JSON文本和msgpack"""
+    with open(path, "rb") as f:
+        compression = _sniff_compression(f.read(4))
+    if compression == GZIP:
+        with gzip.open(path, "rb") as f:
+            data = f.read()
+    elif compression == ZSTD:
+        import zstandard
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            data = reader.read()
+    else:
+        data = Path(path).read_bytes()
+
+    text = data.lstrip()
+    if text[:1] in (b"{", b"[") or text.startswith(b"\xef\xbb\xbf"):  # msgpack的数组、映射头都不在ASCII范围内
+        return json.loads(data.decode("utf-8-sig"))
+    import msgpack
+    return msgpack.unpackb(data, raw=False)
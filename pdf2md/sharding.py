@@ -0,0 +1,286 @@
+"""
+大文档分片模块
+把页数超过阈值的PDF按页码范围拆成多个分片，分片分发给不同的工作进程并行转换，
+全部完成后把markdown、图片、content_list、结构化JSON和middle.json拼接成一份输出
+"""
+
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional
+
+from .content_make import STRUCTURED_NAME, SectionTracker, assign_sections
+from .debug_render import geometry_name
+from .serialization import Serializer, find_artifact, load_artifact
+from .streaming import offset_model_pages, offset_page_idx, page_windows
+
+
+@dataclass
+class ShardJob:
+    """分片任务数据类"""
+    task: Any  # 所属文件的FileTask
+    shard_index: int
+    shard_count: int
+    start_page: int
+    end_page: int  # 包含该页，与mineru的end_page_id一致
+    staging_dir: Path
+
+
+@dataclass
+class ShardResult:
+    """分片转换结果数据类"""
+    shard_index: int
+    success: bool
+    duration: float
+    output_dir: Optional[Path] = None  # mineru输出目录（含markdown、images和JSON）
+    error_message: Optional[str] = None
+
+
+@dataclass
+class ShardFinish:
+    """分片收尾工作单元：全部分片完成后拼接输出，或在有分片失败时整体重新转换"""
+    task: Any  # 所属文件的FileTask
+    jobs: List[ShardJob]
+    results: List[ShardResult]
+
+
+def exact_page_count(file_path: Path) -> Optional[int]:
+    """读取PDF的准确页数，失败时返回None（分片不能依赖估算页数）"""
+    try:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(str(file_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        return None
+
+
+def shard_staging_root(task: Any) -> Path:
+    """文件所有分片共用的暂存目录"""
+    return task.output_dir / f".shards_{task.task_id}_{task.file_path.stem}"
+
+
+def plan_shards(task: Any, page_count: int, shard_pages: int) -> List[ShardJob]:
+    """把文件按每片shard_pages页拆分，最后一片可能不足shard_pages页"""
+    root = shard_staging_root(task)
+    ranges = page_windows(0, page_count - 1, shard_pages)
+    return [
+        ShardJob(
+            task=task,
+            shard_index=i,
+            shard_count=len(ranges),
+            start_page=start,
+            end_page=end,
+            staging_dir=root / f"shard_{i:04d}"
+        )
+        for i, (start, end) in enumerate(ranges)
+    ]
+
+
+def convert_shard(job: ShardJob) -> ShardResult:
+    """转换一个分片（模块级函数，可被进程池pickle调用）"""
+    from .batch_processor import find_markdown_output
+    from .mineru_wrapper import parse_doc
+
+    task = job.task
+    start_time = time.time()
+    job.staging_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        parse_doc(
+            path_list=[task.file_path],
+            output_dir=str(job.staging_dir),
+            lang=task.lang,
+            backend=task.backend,
+            method=task.method,
+            start_page_id=job.start_page,
+            end_page_id=job.end_page,
+            formula_enable=task.formula_enable,
+            table_enable=task.table_enable,
+            output_profile=task.output_profile,
+            window_pages=task.window_pages,
+            serialization=task.serialization
+        )
+
+        # pypdf备选方案会忽略页码范围，输出的是整个文档，不能当作分片结果
+        md_file = find_markdown_output(job.staging_dir, task.file_path.stem, task.method)
+        if md_file is None or md_file.parent == job.staging_dir:
+            raise Exception(f"mineru未生成分片markdown文件: 第{job.start_page + 1}-{job.end_page + 1}页")
+
+        return ShardResult(
+            shard_index=job.shard_index,
+            success=True,
+            duration=time.time() - start_time,
+            output_dir=md_file.parent
+        )
+    except Exception as e:
+        return ShardResult(
+            shard_index=job.shard_index,
+            success=False,
+            duration=time.time() - start_time,
+            error_message=str(e)
+        )
+
+
+def stitch_shards(jobs: List[ShardJob], results: List[ShardResult], merged_dir: Path) -> Path:
+    """把各分片的输出按页码顺序拼接到merged_dir，返回拼接后的markdown路径
+
+    图片由mineru按内容哈希命名，各分片的图片直接合并到同一个images目录，
+    markdown中的 images/xxx.jpg 引用因此保持有效；content_list、结构化JSON和middle.json的page_idx按分片起始页偏移，
+    结构化JSON的章节路径跨分片重新计算。调试产物同样拼接：标注几何信息偏移page_idx并指向整个原PDF，
+    模型输出偏移页码（VLM的文本按页追加），_origin.pdf直接复制原文件（分片覆盖了整个文档）。
+    """
+    task = jobs[0].task
+    stem = task.file_path.stem
+    merged_images = merged_dir / "images"
+    merged_images.mkdir(parents=True, exist_ok=True)
+
+    serializer = Serializer.parse(task.serialization)
+    md_parts = []
+    content_list = None
+    structured = None
+    sections = SectionTracker()
+    middle = None
+    middle_extra = {}
+    geometry = None
+    geometry_extra = {}
+    model_json = None
+    model_text = None
+    model_parts = 0
+    origin = False
+
+    try:
+        for job, result in sorted(zip(jobs, results), key=lambda pair: pair[0].start_page):
+            shard_dir = result.output_dir
+            md_parts.append((shard_dir / f"{stem}.md").read_text(encoding="utf-8").strip())
+
+            images_dir = shard_dir / "images"
+            if images_dir.is_dir():
+                for image in images_dir.iterdir():
+                    target = merged_images / image.name
+                    if not target.exists():
+                        shutil.move(str(image), str(target))
+
+            # 分片的JSON产物逐个读入后立即追加写出，内存中只保留一个分片
+            content_list_file = find_artifact(shard_dir, f"{stem}_content_list")
+            if content_list_file is not None:
+                if content_list is None:
+                    content_list = serializer.array_writer(serializer.path_for(merged_dir, f"{stem}_content_list"))
+                content_list.extend(offset_page_idx(load_artifact(content_list_file), job.start_page))
+
+            structured_file = find_artifact(shard_dir, f"{stem}_{STRUCTURED_NAME}")
+            if structured_file is not None:
+                if structured is None:
+                    structured = serializer.array_writer(serializer.path_for(merged_dir, f"{stem}_{STRUCTURED_NAME}"))
+                items = offset_page_idx(load_artifact(structured_file), job.start_page)
+                structured.extend(assign_sections(items, sections))
+
+            middle_file = find_artifact(shard_dir, f"{stem}_middle")
+            if middle_file is not None:
+                shard_middle = load_artifact(middle_file)
+                if middle is None:
+                    middle = serializer.array_writer(serializer.path_for(merged_dir, f"{stem}_middle"), key="pdf_info")
+                    middle_extra = {k: v for k, v in shard_middle.items() if k != "pdf_info"}
+                middle.extend(offset_page_idx(shard_middle.get("pdf_info", []), job.start_page))
+
+            geometry_file = find_artifact(shard_dir, geometry_name(stem))
+            if geometry_file is not None:
+                shard_geometry = load_artifact(geometry_file)
+                if geometry is None:
+                    geometry = serializer.array_writer(serializer.path_for(merged_dir, geometry_name(stem)), key="pdf_info")
+                    # 拼接后的页码对应整个原PDF
+                    geometry_extra = {k: v for k, v in shard_geometry.items() if k != "pdf_info"}
+                    geometry_extra.update(source=str(task.file_path.resolve()), start_page_id=0, end_page_id=None)
+                geometry.extend(offset_page_idx(shard_geometry.get("pdf_info", []), job.start_page))
+
+            model_file = find_artifact(shard_dir, f"{stem}_model")
+            if model_file is not None:
+                if model_json is None:
+                    model_json = serializer.array_writer(serializer.path_for(merged_dir, f"{stem}_model"))
+                model_json.extend(offset_model_pages(load_artifact(model_file), job.start_page))
+
+            model_text_file = shard_dir / f"{stem}_model_output.txt"
+            if model_text_file.exists():
+                if model_text is None:
+                    model_text = open(merged_dir / f"{stem}_model_output.txt", 'w', encoding='utf-8')
+                if model_parts:
+                    model_text.write("\n" + "-" * 50 + "\n")
+                model_text.write(model_text_file.read_text(encoding="utf-8"))
+                model_parts += 1
+
+            origin = origin or (shard_dir / f"{stem}_origin.pdf").exists()
+    finally:
+        if content_list is not None:
+            content_list.close()
+        if structured is not None:
+            structured.close()
+        if middle is not None:
+            middle.close(middle_extra)
+        if geometry is not None:
+            geometry.close(geometry_extra)
+        if model_json is not None:
+            model_json.close()
+        if model_text is not None:
+            model_text.close()
+
+    if origin:
+        shutil.copyfile(task.file_path, merged_dir / f"{stem}_origin.pdf")
+
+    md_file = merged_dir / f"{stem}.md"
+    md_file.write_text("\n\n".join(part for part in md_parts if part) + "\n", encoding="utf-8")
+
+    return md_file
+
+
+def finish_sharded_task(task: Any, jobs: List[ShardJob], results: List[ShardResult]) -> Any:
+    """所有分片完成后拼接输出并返回FileResult
+
+    任一分片失败时整个文件按不分片的方式重新转换一次（其中包含pypdf备选方案）。
+    """
+    from .batch_processor import (
+        FileResult, cached_output_dir, convert_file_task, open_task_cache, task_layout
+    )
+
+    root = shard_staging_root(task)
+    try:
+        failed = [r for r in results if not r.success]
+        if failed:
+            print(f"  分片转换失败，整体重新转换: {task.file_path.name} ({failed[0].error_message})")
+            return convert_file_task(task)
+
+        merged_dir = cached_output_dir(root / "merged", task)
+        md_file = stitch_shards(jobs, results, merged_dir)
+
+        cache = open_task_cache(task)
+        if cache is not None:
+            cache.store(task.cache_key, merged_dir)
+
+        layout = task_layout(task)
+        extra_paths = layout.publish(task.file_path, md_file)
+
+        return FileResult(
+            task_id=task.task_id,
+            file_path=task.file_path,
+            success=True,
+            duration=sum(r.duration for r in results),
+            output_path=layout.markdown_path(task.file_path),
+            extra_paths=extra_paths
+        )
+    except Exception as e:
+        return FileResult(
+            task_id=task.task_id,
+            file_path=task.file_path,
+            success=False,
+            duration=sum(r.duration for r in results),
+            error_message=f"分片拼接失败: {e}"
+        )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def finish_shards(item: ShardFinish) -> Any:
+    """在工作进程中执行分片收尾（模块级函数，可被进程池pickle调用）"""
+    return finish_sharded_task(item.task, item.jobs, item.results)
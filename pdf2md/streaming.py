@@ -0,0 +1,177 @@
+"""
+分窗口流式转换模块
+超大PDF按页码窗口逐段推理，每个窗口的markdown、content_list、结构化JSON、middle.json和模型输出立即追加写入文件，
+图片由image_writer随窗口写出；一个窗口的模型输出和渲染图片释放后才处理下一个窗口，
+峰值内存取决于窗口页数而不是文档页数
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .content_make import STRUCTURED_NAME, MadeContent
+from .debug_render import geometry_name
+from .serialization import Serializer
+
+
+def page_windows(first_page: int, last_page: int, window_pages: int) -> List[Tuple[int, int]]:
+    """把页码范围 [first_page, last_page] 按每段window_pages页拆分，页码包含两端，与mineru的end_page_id一致"""
+    window_pages = max(1, window_pages)
+    return [
+        (start, min(start + window_pages, last_page + 1) - 1)
+        for start in range(first_page, last_page + 1, window_pages)
+    ]
+
+
+def group_documents(page_counts: List[int], group_pages: int) -> List[List[int]]:
+    """按顺序把文档分组，每组页数达到group_pages就开始新的一组，返回各组的文档下标；文档不拆分"""
+    groups: List[List[int]] = []
+    current: List[int] = []
+    pages = 0
+    for idx, count in enumerate(page_counts):
+        current.append(idx)
+        pages += count
+        if pages >= group_pages:
+            groups.append(current)
+            current, pages = [], 0
+    if current:
+        groups.append(current)
+    return groups
+
+
+def offset_page_idx(items: List[Any], offset: int) -> List[Any]:
+    """把窗口（分片）内的page_idx换算成原文档页码"""
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("page_idx"), int):
+            item["page_idx"] += offset
+    return items
+
+
+def offset_model_pages(pages: List[Any], offset: int) -> List[Any]:
+    """把pipeline模型输出中 page_info.page_no 换算成原文档页码
+
+    返回浅拷贝，不修改原模型输出（之后还要用它生成middle_json）。
+    """
+    shifted = []
+    for page in pages:
+        page_info = page.get("page_info") if isinstance(page, dict) else None
+        if isinstance(page_info, dict) and isinstance(page_info.get("page_no"), int):
+            page = {**page, "page_info": {**page_info, "page_no": page_info["page_no"] + offset}}
+        shifted.append(page)
+    return shifted
+
+
+def write_json_array(path: Path, items: Iterable[Any], serializer: Optional[Serializer] = None) -> int:
+    """逐个元素序列化写出数组，返回元素个数；不在内存中生成整个数组的字符串"""
+    writer = (serializer or Serializer()).array_writer(path)
+    try:
+        writer.extend(items)
+    finally:
+        writer.close()
+    return writer.count
+
+
+class StreamingOutput:
+    """一个文档的流式输出文件，文件名与do_parse一次性写出时相同"""
+
+    def __init__(
+        self,
+        md_dir: Path,
+        name: str,
+        dump_md: bool = True,
+        dump_content_list: bool = True,
+        dump_structured_json: bool = False,
+        dump_middle_json: bool = True,
+        dump_model_output: bool = True,
+        model_output_as_text: bool = False,  # VLM后端的模型输出是文本，pipeline是JSON
+        serializer: Optional[Serializer] = None,
+        geometry: Optional[Dict[str, Any]] = None  # 保存标注几何信息时pdf_info以外的字段，None表示不保存
+    ):
+        serializer = serializer or Serializer()
+        self._markdown = open(md_dir / f"{name}.md", 'w', encoding='utf-8') if dump_md else None
+        self._markdown_parts = 0
+        self.content_list = (
+            serializer.array_writer(serializer.path_for(md_dir, f"{name}_content_list")) if dump_content_list else None
+        )
+        self.structured = (
+            serializer.array_writer(serializer.path_for(md_dir, f"{name}_{STRUCTURED_NAME}")) if dump_structured_json else None
+        )
+        self.middle = (
+            serializer.array_writer(serializer.path_for(md_dir, f"{name}_middle"), key="pdf_info")
+            if dump_middle_json else None
+        )
+        self.middle_extra: Dict[str, Any] = {}  # middle.json中pdf_info以外的字段（后端、版本）
+        self.geometry_extra = geometry
+        self.geometry = (
+            serializer.array_writer(serializer.path_for(md_dir, geometry_name(name)), key="pdf_info")
+            if geometry is not None else None
+        )
+        self._model_json = None
+        self._model_text = None
+        self._model_parts = 0
+        if dump_model_output:
+            if model_output_as_text:
+                self._model_text = open(md_dir / f"{name}_model_output.txt", 'w', encoding='utf-8')
+            else:
+                self._model_json = serializer.array_writer(serializer.path_for(md_dir, f"{name}_model"))
+
+    def write_markdown(self, text: str) -> None:
+        """追加一个窗口的markdown，窗口之间用空行分隔（与mineru页面之间的分隔一致）"""
+        if self._markdown is None or not text:
+            return
+        if self._markdown_parts:
+            self._markdown.write("\n\n")
+        self._markdown.write(text)
+        self._markdown_parts += 1
+
+    def write_content(self, content: MadeContent, offset: int) -> None:
+        """追加一个窗口由ContentMaker生成的markdown、content_list和结构化JSON"""
+        if content.markdown is not None:
+            self.write_markdown(content.markdown)
+        if self.content_list is not None and content.content_list is not None:
+            self.content_list.extend(offset_page_idx(content.content_list, offset))
+        if self.structured is not None and content.structured is not None:
+            self.structured.extend(offset_page_idx(content.structured, offset))
+
+    def write_middle(self, middle_json: Dict[str, Any], offset: int) -> None:
+        """追加一个窗口的middle.json页面和标注几何信息（会修改pdf_info中的page_idx，须在生成markdown和content_list之后调用）"""
+        if self.middle is None and self.geometry is None:
+            return
+        pdf_info = offset_page_idx(middle_json["pdf_info"], offset)
+        if self.middle is not None:
+            self.middle_extra = {k: v for k, v in middle_json.items() if k != "pdf_info"}
+            self.middle.extend(pdf_info)
+        if self.geometry is not None:
+            self.geometry.extend(pdf_info)
+
+    def write_model_output(self, model_output: Any, offset: int) -> None:
+        """追加一个窗口的模型输出：pipeline为逐页JSON，VLM为逐页文本"""
+        if self._model_json is not None:
+            self._model_json.extend(offset_model_pages(model_output, offset))
+        elif self._model_text is not None:
+            for text in model_output:
+                if self._model_parts:
+                    self._model_text.write("\n" + "-" * 50 + "\n")
+                self._model_text.write(text)
+                self._model_parts += 1
+
+    def close(self) -> None:
+        if self._markdown is not None:
+            self._markdown.close()
+        if self.content_list is not None:
+            self.content_list.close()
+        if self.structured is not None:
+            self.structured.close()
+        if self.middle is not None:
+            self.middle.close(self.middle_extra)
+        if self.geometry is not None:
+            self.geometry.close(self.geometry_extra)
+        if self._model_json is not None:
+            self._model_json.close()
+        if self._model_text is not None:
+            self._model_text.close()
+
+    def __enter__(self) -> "StreamingOutput":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,142 @@
+"""
+PDF预分类模块
+加载模型之前用pypdfium2均匀采样少量页面，根据文字层覆盖率和图片面积把PDF分为文字型、扫描型和混合型，
+文字型走txt方法，只有扫描型才需要OCR
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+
+TEXT = "text"
+SCANNED = "scanned"
+MIXED = "mixed"
+
+KIND_LABELS = {
+    TEXT: "文字型",
+    SCANNED: "扫描型",
+    MIXED: "混合型",
+}
+
+# 分类 -> mineru解析方法；混合型交给mineru按页判断
+METHOD_BY_KIND = {
+    TEXT: "txt",
+    SCANNED: "ocr",
+    MIXED: "auto",
+}
+
+# 页面文字层字符数低于该值视为没有文字层（页眉页码之类的零星文字不算）
+MIN_TEXT_CHARS = 20
+
+# 图片覆盖页面面积的比例达到该值时，页面上的文字可能只占一部分内容
+IMAGE_HEAVY_RATIO = 0.5
+
+DEFAULT_SAMPLE_PAGES = 8
+
+
+@dataclass
+class PageSample:
+    """单个采样页面的统计"""
+    page_index: int
+    chars: int  # 文字层字符数
+    image_count: int
+    image_area_ratio: float  # 图片覆盖页面面积的比例（0~1）
+
+    @property
+    def has_text(self) -> bool:
+        return self.chars >= MIN_TEXT_CHARS
+
+
+@dataclass
+class TriageResult:
+    """PDF预分类结果数据类"""
+    kind: str
+    pages: int
+    samples: List[PageSample] = field(default_factory=list)
+
+    @property
+    def method(self) -> str:
+        """推荐的mineru解析方法"""
+        return METHOD_BY_KIND[self.kind]
+
+    @property
+    def text_coverage(self) -> float:
+        """采样页面中有文字层的比例"""
+        if not self.samples:
+            return 1.0
+        return sum(1 for s in self.samples if s.has_text) / len(self.samples)
+
+    @property
+    def image_density(self) -> float:
+        """采样页面平均每页图片数"""
+        if not self.samples:
+            return 0.0
+        return sum(s.image_count for s in self.samples) / len(self.samples)
+
+
+def classify_samples(samples: List[PageSample]) -> str:
+    """根据采样页面判断PDF类型
+
+    所有采样页都没有文字层为扫描型；都有文字层且没有大面积图片为文字型；其余为混合型。
+    """
+    if not samples:
+        return TEXT
+    if not any(s.has_text for s in samples):
+        return SCANNED
+    if all(s.has_text and s.image_area_ratio < IMAGE_HEAVY_RATIO for s in samples):
+        return TEXT
+    return MIXED
+
+
+def sample_page_indices(pages: int, sample_pages: int = DEFAULT_SAMPLE_PAGES) -> List[int]:
+    """在整个文档范围内均匀选取采样页"""
+    step = max(1, pages // max(1, sample_pages))
+    return list(range(0, pages, step))[:sample_pages]
+
+
+def _image_area_ratio(page, image_objects) -> float:
+    """图片对象覆盖页面面积的比例（重叠部分重复计算，结果截断到1）"""
+    width, height = page.get_size()
+    if width <= 0 or height <= 0:
+        return 0.0
+    area = 0.0
+    for obj in image_objects:
+        left, bottom, right, top = obj.get_pos()
+        area += max(0.0, right - left) * max(0.0, top - bottom)
+    return min(1.0, area / (width * height))
+
+
+def triage_pdf(file_path: Path, sample_pages: int = DEFAULT_SAMPLE_PAGES) -> Optional[TriageResult]:
+    """采样页面对PDF预分类，无法解析时返回None（调用方沿用原来的解析方法）"""
+    try:
+        import pypdfium2 as pdfium
+        import pypdfium2.raw as pdfium_c
+
+        pdf = pdfium.PdfDocument(str(file_path))
+        try:
+            pages = len(pdf)
+            samples = []
+            for index in sample_page_indices(pages, sample_pages):
+                page = pdf[index]
+                try:
+                    images = list(page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=1))
+                    textpage = page.get_textpage()
+                    try:
+                        chars = textpage.count_chars()
+                    finally:
+                        textpage.close()
+                    samples.append(PageSample(
+                        page_index=index,
+                        chars=chars,
+                        image_count=len(images),
+                        image_area_ratio=_image_area_ratio(page, images)
+                    ))
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+
+        return TriageResult(kind=classify_samples(samples), pages=pages, samples=samples)
+    except Exception:
+        return None
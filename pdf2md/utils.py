@@ -11,11 +11,12 @@ from typing import List, Dict, Any, Optional
 
 
 def get_file_hash(file_path: Path) -> str:
-    """获取文件MD5哈希值"""
+    """获取文件MD5哈希值（直接对文件的只读mmap计算，不经过Python读缓冲区复制）"""
+    from .pdf_source import PdfSource
+
     hash_md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
+    with PdfSource(file_path) as source, source.view() as view:
+        hash_md5.update(view)
     return hash_md5.hexdigest()
 
 
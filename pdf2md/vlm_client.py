@@ -0,0 +1,144 @@
+"""
+VLM服务并发客户端模块
+vlm-sglang-client后端由mineru逐个文档调用batch_predict，每个文档新建一个HTTP客户端，
+文档之间要等上一个文档的全部页面返回才开始下一个，服务端大部分时间只有一个文档的请求在处理。
+这里把各文档的页面请求交给同一个客户端：同时在途的页面请求数可配置，文档之间不等待；
+每个线程保持一个keep-alive连接，连接错误和服务端繁忙（429/5xx）时按指数退避重试
+"""
+
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+DEFAULT_TIMEOUT = 600.0
+
+# 服务端暂时无法处理，可以重试的状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class VlmClientOptions:
+    """并发客户端配置数据类，max_in_flight为0时使用mineru逐文档的请求方式"""
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT  # 同时在途的页面请求数（跨文档）
+    retries: int = DEFAULT_RETRIES  # 每个页面请求失败后的重试次数
+    backoff: float = DEFAULT_BACKOFF  # 第一次重试前等待的秒数，之后每次翻倍，最多MAX_BACKOFF秒
+    timeout: float = DEFAULT_TIMEOUT  # 单个请求的超时时间（秒）
+    lookahead_docs: int = 2  # 当前文档之后最多提前渲染并提交几个文档的页面，限制渲染图片占用的内存
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+
+class VlmRequestError(RuntimeError):
+    """页面请求在重试后仍然失败"""
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int, body: bytes):
+        super().__init__(f"HTTP {status}: {body[:200]!r}")
+        self.status = status
+
+
+class ConcurrentVlmClient:
+    """sglang /generate 接口的并发客户端
+
+    build_body把一页图片（base64字符串）转换成请求体；返回的页面结果与mineru的batch_predict相同（响应中的text）。
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        build_body: Callable[[str], Dict[str, Any]],
+        options: Optional[VlmClientOptions] = None
+    ):
+        self.options = options or VlmClientOptions()
+        url = urlsplit(server_url if "://" in server_url else f"http://{server_url}")
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"无效的服务地址: {server_url}")
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._host = url.hostname
+        self._port = url.port
+        self._path = "/generate"
+        self.build_body = build_body
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.options.max_in_flight), thread_name_prefix="pdf2md-vlm")
+        self.requests = 0  # 发出的请求总数（含重试）
+        self.retried = 0  # 重试次数
+
+    def _connection(self) -> http.client.HTTPConnection:
+        """当前线程的keep-alive连接"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connection_class(self._host, self._port, timeout=self.options.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _drop_connection(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _post(self, body: bytes) -> Dict[str, Any]:
+        with self._lock:
+            self.requests += 1
+        connection = self._connection()
+        connection.request("POST", self._path, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        data = response.read()
+        if response.status in RETRY_STATUS:
+            raise _RetryableStatus(response.status, data)
+        if response.status != 200:
+            raise VlmRequestError(f"VLM服务返回 HTTP {response.status}: {data[:200]!r}")
+        return json.loads(data)
+
+    def predict(self, image: str) -> str:
+        """请求一页，失败时按指数退避重试"""
+        body = json.dumps(self.build_body(image)).encode("utf-8")
+        attempt = 0
+        while True:
+            try:
+                return self._post(body)["text"]
+            except (OSError, http.client.HTTPException, _RetryableStatus) as e:
+                # 连接可能已经失效，下次请求重新建立
+                self._drop_connection()
+                if attempt >= self.options.retries:
+                    raise VlmRequestError(f"VLM页面请求失败（已重试{self.options.retries}次）: {e}") from e
+            time.sleep(min(MAX_BACKOFF, self.options.backoff * (2 ** attempt)))
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+
+    def submit_pages(self, images: List[str]) -> List[Future]:
+        """提交一个文档的全部页面，立即返回；在途请求数由线程数限制，文档之间共享"""
+        return [self._executor.submit(self.predict, image) for image in images]
+
+    def predict_pages(self, images: List[str]) -> List[str]:
+        return [future.result() for future in self.submit_pages(images)]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    def __enter__(self) -> "ConcurrentVlmClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
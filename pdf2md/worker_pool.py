@@ -0,0 +1,307 @@
+"""
+常驻模型工作进程池
+每个工作进程只加载一次pipeline模型并常驻内存，之后持续从任务队列领取PDF任务
+"""
+
+import os
+import signal
+import time
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.context import SpawnContext, SpawnProcess
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+# 工作进程内的状态（每个进程各自一份）
+_worker_state: Dict[str, Any] = {}
+
+
+@dataclass
+class WorkerJobResult:
+    """工作进程任务结果数据类"""
+    worker_pid: int
+    model_load_time: float
+    inference_time: float
+    result: Any
+    documents: int = 1
+
+
+@dataclass
+class WorkerStats:
+    """单个工作进程的统计数据类"""
+    worker_pid: int
+    model_load_time: float = 0.0
+    documents: int = 0
+    inference_time: float = 0.0
+
+
+def warm_up_pipeline_models(
+    lang: str = "ch",
+    formula_enable: bool = True,
+    table_enable: bool = True
+) -> float:
+    """预加载pipeline模型（布局、OCR、公式、表格），返回加载耗时"""
+    start_time = time.time()
+    from mineru.backend.pipeline.pipeline_analyze import ModelSingleton
+
+    # ModelSingleton按(lang, formula_enable, table_enable)缓存模型，
+    # 后续同参数的doc_analyze调用会直接复用
+    ModelSingleton().get_model(
+        lang=lang,
+        formula_enable=formula_enable,
+        table_enable=table_enable
+    )
+    return time.time() - start_time
+
+
+def _init_worker(lang: str, formula_enable: bool, table_enable: bool, use_gpu: bool, num_threads: int) -> None:
+    """工作进程初始化函数：与普通进程池相同地忽略Ctrl+C、设置设备和线程数，再预加载模型"""
+    init_conversion_worker(use_gpu, num_threads)
+
+    load_error = None
+    try:
+        model_load_time = warm_up_pipeline_models(lang, formula_enable, table_enable)
+    except Exception as e:
+        # 预加载失败时模型会在第一次推理时按需加载
+        model_load_time = 0.0
+        load_error = str(e)
+
+    _worker_state.update(
+        worker_pid=os.getpid(),
+        model_load_time=model_load_time,
+        load_error=load_error
+    )
+
+
+def threads_per_worker(max_workers: int) -> int:
+    """每个工作进程可用的计算线程数，避免多个进程各自占满全部核心"""
+    return max(1, (os.cpu_count() or 1) // max(1, max_workers))
+
+
+# 控制OpenMP/BLAS计算线程数的环境变量
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "OMP_THREAD_LIMIT")
+
+# 临时修改父进程环境变量期间，其他线程不能同时启动子进程
+_env_lock = threading.Lock()
+
+
+def set_thread_env(num_threads: int) -> None:
+    """设置计算线程数环境变量，只对之后才初始化OpenMP/BLAS的进程有效（工作进程内调用）"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(num_threads)
+
+
+@contextmanager
+def thread_env(num_threads: int) -> Iterator[None]:
+    """临时设置计算线程数环境变量，退出时恢复原值（未设置的变量重新删除）"""
+    with _env_lock:
+        saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        set_thread_env(num_threads)
+        try:
+            yield
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+class ThreadLimitedProcess(SpawnProcess):
+    """启动时带线程数环境变量的spawn进程：只在启动子进程的瞬间修改父进程环境，子进程启动时继承"""
+    num_threads = 1
+
+    def start(self) -> None:
+        with thread_env(self.num_threads):
+            super().start()
+
+
+class ThreadLimitedContext(SpawnContext):
+    """创建ThreadLimitedProcess的spawn上下文
+
+    ProcessPoolExecutor在提交任务时才按需启动子进程（进程退出后也会补充），
+    线程数环境变量随每次启动临时设置，不在父进程中保留。
+    """
+
+    def __init__(self, num_threads: int):
+        self.num_threads = num_threads
+
+    def Process(self, *args: Any, **kwargs: Any) -> ThreadLimitedProcess:
+        process = ThreadLimitedProcess(*args, **kwargs)
+        process.num_threads = self.num_threads
+        return process
+
+
+def init_conversion_worker(use_gpu: bool, num_threads: int) -> None:
+    """普通进程池工作进程的初始化函数
+
+    只依赖传入的参数，spawn启动的新进程也能正确初始化。
+    线程数环境变量在启动子进程时由ThreadLimitedContext临时设置，子进程启动时就已继承；
+    这里再设置一次torch的线程数，防止子进程在初始化函数之前已经导入了torch。
+    """
+    # Ctrl+C由主进程统一处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if not use_gpu:
+        os.environ["MINERU_DEVICE_MODE"] = "cpu"
+    set_thread_env(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    _worker_state.update(worker_pid=os.getpid(), num_threads=num_threads)
+
+
+def create_process_executor(max_workers: int, use_gpu: bool = False) -> ProcessPoolExecutor:
+    """创建用于转换任务的进程池（spawn启动，任务函数和参数必须可pickle）
+
+    每个工作进程的计算线程数为threads_per_worker(max_workers)，父进程的环境变量不受影响。
+    """
+    num_threads = threads_per_worker(max_workers)
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=ThreadLimitedContext(num_threads),
+        initializer=init_conversion_worker,
+        initargs=(use_gpu, num_threads)
+    )
+
+
+def _run_job(fn: Callable[..., Any], args: Tuple[Any, ...]) -> WorkerJobResult:
+    """在工作进程中执行任务并记录推理耗时"""
+    start_time = time.time()
+    result = fn(*args)
+    return WorkerJobResult(
+        worker_pid=_worker_state.get("worker_pid", os.getpid()),
+        model_load_time=_worker_state.get("model_load_time", 0.0),
+        inference_time=time.time() - start_time,
+        result=result,
+        # 批量任务（如convert_batch）返回每个文档的结果列表，按实际文档数计数
+        documents=len(result) if isinstance(result, list) else 1
+    )
+
+
+class ModelWorkerPool:
+    """常驻模型工作进程池"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        lang: str = "ch",
+        formula_enable: bool = True,
+        table_enable: bool = True,
+        use_gpu: bool = False
+    ):
+        self.max_workers = max_workers
+        self.lang = lang
+        self.formula_enable = formula_enable
+        self.table_enable = table_enable
+        self.use_gpu = use_gpu
+        self.stats_lock = threading.Lock()
+        self.worker_stats: Dict[int, WorkerStats] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """启动工作进程池"""
+        if self._executor is not None:
+            return
+
+        # 使用spawn启动方式，避免fork后CUDA上下文和模型状态损坏；每个进程的计算线程数按进程数分配
+        num_threads = threads_per_worker(self.max_workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=ThreadLimitedContext(num_threads),
+            initializer=_init_worker,
+            initargs=(self.lang, self.formula_enable, self.table_enable, self.use_gpu, num_threads)
+        )
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """提交任务，fn必须是可pickle的模块级函数，返回的Future结果为fn的返回值"""
+        if self._executor is None:
+            self.start()
+
+        outer: Future = Future()
+        inner = self._executor.submit(_run_job, fn, args)
+
+        def _on_done(future: Future) -> None:
+            try:
+                job = future.result()
+            except BaseException as e:
+                outer.set_exception(e)
+                return
+            self._record(job)
+            outer.set_result(job.result)
+
+        inner.add_done_callback(_on_done)
+        return outer
+
+    def _record(self, job: WorkerJobResult) -> None:
+        """记录工作进程统计"""
+        with self.stats_lock:
+            stats = self.worker_stats.get(job.worker_pid)
+            if stats is None:
+                stats = WorkerStats(worker_pid=job.worker_pid, model_load_time=job.model_load_time)
+                self.worker_stats[job.worker_pid] = stats
+            stats.documents += job.documents
+            stats.inference_time += job.inference_time
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取模型加载与推理耗时统计"""
+        with self.stats_lock:
+            workers = list(self.worker_stats.values())
+
+        total_documents = sum(s.documents for s in workers)
+        total_inference = sum(s.inference_time for s in workers)
+        total_load = sum(s.model_load_time for s in workers)
+
+        return {
+            "workers": len(workers),
+            "documents": total_documents,
+            "total_model_load_time": total_load,
+            "total_inference_time": total_inference,
+            "avg_inference_time_per_document": total_inference / total_documents if total_documents else 0,
+            "per_worker": [
+                {
+                    "worker_pid": s.worker_pid,
+                    "model_load_time": s.model_load_time,
+                    "documents": s.documents,
+                    "inference_time": s.inference_time
+                }
+                for s in workers
+            ]
+        }
+
+    def print_statistics(self) -> None:
+        """打印工作进程池统计"""
+        stats = self.get_statistics()
+        if not stats["documents"]:
+            print("工作进程池没有处理任何文档")
+            return
+
+        print(f"\n工作进程池统计:")
+        print(f"  工作进程数: {stats['workers']}")
+        print(f"  处理文档数: {stats['documents']}")
+        print(f"  模型加载总耗时: {stats['total_model_load_time']:.1f}秒")
+        print(f"  推理总耗时: {stats['total_inference_time']:.1f}秒")
+        print(f"  平均推理耗时/文档: {stats['avg_inference_time_per_document']:.2f}秒")
+        for worker in stats["per_worker"]:
+            print(
+                f"  进程 {worker['worker_pid']}: 模型加载 {worker['model_load_time']:.1f}秒, "
+                f"文档 {worker['documents']} 个, 推理 {worker['inference_time']:.1f}秒"
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭工作进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    def __enter__(self) -> "ModelWorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
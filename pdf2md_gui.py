@@ -781,34 +781,36 @@ class PDF2MDGUI:
                     self.root.after(0, lambda: self._conversion_error("转换失败", filename))
             
             elif input_path.is_dir():
-                # 批量转换 - 递归查找所有PDF文件
-                pdf_files = list(input_path.rglob("*.pdf"))
+                # 批量转换 - 后台递归遍历目录，找到一个PDF文件就提交一个任务
+                from pdf2md.discovery import FileDiscovery
+                discovery = FileDiscovery(input_path)
                 
-                if not pdf_files:
-                    self.root.after(0, lambda: self._conversion_error("未找到PDF文件"))
-                    return
-                
-                # 添加所有任务
-                for pdf_file in pdf_files:
-                    if not self.is_converting:  # 检查是否被停止
-                        return
-                    filename = pdf_file.name
-                    self.add_processing_task(filename)
-                    self.batch_processor.add_task(pdf_file, Path(output_dir), options)
-                
-                self.log(f"找到 {len(pdf_files)} 个PDF文件")
+                def task_source():
+                    for pdf_file, _ in discovery:
+                        if not self.is_converting:  # 检查是否被停止
+                            discovery.stop()
+                            return
+                        self.add_processing_task(pdf_file.name)
+                        yield pdf_file, Path(output_dir), options
                 
                 # 开始批量处理
                 def progress_callback(progress: int, message: str):
                     if not self.is_converting:  # 检查是否被停止
                         return
+                    if not discovery.finished:
+                        message = f"{message}（仍在查找文件）"
                     self.root.after(0, lambda: self._update_progress(progress, message))
                 
-                result = self.batch_processor.start_batch_processing(progress_callback)
+                result = self.batch_processor.start_batch_processing(progress_callback, task_source=task_source())
                 
                 if not self.is_converting:  # 检查是否被停止
                     return
                 
+                self.log(f"找到 {discovery.discovered_count} 个PDF文件")
+                if discovery.discovered_count == 0:
+                    self.root.after(0, lambda: self._conversion_error("未找到PDF文件"))
+                    return
+                
                 if result and result["success_count"] > 0:
                     self.root.after(0, lambda: self._batch_conversion_complete(result))
                 else:
@@ -71,15 +71,23 @@ class StrictMineruProcessor:
             from mineru.backend.pipeline import pipeline_analyze
             from mineru.cli.common import read_fn
             
+            from pdf2md.triage import KIND_LABELS, triage_pdf
+            
             # 读取PDF字节
             pdf_bytes = read_fn(pdf_path)
             
+            # 预分类：文字型走txt方法，只有扫描型才走OCR
+            triage = triage_pdf(pdf_path)
+            parse_method = triage.method if triage is not None else "auto"
+            if triage is not None:
+                print(f"  📋 预分类: {KIND_LABELS[triage.kind]} (解析方法: {parse_method})")
+            
             # 第一步：文档分析
             print(f"  🔍 进行文档分析...")
             pipeline_analyze.doc_analyze(
                 pdf_bytes_list=[pdf_bytes],
                 lang_list=["ch"],
-                parse_method="auto",
+                parse_method=parse_method,
                 formula_enable=True,
                 table_enable=True
             )
@@ -161,14 +169,15 @@ class StrictMineruProcessor:
         # 确保输出目录存在
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 查找所有PDF文件
-        pdf_files = list(pdf_dir.rglob("*.pdf"))
-        print(f"📁 找到 {len(pdf_files)} 个PDF文件")
+        # 边遍历目录边处理，不必等所有PDF文件都找到
+        from pdf2md.discovery import FileDiscovery
+        discovery = FileDiscovery(pdf_dir)
         
         results = []
         
-        for i, pdf_file in enumerate(pdf_files, 1):
-            print(f"\n📄 处理第 {i}/{len(pdf_files)} 个文件: {pdf_file.name}")
+        for i, (pdf_file, _) in enumerate(discovery, 1):
+            total = f"{discovery.discovered_count}" if discovery.finished else f"{discovery.discovered_count}+"
+            print(f"\n📄 处理第 {i}/{total} 个文件: {pdf_file.name}")
             
             # 测试mineru兼容性
             if not self.test_mineru_compatibility(pdf_file):
@@ -198,6 +207,7 @@ class StrictMineruProcessor:
             
             results.append(result)
         
+        print(f"📁 共找到 {discovery.discovered_count} 个PDF文件")
         return results
     
     def generate_report(self, results: List[ProcessingResult], output_dir: Path):
@@ -0,0 +1,184 @@
+"""
+高级PDF处理器测试
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from pdf2md import advanced_processor
+from pdf2md.advanced_processor import AdvancedPDFProcessor, ProcessorResult, ProcessorType
+from pdf2md.triage import SCANNED, TriageResult
+
+
+PAGE_COUNT = 10
+
+
+def _extractor(name: str, good_pages, delay: float = 0.0, calls=None):
+    """构造一个假的处理器，只有good_pages中的页能提取到文本"""
+    def run(pdf_path: Path, page_numbers=None, store=None) -> ProcessorResult:
+        if calls is not None:
+            calls.append((name, page_numbers))
+        time.sleep(delay)
+        requested = page_numbers if page_numbers is not None else range(1, PAGE_COUNT + 1)
+        pages = {p: f"{name} extracted text of page {p}" for p in requested if p in good_pages}
+        if store is not None:
+            for page_num, text in pages.items():
+                store.add(page_num, text, name)
+        return ProcessorResult(
+            success=bool(pages),
+            processor=name,
+            page_count=len(list(requested)),
+            text_pages=len(pages),
+            pages={} if store is not None else pages
+        )
+    return run
+
+
+ALL_PAGES = set(range(1, PAGE_COUNT + 1))
+
+
+@pytest.fixture
+def pdf_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(advanced_processor, "triage_pdf", lambda path: None)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+def _processor(processors, strategy="race") -> AdvancedPDFProcessor:
+    processor = AdvancedPDFProcessor(strategy=strategy, race_timeout=5.0, min_text_coverage=0.5)
+    processor.processors = processors
+    return processor
+
+
+def _page_sources(output: Path):
+    """输出markdown中每页的来源处理器"""
+    text = output.read_text(encoding="utf-8")
+    return [line.split()[0] for line in text.splitlines() if "extracted text" in line]
+
+
+class TestRaceStrategy:
+    """同时运行文本提取器的策略测试类"""
+
+    def test_first_passing_result_wins(self, pdf_file, tmp_path):
+        """测试采用最先达到质量阈值的结果，不等待较慢的提取器"""
+        processor = _processor({
+            ProcessorType.PYPDF: _extractor("pypdf", ALL_PAGES, delay=1.0),
+            ProcessorType.PYMUPDF: _extractor("pymupdf", ALL_PAGES),
+        })
+        output = tmp_path / "doc.md"
+
+        start = time.time()
+        result = processor.process_pdf(pdf_file, output)
+
+        assert time.time() - start < 0.9
+        assert result.processor == "pymupdf"
+        assert _page_sources(output) == ["pymupdf"] * PAGE_COUNT
+
+    def test_abandoned_extractor_finishes_before_ocr(self, pdf_file, tmp_path):
+        """测试放弃的提取器在下一页结束，OCR在它结束之后才启动；提取器的逐页结果写入各自的暂存目录"""
+        events = []
+
+        def slow(pdf_path, page_numbers=None, store=None):
+            assert store is not None
+            try:
+                for page_num in range(1, PAGE_COUNT + 1):
+                    time.sleep(0.05)
+                    store.add(page_num, f"slow extracted text of page {page_num}", "pypdf")
+            finally:
+                events.append("slow finished")
+            return ProcessorResult(success=True, processor="pypdf", page_count=PAGE_COUNT, text_pages=PAGE_COUNT)
+
+        def ocr(pdf_path, page_numbers=None, store=None):
+            events.append("ocr started")
+            return _extractor("ocrmypdf", ALL_PAGES)(pdf_path, page_numbers, store)
+
+        processor = _processor({
+            ProcessorType.PYPDF: slow,
+            ProcessorType.PYMUPDF: _extractor("pymupdf", set(range(1, 7))),
+            ProcessorType.OCRMYPDF: ocr,
+        })
+        output = tmp_path / "doc.md"
+
+        start = time.time()
+        result = processor.process_pdf(pdf_file, output)
+
+        assert time.time() - start < 0.4
+        assert events == ["slow finished", "ocr started"]
+        assert result.processor == "pymupdf+ocrmypdf"
+
+    def test_only_missing_pages_go_to_ocr(self, pdf_file, tmp_path):
+        """测试只有缺失文本的页交给OCR，结果按页合并"""
+        calls = []
+        processor = _processor({
+            ProcessorType.PYPDF: _extractor("pypdf", {1, 2, 3}),
+            ProcessorType.OCRMYPDF: _extractor("ocrmypdf", ALL_PAGES, calls=calls),
+        })
+        output = tmp_path / "doc.md"
+
+        result = processor.process_pdf(pdf_file, output)
+
+        assert calls == [("ocrmypdf", [4, 5, 6, 7, 8, 9, 10])]
+        assert result.processor == "pypdf+ocrmypdf"
+        assert _page_sources(output) == ["pypdf"] * 3 + ["ocrmypdf"] * 7
+
+    def test_partial_results_merged_when_ocr_fails(self, pdf_file, tmp_path):
+        """测试OCR失败时合并各文本提取器得到的页"""
+        processor = _processor({
+            ProcessorType.PYPDF: _extractor("pypdf", {1}),
+            ProcessorType.PDFPLUMBER: _extractor("pdfplumber", {1, 2, 3}),
+            ProcessorType.OCRMYPDF: _extractor("ocrmypdf", set()),
+        })
+        output = tmp_path / "doc.md"
+
+        result = processor.process_pdf(pdf_file, output)
+
+        assert result.success
+        assert result.text_pages == 3
+        assert len(_page_sources(output)) == 3
+
+    def test_scanned_skips_text_extractors(self, pdf_file, tmp_path, monkeypatch):
+        """测试预分类为扫描型时直接OCR"""
+        monkeypatch.setattr(advanced_processor, "triage_pdf",
+                            lambda path: TriageResult(kind=SCANNED, pages=PAGE_COUNT))
+        calls = []
+        processor = _processor({
+            ProcessorType.PYPDF: _extractor("pypdf", ALL_PAGES, calls=calls),
+            ProcessorType.PYTESSERACT: _extractor("pytesseract", ALL_PAGES, calls=calls),
+        })
+        assert processor.process_pdf(pdf_file, tmp_path / "doc.md").processor == "pytesseract"
+        assert [name for name, _ in calls] == ["pytesseract"]
+
+    def test_all_processors_fail(self, pdf_file, tmp_path):
+        """测试所有处理器都失败时不生成输出"""
+        processor = _processor({ProcessorType.PYPDF: _extractor("pypdf", set())})
+        result = processor.process_pdf(pdf_file, tmp_path / "doc.md")
+        assert not result.success
+        assert list(tmp_path.iterdir()) == [pdf_file]
+
+    def test_unknown_strategy(self):
+        """测试未知策略报错"""
+        with pytest.raises(ValueError):
+            AdvancedPDFProcessor(strategy="parallel")
+
+
+class TestSequentialStrategy:
+    """依次尝试的策略测试类"""
+
+    def test_next_processor_gets_missing_pages(self, pdf_file, tmp_path):
+        """测试后面的处理器只处理前面缺失的页"""
+        calls = []
+        processor = _processor({
+            ProcessorType.PYPDF: _extractor("pypdf", set(range(1, 9)), calls=calls),
+            ProcessorType.PDFPLUMBER: _extractor("pdfplumber", {9}, calls=calls),
+            ProcessorType.PYTESSERACT: _extractor("pytesseract", ALL_PAGES, calls=calls),
+        }, strategy="sequential")
+        output = tmp_path / "doc.md"
+
+        result = processor.process_pdf(pdf_file, output)
+
+        assert calls == [("pypdf", None), ("pdfplumber", [9, 10]), ("pytesseract", [10])]
+        assert result.processor == "pypdf+pdfplumber+pytesseract"
+        assert _page_sources(output) == ["pypdf"] * 8 + ["pdfplumber", "pytesseract"]
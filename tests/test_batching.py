@@ -0,0 +1,96 @@
+"""
+跨文档批量推理测试
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pdf2md.batching as batching
+from pdf2md.batching import count_pdf_pages, iter_inference_batches, plan_inference_batches
+
+
+def _task(name: str, lang: str = "ch"):
+    return SimpleNamespace(
+        file_path=Path(f"/pdfs/{name}"),
+        lang=lang,
+        backend="pipeline",
+        method="auto",
+        formula_enable=True,
+        table_enable=True,
+        output_profile="md+images",
+        serialization="json"
+    )
+
+
+class TestPlanInferenceBatches:
+    """推理批次划分测试类"""
+
+    def test_groups_by_target_pages(self, monkeypatch):
+        """测试按目标页数分组"""
+        pages = {"a": 5, "b": 8, "c": 6, "d": 3}
+        monkeypatch.setattr(batching, "count_pdf_pages", lambda p: pages[p.stem])
+
+        tasks = [_task(f"{name}.pdf") for name in "abcd"]
+        batches = plan_inference_batches(tasks, target_pages=14)
+
+        assert [[t.file_path.stem for t in b.tasks] for b in batches] == [["a", "b"], ["c", "d"]]
+        assert [b.page_count for b in batches] == [13, 9]
+        assert batches[0].page_counts == [5, 8]
+
+    def test_large_file_gets_own_batch(self, monkeypatch):
+        """测试超过目标页数的文件单独成批"""
+        pages = {"small": 3, "huge": 900, "tail": 2}
+        monkeypatch.setattr(batching, "count_pdf_pages", lambda p: pages[p.stem])
+
+        tasks = [_task("small.pdf"), _task("huge.pdf"), _task("tail.pdf")]
+        batches = plan_inference_batches(tasks, target_pages=200)
+
+        assert [len(b.tasks) for b in batches] == [1, 1, 1]
+
+    def test_same_stem_not_in_one_batch(self, monkeypatch):
+        """测试同名文件不会分到同一批次"""
+        monkeypatch.setattr(batching, "count_pdf_pages", lambda p: 1)
+
+        tasks = [_task("x/doc.pdf"), _task("y/doc.pdf")]
+        batches = plan_inference_batches(tasks, target_pages=200)
+
+        assert len(batches) == 2
+
+    def test_options_split_batches(self, monkeypatch):
+        """测试不同转换参数的任务分到不同批次"""
+        monkeypatch.setattr(batching, "count_pdf_pages", lambda p: 1)
+
+        tasks = [_task("a.pdf"), _task("b.pdf", lang="en")]
+        batches = plan_inference_batches(tasks, target_pages=200)
+
+        assert len(batches) == 2
+
+    def test_max_files(self, monkeypatch):
+        """测试每批文件数上限"""
+        monkeypatch.setattr(batching, "count_pdf_pages", lambda p: 1)
+
+        tasks = [_task(f"{i}.pdf") for i in range(5)]
+        batches = plan_inference_batches(tasks, target_pages=200, max_files=2)
+
+        assert [len(b.tasks) for b in batches] == [2, 2, 1]
+
+    def test_batches_yielded_before_input_exhausted(self, monkeypatch):
+        """测试凑满的批次在后续任务到来前就产出"""
+        monkeypatch.setattr(batching, "count_pdf_pages", lambda p: 1)
+        consumed = []
+
+        def tasks():
+            for i in range(4):
+                consumed.append(i)
+                yield _task(f"{i}.pdf")
+
+        first = next(iter_inference_batches(tasks(), target_pages=2))
+        assert len(first.tasks) == 2
+        assert consumed == [0, 1, 2]
+
+
+def test_count_pdf_pages_fallback(tmp_path):
+    """测试无法解析PDF时按文件大小估算页数"""
+    pdf_file = tmp_path / "broken.pdf"
+    pdf_file.write_bytes(b"x" * (300 * 1024))
+    assert count_pdf_pages(pdf_file) >= 1
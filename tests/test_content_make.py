@@ -0,0 +1,92 @@
+"""
+一次遍历生成markdown/content_list/结构化JSON测试
+"""
+
+from pdf2md.content_make import NLP_MD, ContentFlavour, ContentMaker, SectionTracker, assign_sections
+
+
+def _block(block_type, text, **extra):
+    return {"type": block_type, "lines": [{"spans": [{"type": "text", "content": text}]}], **extra}
+
+
+def _flavour(calls, **options):
+    def merge_text(block):
+        calls.append(id(block))
+        return "".join(span.get("content", "") for line in block["lines"] for span in line["spans"])
+    return ContentFlavour(merge_text, lambda block: min(block.get("level", 1), 4), **options)
+
+
+_IMAGE = {
+    "type": "image",
+    "blocks": [
+        _block("image_caption", "图1"),
+        {"type": "image_body", "lines": [{"spans": [{"type": "image", "image_path": "a.jpg"}]}]},
+        _block("image_footnote", "注"),
+    ],
+}
+_TABLE = {
+    "type": "table",
+    "blocks": [
+        {"type": "table_body", "lines": [{"spans": [{"type": "table", "html": "<table></table>", "latex": "L", "image_path": "t.jpg"}]}]},
+        _block("table_footnote", "来源"),
+    ],
+}
+_PDF_INFO = [
+    {"page_idx": 0, "para_blocks": [_block("title", "引言", level=1), _block("text", "正文"), _IMAGE]},
+    {"page_idx": 1, "para_blocks": []},
+    {"page_idx": 2, "para_blocks": [_block("title", "方法", level=2), _TABLE, _block("text", " ")]},
+]
+
+
+class TestContentMaker:
+    """一次遍历生成内容测试类"""
+
+    def test_single_pass(self):
+        """测试一次遍历同时生成三种输出，每个段落只合并一次文本"""
+        calls = []
+        maker = ContentMaker(_flavour(calls, table_latex=True), img_buket_path="images", structured=True)
+        content = maker.make(_PDF_INFO)
+
+        assert content.markdown == "\n\n".join([
+            "# 引言", "正文", "图1  \n![](images/a.jpg)  \n注", "## 方法", "\n<table></table>\n\n来源  ".strip(),
+        ])
+        assert [item["page_idx"] for item in content.content_list] == [0, 0, 0, 2, 2, 2]
+        assert content.content_list[0] == {"type": "text", "text": "引言", "text_level": 1, "page_idx": 0}
+        assert content.content_list[2]["img_path"] == "images/a.jpg"
+        assert content.content_list[4]["table_body"] == "L"
+        assert [item["section"] for item in content.structured] == [
+            ["引言"], ["引言"], ["引言"], ["引言", "方法"], ["引言", "方法"], ["引言", "方法"]
+        ]
+        assert content.structured[1]["markdown"] == "正文"
+        assert len(calls) == len(set(calls)) == 7
+
+    def test_disabled_outputs(self):
+        """测试未请求的输出为None，NLP_MD不输出图片和表格"""
+        maker = ContentMaker(_flavour([]), make_md_mode=NLP_MD, content_list=False)
+        content = maker.make(_PDF_INFO)
+        assert content.content_list is None and content.structured is None
+        assert content.markdown == "# 引言\n\n正文\n\n## 方法"
+
+    def test_equation(self):
+        """测试pipeline公式没有latex时引用截图，VLM直接使用文本"""
+        no_latex = {"type": "interline_equation", "lines": [{"spans": [{"type": "interline_equation", "content": "", "image_path": "e.jpg"}]}]}
+        empty = {"type": "interline_equation", "lines": []}
+        pipeline = ContentMaker(_flavour([], equation_image=True), img_buket_path="images").make(
+            [{"page_idx": 0, "para_blocks": [no_latex, empty]}]
+        )
+        assert pipeline.markdown == "![](images/e.jpg)"
+        assert pipeline.content_list == [{"type": "equation", "img_path": "images/e.jpg", "page_idx": 0}]
+
+        vlm = ContentMaker(_flavour([])).make([{"page_idx": 0, "para_blocks": [empty]}])
+        assert vlm.markdown == ""
+        assert vlm.content_list == [{"type": "equation", "text": "", "text_format": "latex", "page_idx": 0}]
+
+    def test_sections_continue_across_calls(self):
+        """测试分窗口、分片时章节路径延续"""
+        maker = ContentMaker(_flavour([]), structured=True)
+        maker.make(_PDF_INFO[:1])
+        second = maker.make([{"page_idx": 0, "para_blocks": [_block("text", "续")]}])
+        assert second.structured[0]["section"] == ["引言"]
+
+        items = [{"text": "A", "text_level": 1}, {"text": "x"}, {"text": "B", "text_level": 1}]
+        assert [item["section"] for item in assign_sections(items, SectionTracker())] == [["A"], ["A"], ["B"]]
@@ -0,0 +1,74 @@
+"""
+调试PDF延迟渲染测试
+"""
+
+import pytest
+
+from pdf2md.debug_render import (
+    _geometry_stem, _load_pdf_bytes, find_geometry_files, render_request, save_geometry
+)
+from pdf2md.pdf_source import PdfSource
+from pdf2md.serialization import Serializer, load_artifact
+from pdf2md.streaming import StreamingOutput
+
+_PDF = b"%PDF-1.4\n%%EOF\n"
+
+
+class TestDebugRender:
+    """调试PDF延迟渲染测试类"""
+
+    def test_save_geometry(self, tmp_path):
+        """测试几何信息与渲染参数一起保存，VLM后端不绘制span"""
+        pdf_path = tmp_path / "doc.pdf"
+        pdf_path.write_bytes(_PDF)
+        request = render_request(PdfSource(pdf_path), "pipeline", 0, None, True, True)
+        path = save_geometry(Serializer("compact", "gzip"), tmp_path, "doc", [{"page_idx": 0}], request)
+        assert path.name == "doc_bbox.json.gz"
+        geometry = load_artifact(path)
+        assert geometry["pdf_info"] == [{"page_idx": 0}]
+        assert geometry["source"] == str(pdf_path.resolve())
+        assert geometry["span"] is True
+        assert render_request(PdfSource(pdf_path), "vlm", 0, None, True, True)["span"] is False
+
+    def test_geometry_stem(self, tmp_path):
+        """测试从几何信息文件名还原文档名"""
+        assert _geometry_stem(tmp_path / "doc_bbox.json") == "doc"
+        assert _geometry_stem(tmp_path / "my_doc_bbox.msgpack.zst") == "my_doc"
+
+    def test_find_geometry_files(self, tmp_path, capsys):
+        """测试按markdown、几何信息文件和目录查找"""
+        sub = tmp_path / "a"
+        sub.mkdir()
+        (sub / "doc.md").write_text("# doc", encoding="utf-8")
+        geometry = sub / "doc_bbox.json"
+        geometry.write_text("{}", encoding="utf-8")
+        (sub / "other_bbox.json.gz").write_bytes(b"")
+        (sub / "lonely.md").write_text("", encoding="utf-8")
+
+        assert list(find_geometry_files([sub / "doc.md", geometry])) == [geometry]
+        assert list(find_geometry_files([tmp_path])) == [geometry, sub / "other_bbox.json.gz"]
+        assert list(find_geometry_files([sub / "lonely.md"])) == []
+        assert "未找到几何信息" in capsys.readouterr().out
+
+    def test_pdf_bytes_fallback_to_origin(self, tmp_path):
+        """测试原PDF不存在时使用转换时转储的 _origin.pdf"""
+        pdf_path = tmp_path / "doc.pdf"
+        pdf_path.write_bytes(_PDF)
+        assert _load_pdf_bytes({"source": str(pdf_path)}, tmp_path, "doc") == _PDF
+
+        (tmp_path / "doc_origin.pdf").write_bytes(b"%PDF-origin")
+        assert _load_pdf_bytes({"source": str(tmp_path / "moved.pdf")}, tmp_path, "doc") == b"%PDF-origin"
+        with pytest.raises(FileNotFoundError):
+            _load_pdf_bytes({"source": None}, tmp_path / "missing", "doc")
+
+    def test_streaming_output_geometry(self, tmp_path):
+        """测试分窗口转换时逐窗口追加几何信息"""
+        request = {"source": "/pdfs/doc.pdf", "backend": "pipeline", "layout": True, "span": False}
+        with StreamingOutput(tmp_path, "doc", dump_middle_json=False, geometry=request) as output:
+            output.write_middle({"pdf_info": [{"page_idx": 0}]}, 0)
+            output.write_middle({"pdf_info": [{"page_idx": 0}]}, 1)
+
+        geometry = load_artifact(tmp_path / "doc_bbox.json")
+        assert [page["page_idx"] for page in geometry["pdf_info"]] == [0, 1]
+        assert geometry["source"] == "/pdfs/doc.pdf" and geometry["span"] is False
+        assert not (tmp_path / "doc_middle.json").exists()
@@ -0,0 +1,83 @@
+"""
+文件发现测试
+"""
+
+import os
+
+import pytest
+
+from pdf2md.discovery import FileDiscovery, find_pdf_files, iter_pdf_files
+
+
+def _make_tree(root):
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "one.pdf").write_bytes(b"1")
+    (root / "a" / "two.pdf").write_bytes(b"22")
+    (root / "a" / "b" / "three.pdf").write_bytes(b"333")
+    (root / "a" / "notes.txt").write_text("x")
+    (root / "a" / "dir.pdf").mkdir()
+
+
+class TestDiscovery:
+    """文件发现测试类"""
+
+    def test_iter_pdf_files_recursive_with_sizes(self, tmp_path):
+        """测试递归查找PDF并返回文件大小"""
+        _make_tree(tmp_path)
+        found = {path.name: size for path, size in iter_pdf_files(tmp_path)}
+        assert found == {"one.pdf": 1, "two.pdf": 2, "three.pdf": 3}
+
+    def test_extension_case_insensitive(self, tmp_path):
+        """测试扩展名不区分大小写"""
+        for name in ("upper.PDF", "mixed.Pdf", "lower.pdf", "other.PDFX"):
+            (tmp_path / name).write_bytes(b"1")
+        assert sorted(path.name for path, _ in iter_pdf_files(tmp_path)) == ["lower.pdf", "mixed.Pdf", "upper.PDF"]
+
+    def test_find_pdf_files_nonexistent_dir(self, tmp_path):
+        """测试目录不存在时返回空列表"""
+        assert find_pdf_files(tmp_path / "missing") == []
+
+    def test_background_discovery(self, tmp_path):
+        """测试后台遍历结果与统计"""
+        _make_tree(tmp_path)
+        discovery = FileDiscovery(tmp_path, max_queued=1)
+        names = sorted(path.name for path, _ in discovery)
+
+        assert names == ["one.pdf", "three.pdf", "two.pdf"]
+        assert discovery.finished
+        assert discovery.discovered_count == 3
+        assert discovery.discovered_bytes == 6
+        assert discovery.complete
+
+    @pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root可以读取无权限的目录")
+    def test_unreadable_subdirectory_marks_incomplete(self, tmp_path):
+        """测试子目录无法读取时记录错误，遍历不完整"""
+        _make_tree(tmp_path)
+        locked = tmp_path / "a" / "b"
+        locked.chmod(0)
+        try:
+            discovery = FileDiscovery(tmp_path)
+            names = sorted(path.name for path, _ in discovery)
+        finally:
+            locked.chmod(0o755)
+
+        assert names == ["one.pdf", "two.pdf"]
+        assert discovery.finished
+        assert [path for path, _ in discovery.errors] == [str(locked)]
+        assert not discovery.complete
+
+    def test_scandir_error_marks_incomplete(self, tmp_path, monkeypatch):
+        """测试目录读取失败（例如网络共享暂时不可用）时记录错误"""
+        _make_tree(tmp_path)
+        real_scandir = os.scandir
+
+        def flaky_scandir(path):
+            if os.path.basename(path) == "a":
+                raise OSError("网络共享不可用")
+            return real_scandir(path)
+
+        monkeypatch.setattr("pdf2md.discovery.os.scandir", flaky_scandir)
+        errors = []
+        found = [path.name for path, _ in iter_pdf_files(tmp_path, errors)]
+        assert found == ["one.pdf"]
+        assert len(errors) == 1 and errors[0][0] == str(tmp_path / "a")
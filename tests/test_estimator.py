@@ -4,7 +4,18 @@
 
 import tempfile
 from pathlib import Path
-from pdf2md.estimator import TimeEstimator
+from pdf2md.estimator import (
+    LearnedTimeEstimator, PdfFeatures, TimeEstimator, estimate_makespan
+)
+from pdf2md.logger import ConversionLogger
+
+_CONFIG = {
+    'time_estimation': {
+        'avg_time_per_mb': 2.0,
+        'min_time_per_file': 1.0,
+        'max_time_per_file': 60.0
+    }
+}
 
 
 class TestTimeEstimator:
@@ -243,4 +254,55 @@ class TestTimeEstimator:
         estimator.print_estimation([], workers=1)
         captured = capsys.readouterr()
         
-        assert "没有找到PDF文件" in captured.out 
\ No newline at end of file
+        assert "没有找到PDF文件" in captured.out
+
+
+class TestLearnedTimeEstimator:
+    """学习型时间预估器测试类"""
+
+    def test_fallback_without_samples(self):
+        """测试样本不足时按文件大小预估"""
+        estimator = LearnedTimeEstimator(_CONFIG)
+        assert estimator.predict(PdfFeatures(pages=10, size_mb=5.0)) == 10.0
+
+    def test_learns_linear_cost(self):
+        """测试按页数和OCR页数学到的耗时"""
+        estimator = LearnedTimeEstimator(_CONFIG)
+        for pages in range(1, 30, 3):
+            for has_text in (True, False):
+                features = PdfFeatures(pages=pages, size_mb=pages * 0.1, has_text_layer=has_text)
+                duration = 2.0 + 0.5 * pages + (1.5 * pages if not has_text else 0.0)
+                estimator.observe(features, duration)
+
+        scanned = estimator.predict(PdfFeatures(pages=40, size_mb=4.0, has_text_layer=False))
+        text = estimator.predict(PdfFeatures(pages=40, size_mb=4.0))
+        assert abs(scanned - 82.0) < 1.0
+        assert abs(text - 22.0) < 1.0
+        # 不同后端的模型互不影响
+        assert estimator.predict(PdfFeatures(pages=40, size_mb=4.0), backend="vlm") == 8.0
+
+    def test_fit_from_log(self, tmp_path):
+        """测试从转换日志拟合，跳过失败记录和缓存命中"""
+        logger = ConversionLogger(tmp_path)
+        for pages in range(1, 11):
+            logger.log_conversion(
+                file_path=f"/pdfs/{pages}.pdf", file_size=pages * 1024 * 1024,
+                duration=3.0 * pages, success=True, pages=pages,
+                backend="pipeline", method="auto", cache_hit=False
+            )
+        logger.log_conversion(file_path="/pdfs/c.pdf", file_size=1024, duration=0.1,
+                              success=True, pages=50, cache_hit=True)
+        logger.log_conversion(file_path="/pdfs/f.pdf", file_size=1024, duration=0.1,
+                              success=False, error_message="x", pages=50)
+        logger.log_conversion(file_path="/pdfs/old.pdf", file_size=1024, duration=9.0, success=True)
+
+        estimator = LearnedTimeEstimator(_CONFIG)
+        assert estimator.fit_from_log(logger) == 10
+        assert abs(estimator.predict(PdfFeatures(pages=20, size_mb=20.0)) - 60.0) < 1.0
+
+    def test_estimate_makespan(self):
+        """测试最长任务优先分配的总耗时"""
+        assert estimate_makespan([], 2) == 0.0
+        assert estimate_makespan([4, 3, 3, 2, 2], 2) == 8.0
+        assert estimate_makespan([10, 1, 1], 4) == 10.0
+        assert estimate_makespan([1, 2, 3], 1) == 6.0
@@ -1 +1,73 @@
- 
\ No newline at end of file
+"""
+转换日志测试
+"""
+
+import json
+import threading
+
+from pdf2md.logger import ConversionLogger
+
+
+class TestConversionLogger:
+    """转换日志测试类"""
+
+    def test_log_appends_one_line_per_record(self, tmp_path):
+        """测试每次记录追加一行"""
+        logger = ConversionLogger(tmp_path)
+        logger.log_conversion("a.pdf", 1024, 1.5, True, output_path="a.md")
+        logger.log_conversion("b.pdf", 2048, 2.5, False, error_message="boom")
+
+        lines = (tmp_path / "conversions.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["error_message"] == "boom"
+
+    def test_statistics(self, tmp_path):
+        """测试统计信息"""
+        logger = ConversionLogger(tmp_path)
+        assert logger.get_statistics() == {}
+
+        logger.log_conversion("a.pdf", 1024 * 1024, 1.0, True)
+        logger.log_conversion("b.pdf", 1024 * 1024, 3.0, False)
+
+        stats = logger.get_statistics()
+        assert stats["total_files"] == 2
+        assert stats["successful"] == 1
+        assert stats["failed"] == 1
+        assert stats["success_rate"] == 0.5
+        assert stats["total_size_mb"] == 2
+        assert stats["avg_time_per_file"] == 2.0
+
+    def test_rotation_keeps_history(self, tmp_path):
+        """测试轮转后统计仍包含旧文件中的记录"""
+        logger = ConversionLogger(tmp_path, max_bytes=200, backup_count=50)
+        for i in range(20):
+            logger.log_conversion(f"{i}.pdf", 10, 1.0, True)
+
+        assert (tmp_path / "conversions.1.jsonl").exists()
+        assert logger.get_statistics()["total_files"] == 20
+        assert [r["file_path"] for r in logger.iter_records()] == [f"{i}.pdf" for i in range(20)]
+
+    def test_concurrent_writes(self, tmp_path):
+        """测试多线程同时写入时记录完整"""
+        logger = ConversionLogger(tmp_path)
+
+        def write(n):
+            for i in range(50):
+                logger.log_conversion(f"{n}_{i}.pdf", 10, 0.1, True)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert logger.get_statistics()["total_files"] == 200
+
+    def test_migrates_legacy_log(self, tmp_path):
+        """测试旧版conversions.json被迁移"""
+        legacy = {"a.pdf_1": {"file_path": "a.pdf", "file_size": 10, "duration": 2.0, "success": True}}
+        (tmp_path / "conversions.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        logger = ConversionLogger(tmp_path)
+        assert not (tmp_path / "conversions.json").exists()
+        assert logger.get_statistics()["total_files"] == 1
@@ -45,4 +45,32 @@ def test_find_pdf_files_recursive(tmp_path):
     pdf_files = find_pdf_files(tmp_path)
     assert len(pdf_files) == 2
     assert any(f.name == "test1.pdf" for f in pdf_files)
-    assert any(f.name == "test2.pdf" for f in pdf_files) 
\ No newline at end of file
+    assert any(f.name == "test2.pdf" for f in pdf_files) 
+
+
+@pytest.mark.parametrize("enabled, expected", [(False, "auto"), (True, "txt")])
+def test_convert_pdf_to_markdown_honours_triage(tmp_path, monkeypatch, enabled, expected):
+    """测试单文件转换按triage开关决定是否预分类，关闭时使用auto"""
+    from types import SimpleNamespace
+    import pdf2md.main as main
+
+    triaged = []
+    methods = []
+
+    def fake_triage(path):
+        triaged.append(path)
+        return SimpleNamespace(method="txt")
+
+    def fake_parse_doc(**kwargs):
+        methods.append(kwargs["method"])
+        raise RuntimeError("stop")
+
+    monkeypatch.setattr(main, "triage_pdf", fake_triage)
+    monkeypatch.setattr(main, "parse_doc", fake_parse_doc)
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+
+    success, _ = convert_pdf_to_markdown(pdf_path, tmp_path / "out", triage=enabled)
+    assert not success
+    assert methods == [expected]
+    assert len(triaged) == (1 if enabled else 0)
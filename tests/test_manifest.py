@@ -0,0 +1,121 @@
+"""
+增量同步清单测试
+"""
+
+import os
+from pathlib import Path
+
+from pdf2md.manifest import ConversionManifest, MANIFEST_FILENAME
+
+
+def _setup(tmp_path: Path):
+    input_dir = tmp_path / "pdfs"
+    output_dir = tmp_path / "markdown"
+    (input_dir / "sub").mkdir(parents=True)
+    output_dir.mkdir()
+    pdf_file = input_dir / "sub" / "a.pdf"
+    pdf_file.write_bytes(b"%PDF-1.4 a")
+    md_file = output_dir / "sub" / "a.md"
+    md_file.parent.mkdir()
+    md_file.write_text("# a", encoding="utf-8")
+    return input_dir, output_dir, pdf_file, md_file
+
+
+class TestConversionManifest:
+    """转换清单测试类"""
+
+    def test_new_file_needs_conversion(self, tmp_path):
+        """测试未记录的文件需要转换"""
+        input_dir, output_dir, pdf_file, _ = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        assert manifest.needs_conversion(pdf_file, "fp")
+
+    def test_unchanged_file_skipped_after_reload(self, tmp_path):
+        """测试记录后重新加载清单，未变化的文件被跳过"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp")
+
+        reloaded = ConversionManifest(output_dir, input_dir)
+        assert not reloaded.needs_conversion(pdf_file, "fp")
+        assert reloaded.entries["sub/a.pdf"]["output_path"] == "sub/a.md"
+
+    def test_option_change_triggers_conversion(self, tmp_path):
+        """测试转换参数变化时需要重新转换"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp")
+        assert manifest.needs_conversion(pdf_file, "other")
+
+    def test_touched_file_with_same_content_skipped(self, tmp_path):
+        """测试只修改时间变化、内容不变的文件被跳过"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp")
+
+        stat = pdf_file.stat()
+        os.utime(pdf_file, (stat.st_atime, stat.st_mtime + 10))
+        assert not manifest.needs_conversion(pdf_file, "fp")
+
+        pdf_file.write_bytes(b"%PDF-1.4 b")
+        os.utime(pdf_file, (stat.st_atime, stat.st_mtime + 20))
+        assert manifest.needs_conversion(pdf_file, "fp")
+
+    def test_missing_output_triggers_conversion(self, tmp_path):
+        """测试输出被删除时需要重新转换"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp")
+        md_file.unlink()
+        assert manifest.needs_conversion(pdf_file, "fp")
+
+    def test_remove_orphans(self, tmp_path):
+        """测试清理源文件已删除的输出"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp")
+        pdf_file.unlink()
+
+        removed = manifest.remove_orphans([])
+        assert removed == ["sub/a.pdf"]
+        assert not md_file.exists()
+        assert not md_file.parent.exists()
+
+        manifest.compact()
+        assert ConversionManifest(output_dir, input_dir).entries == {}
+
+    def test_remove_orphans_keeps_shared_images(self, tmp_path):
+        """测试清理时只删除没有其他文档引用的图片"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        other_pdf = input_dir / "sub" / "b.pdf"
+        other_pdf.write_bytes(b"%PDF-1.4 b")
+        other_md = output_dir / "sub" / "b.md"
+        other_md.write_text("# b", encoding="utf-8")
+        images = output_dir / "sub" / "images"
+        images.mkdir()
+        shared, own = images / "shared.jpg", images / "own.jpg"
+        shared.write_bytes(b"shared")
+        own.write_bytes(b"own")
+
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp", extra_paths=[shared, own])
+        manifest.record(other_pdf, other_md, "fp", extra_paths=[shared])
+        pdf_file.unlink()
+
+        assert manifest.remove_orphans([other_pdf]) == ["sub/a.pdf"]
+        assert not md_file.exists()
+        assert not own.exists()
+        assert shared.exists()
+        assert other_md.exists()
+
+    def test_compact_keeps_latest_entries(self, tmp_path):
+        """测试压缩后只保留每个源文件的最新记录"""
+        input_dir, output_dir, pdf_file, md_file = _setup(tmp_path)
+        manifest = ConversionManifest(output_dir, input_dir)
+        manifest.record(pdf_file, md_file, "fp1")
+        manifest.record(pdf_file, md_file, "fp2")
+        manifest.compact()
+
+        lines = (output_dir / MANIFEST_FILENAME).read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert ConversionManifest(output_dir, input_dir).entries["sub/a.pdf"]["fingerprint"] == "fp2"
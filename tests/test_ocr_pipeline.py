@@ -0,0 +1,53 @@
+"""
+并行OCR流水线测试
+"""
+
+import time
+
+import pytest
+
+from pdf2md.ocr_pipeline import OcrOptions, RenderedPage, _RenderThread, ocr_rendered_page
+
+
+class TestOcrPipeline:
+    """OCR流水线测试类"""
+
+    def test_options(self):
+        """测试OCR进程数不超过页数，队列深度默认为进程数的两倍"""
+        options = OcrOptions(workers=8)
+        assert options.resolved_workers(3) == 3
+        assert options.resolved_workers(100) == 8
+        assert options.resolved_queue_depth(8) == 16
+        assert OcrOptions(max_queued_pages=5).resolved_queue_depth(8) == 5
+
+    def test_render_thread_bounded(self):
+        """测试渲染线程在队列满时暂停，按顺序交付全部页面"""
+        rendered = []
+
+        def pages():
+            for i in range(10):
+                rendered.append(i)
+                yield i
+
+        renderer = _RenderThread(pages(), max_queued=2)
+        iterator = iter(renderer)
+        assert next(iterator) == 0
+        time.sleep(0.1)
+        # 已取走1页，队列中最多2页，渲染线程手上最多再有1页
+        assert len(rendered) <= 4
+        assert list(iterator) == list(range(1, 10))
+
+    def test_render_error_propagates(self):
+        """测试渲染出错时消费方收到异常"""
+        def pages():
+            yield 1
+            raise RuntimeError("render failed")
+
+        renderer = _RenderThread(pages(), max_queued=4)
+        with pytest.raises(RuntimeError):
+            list(renderer)
+
+    def test_ocr_failure_returns_empty_text(self):
+        """测试单页识别失败时返回空文本而不是中断整个文档"""
+        page = RenderedPage(page_num=3, mode="L", width=2, height=2, stride=2, samples=b"")
+        assert ocr_rendered_page(page, "eng") == (3, "")
@@ -0,0 +1,66 @@
+"""
+输出布局测试
+"""
+
+from pathlib import Path
+
+from pdf2md.output_layout import OutputLayout
+
+
+def _mineru_output(staging: Path, stem: str, image: str = "abc.jpg") -> Path:
+    """构造mineru风格的输出：{staging}/{stem}/auto/"""
+    method_dir = staging / stem / "auto"
+    (method_dir / "images").mkdir(parents=True)
+    (method_dir / "images" / image).write_bytes(b"img")
+    (method_dir / f"{stem}_content_list.json").write_text("[]", encoding="utf-8")
+    md_file = method_dir / f"{stem}.md"
+    md_file.write_text(f"![](images/{image})", encoding="utf-8")
+    return md_file
+
+
+class TestOutputLayout:
+    """输出布局测试类"""
+
+    def test_mirrors_input_tree(self, tmp_path):
+        """测试按输入目录结构镜像输出路径"""
+        layout = OutputLayout(tmp_path / "in", tmp_path / "out")
+        assert layout.markdown_path(tmp_path / "in" / "a" / "b" / "doc.pdf") == tmp_path / "out" / "a" / "b" / "doc.md"
+        assert layout.markdown_path(tmp_path / "elsewhere" / "x.pdf") == tmp_path / "out" / "x.md"
+
+    def test_same_stem_in_different_folders(self, tmp_path):
+        """测试不同目录下同名文件互不冲突"""
+        layout = OutputLayout(tmp_path / "in", tmp_path / "out")
+        first = tmp_path / "in" / "a" / "doc.pdf"
+        second = tmp_path / "in" / "b" / "doc.pdf"
+
+        for pdf in (first, second):
+            staging = layout.create_staging_dir(pdf)
+            layout.publish(pdf, _mineru_output(staging, "doc"))
+            layout.discard(staging)
+
+        assert (tmp_path / "out" / "a" / "doc.md").exists()
+        assert (tmp_path / "out" / "b" / "doc.md").exists()
+        assert not list((tmp_path / "out" / "a").glob(".*.tmp"))
+
+    def test_publish_keeps_images_and_artefacts(self, tmp_path):
+        """测试发布时保留markdown引用的图片和其他产物"""
+        layout = OutputLayout(tmp_path / "in", tmp_path / "out")
+        pdf = tmp_path / "in" / "sub" / "doc.pdf"
+        staging = layout.create_staging_dir(pdf)
+        assert staging.parent == tmp_path / "out" / "sub"
+
+        extra = layout.publish(pdf, _mineru_output(staging, "doc"))
+
+        md_file = tmp_path / "out" / "sub" / "doc.md"
+        assert md_file.read_text(encoding="utf-8") == "![](images/abc.jpg)"
+        assert (tmp_path / "out" / "sub" / "images" / "abc.jpg").exists()
+        assert sorted(extra) == [
+            tmp_path / "out" / "sub" / "doc_content_list.json",
+            tmp_path / "out" / "sub" / "images" / "abc.jpg",
+        ]
+
+    def test_for_files_uses_common_parent(self, tmp_path):
+        """测试以公共父目录作为输入根目录"""
+        files = [tmp_path / "in" / "a" / "x.pdf", tmp_path / "in" / "b" / "y.pdf"]
+        layout = OutputLayout.for_files(files, tmp_path / "out")
+        assert layout.markdown_path(files[0]) == tmp_path / "out" / "a" / "x.md"
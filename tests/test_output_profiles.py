@@ -0,0 +1,39 @@
+"""
+输出配置档测试
+"""
+
+import pytest
+
+from pdf2md.output_profiles import DEFAULT_OUTPUT_PROFILE, get_output_flags, output_profile_names
+
+
+class TestOutputProfiles:
+    """输出配置档测试类"""
+
+    def test_profiles_share_flag_names(self):
+        """测试所有配置档提供同一组开关"""
+        flags = [set(get_output_flags(name)) for name in output_profile_names()]
+        assert all(f == flags[0] for f in flags)
+        assert DEFAULT_OUTPUT_PROFILE in output_profile_names()
+
+    def test_md_only_skips_everything_else(self):
+        """测试md-only只输出markdown"""
+        flags = get_output_flags("md-only")
+        assert flags.pop("f_dump_md")
+        assert not any(flags.values())
+
+    def test_md_images_keeps_images(self):
+        """测试md+images保留图片但不生成调试产物"""
+        flags = get_output_flags("md+images")
+        assert flags["f_dump_images"]
+        assert not flags["f_draw_layout_bbox"]
+        assert not flags["f_dump_middle_json"]
+
+    def test_full_debug_enables_all(self):
+        """测试full-debug输出全部产物"""
+        assert all(get_output_flags("full-debug").values())
+
+    def test_unknown_profile(self):
+        """测试未知配置档报错"""
+        with pytest.raises(ValueError):
+            get_output_flags("everything")
@@ -0,0 +1,73 @@
+"""
+异步输出写入测试
+"""
+
+import threading
+
+import pytest
+
+from pdf2md.output_writer import AsyncOutputWriter
+
+
+class TestAsyncOutputWriter:
+    """异步输出写入测试类"""
+
+    def test_writes_complete_on_close(self, tmp_path):
+        """测试退出时等待所有写入完成"""
+        with AsyncOutputWriter(workers=2) as output:
+            for i in range(20):
+                output.submit((tmp_path / f"{i}.txt").write_text, str(i))
+        assert sorted(int(p.stem) for p in tmp_path.iterdir()) == list(range(20))
+        assert output.pending_bytes == 0
+
+    def test_backpressure(self):
+        """测试在途数据超过上限时提交方阻塞，直到写入完成"""
+        release = threading.Event()
+        output = AsyncOutputWriter(workers=2, max_pending_mb=1)
+        output.submit(release.wait, cost=700 << 10)
+
+        submitted = threading.Event()
+
+        def submit_second():
+            output.submit(lambda: None, cost=700 << 10)
+            submitted.set()
+
+        thread = threading.Thread(target=submit_second)
+        thread.start()
+        assert not submitted.wait(0.2)
+        release.set()
+        assert submitted.wait(5)
+        thread.join()
+        output.close()
+        assert output.blocked_seconds > 0
+
+    def test_oversized_task_when_idle(self):
+        """测试队列为空时超过上限的单个任务可以提交"""
+        with AsyncOutputWriter(workers=1, max_pending_mb=1) as output:
+            future = output.submit(lambda: "done", cost=8 << 20)
+        assert future.result() == "done"
+        assert output.blocked_seconds == 0
+
+    def test_error_raised_on_flush(self):
+        """测试写入失败在flush时抛出，其他写入不受影响"""
+        written = []
+
+        def fail():
+            raise OSError("磁盘已满")
+
+        output = AsyncOutputWriter(workers=1)
+        output.submit(fail)
+        output.submit(written.append, 1)
+        with pytest.raises(OSError, match="磁盘已满"):
+            output.close()
+        assert written == [1]
+
+    def test_exception_in_body_not_masked(self):
+        """测试with块内已有异常时不被写入错误覆盖"""
+        def fail():
+            raise OSError("写入失败")
+
+        with pytest.raises(KeyError):
+            with AsyncOutputWriter(workers=1) as output:
+                output.submit(fail)
+                raise KeyError("推理失败")
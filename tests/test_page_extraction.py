@@ -0,0 +1,111 @@
+"""
+并行逐页文本提取测试
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pdf2md import worker_pool
+from pdf2md.page_extraction import (
+    PageStore, extraction_workers, iter_ordered, plan_page_chunks, write_markdown_pages
+)
+
+
+def _slow_square(value: int) -> int:
+    # 靠前的工作单元更慢，结果完成顺序与提交顺序相反
+    time.sleep(0.01 * (5 - value))
+    return value * value
+
+
+class TestPageExtraction:
+    """逐页提取测试类"""
+
+    def test_plan_page_chunks(self):
+        """测试页码范围覆盖全部页面且不重叠"""
+        assert plan_page_chunks(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+        assert plan_page_chunks([3, 7, 9], 32) == [[3, 7, 9]]
+        assert plan_page_chunks([], 32) == []
+
+    def test_iter_ordered(self):
+        """测试结果按提交顺序产出"""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(iter_ordered(executor, _slow_square, ((i,) for i in range(5)), window=3))
+        assert results == [0, 1, 4, 9, 16]
+
+    def test_extraction_workers(self, monkeypatch):
+        """测试提取进程数有上限，在转换进程池的工作进程中串行提取"""
+        cpus = os.cpu_count() or 1
+        assert extraction_workers() == min(4, cpus)
+        assert extraction_workers(10 ** 6) == cpus
+        monkeypatch.setitem(worker_pool._worker_state, "worker_pid", os.getpid())
+        assert extraction_workers() == 1
+        assert extraction_workers(8) == 1
+
+    def test_write_markdown_pages(self, tmp_path):
+        """测试逐页写入的格式，跳过没有文本的页"""
+        output = tmp_path / "out" / "doc.md"
+        pages = [(1, " first \n"), (2, ""), (3, "third")]
+
+        assert write_markdown_pages(output, "doc", iter(pages)) == 2
+        assert output.read_text(encoding="utf-8") == (
+            "# doc\n\n# 第 1 页\n\nfirst\n\n# 第 3 页\n\nthird\n"
+        )
+        assert list(output.parent.iterdir()) == [output]
+
+    def test_write_markdown_pages_empty(self, tmp_path):
+        """测试没有任何文本时不生成输出文件"""
+        output = tmp_path / "doc.md"
+        assert write_markdown_pages(output, "doc", iter([(1, "  ")])) == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_write_markdown_pages_error(self, tmp_path):
+        """测试提取中途出错时不留下半个文件"""
+        output = tmp_path / "doc.md"
+
+        def pages():
+            yield 1, "text"
+            raise RuntimeError("broken page")
+
+        with pytest.raises(RuntimeError):
+            write_markdown_pages(output, "doc", pages())
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestPageStore:
+    """逐页结果缓存测试类"""
+
+    def test_missing_pages(self, tmp_path):
+        """测试合格的页不再交给后面的处理器，过短的页仍视为缺失"""
+        store = PageStore(tmp_path, min_chars=10)
+        assert store.missing() is None
+
+        store.page_count = 4
+        store.add(1, "a long enough page", "pypdf")
+        store.add(2, "short", "pypdf")
+        store.add(3, "   ", "pypdf")
+        assert store.missing() == [2, 3, 4]
+
+    def test_provisional_page_replaced(self, tmp_path):
+        """测试过短的页被后面处理器更长的文本替换，合格的页不被替换"""
+        store = PageStore(tmp_path, min_chars=10)
+        store.page_count = 2
+        store.add(1, "short", "pypdf")
+        store.add(2, "a long enough page", "pypdf")
+
+        assert store.add(1, "ocr text of page one", "ocrmypdf")
+        assert not store.add(2, "ocr text of page two", "ocrmypdf")
+        assert store.missing() == []
+        assert list(store.iter_pages()) == [(1, "ocr text of page one"), (2, "a long enough page")]
+        assert store.processors() == ["ocrmypdf", "pypdf"]
+
+    def test_create_and_close(self, tmp_path):
+        """测试暂存目录建在输出文件旁并在关闭后删除"""
+        store = PageStore.create_for(tmp_path / "out" / "doc.md")
+        store.add(1, "page text", "pypdf")
+        assert store.directory.parent == tmp_path / "out"
+        store.close()
+        assert list((tmp_path / "out").iterdir()) == []
+
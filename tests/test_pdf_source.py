@@ -0,0 +1,120 @@
+"""
+PDF文档句柄测试
+"""
+
+import hashlib
+
+import pytest
+
+from pdf2md.pdf_source import PdfSource, as_pdf_source
+from pdf2md.utils import get_file_hash
+
+_PDF = b"%PDF-1.4\n" + b"0" * 4096 + b"\n%%EOF\n"
+
+
+class TestPdfSource:
+    """PDF文档句柄测试类"""
+
+    def test_mmap_view_and_data(self, tmp_path):
+        """测试mmap视图与物化的bytes内容一致，且bytes只物化一次"""
+        pdf_path = tmp_path / "a.pdf"
+        pdf_path.write_bytes(_PDF)
+        with PdfSource(pdf_path) as source:
+            assert source.looks_like_pdf()
+            with source.view() as view:
+                assert view.nbytes == len(_PDF)
+            assert source.data() == _PDF
+            assert source.data() is source.data()
+
+    def test_rejects_non_pdf(self, tmp_path):
+        """测试文件头没有PDF标记时校验失败，空文件也不报错"""
+        text_path = tmp_path / "a.pdf"
+        text_path.write_bytes(b"hello")
+        empty_path = tmp_path / "empty.pdf"
+        empty_path.write_bytes(b"")
+        with PdfSource(text_path) as source:
+            assert not source.looks_like_pdf()
+        with PdfSource(empty_path) as source:
+            assert not source.looks_like_pdf()
+
+    def test_full_range_skips_reencode(self, tmp_path):
+        """测试请求整份文档时直接返回原内容，不需要页数也不重新编码"""
+        pdf_path = tmp_path / "a.pdf"
+        pdf_path.write_bytes(_PDF)
+        with PdfSource(pdf_path) as source:
+            assert source.covers(0, None)
+            assert source.covers(0, -1)
+            assert not source.covers(2, None)
+            assert source.range_bytes(0, None) is source.data()
+
+        source = PdfSource(pdf_path)
+        source._page_count = 10
+        assert source.covers(0, 9)
+        assert source.covers(0, 20)
+        assert not source.covers(0, 8)
+        source.close()
+
+    def test_dump_copies_original_file(self, tmp_path):
+        """测试整份PDF直接复制原文件，页码范围写入实际解析的内容"""
+        pdf_path = tmp_path / "a.pdf"
+        pdf_path.write_bytes(_PDF)
+        with PdfSource(pdf_path) as source:
+            source.dump(tmp_path / "out" / "full.pdf", b"unused", full_document=True)
+            source.dump(tmp_path / "out" / "part.pdf", b"%PDF-part", full_document=False)
+        assert (tmp_path / "out" / "full.pdf").read_bytes() == _PDF
+        assert (tmp_path / "out" / "part.pdf").read_bytes() == b"%PDF-part"
+
+    def test_release_drops_materialized_bytes(self, tmp_path):
+        """测试释放后不再持有bytes，再次访问时重新读取"""
+        pdf_path = tmp_path / "a.pdf"
+        pdf_path.write_bytes(_PDF)
+        source = PdfSource(pdf_path)
+        source.data()
+        source.release()
+        assert source._data is None and source._mmap is None
+        assert source.data() == _PDF
+        source.close()
+
+    def test_wraps_bytes(self):
+        """测试包装调用方传入的bytes"""
+        source = as_pdf_source(_PDF)
+        assert as_pdf_source(source) is source
+        assert source.looks_like_pdf()
+        assert source.range_bytes() is source.data()
+        source.release()
+        assert source.data() == _PDF
+        with pytest.raises(ValueError):
+            PdfSource()
+
+    def test_file_hash_over_mmap(self, tmp_path):
+        """测试在mmap上计算的哈希与逐块读取一致"""
+        pdf_path = tmp_path / "a.pdf"
+        pdf_path.write_bytes(_PDF)
+        empty_path = tmp_path / "empty.pdf"
+        empty_path.write_bytes(b"")
+        assert get_file_hash(pdf_path) == hashlib.md5(_PDF).hexdigest()
+        assert get_file_hash(empty_path) == hashlib.md5(b"").hexdigest()
+
+    def test_page_range_without_materializing(self, tmp_path):
+        """测试页数和页码范围从按路径打开的文档句柄获得，不物化整个文件"""
+        pdfium = pytest.importorskip("pypdfium2")
+        pdf = pdfium.PdfDocument.new()
+        for _ in range(5):
+            pdf.new_page(100, 100)
+        pdf_path = tmp_path / "a.pdf"
+        pdf.save(str(pdf_path))
+        pdf.close()
+
+        with PdfSource(pdf_path) as source:
+            assert source.page_count() == 5
+            window = pdfium.PdfDocument(source.range_bytes(1, 2))
+            assert len(window) == 2
+            window.close()
+            source.dump_pages(tmp_path / "out" / "part.pdf", 3, 10)
+            source.dump_pages(tmp_path / "out" / "full.pdf", 0, 4)
+            assert source._data is None and source._mmap is None
+
+        part = pdfium.PdfDocument(str(tmp_path / "out" / "part.pdf"))
+        assert len(part) == 2
+        part.close()
+        assert (tmp_path / "out" / "full.pdf").read_bytes() == pdf_path.read_bytes()
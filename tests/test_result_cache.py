@@ -0,0 +1,81 @@
+"""
+转换结果缓存测试
+"""
+
+import os
+import time
+from pathlib import Path
+
+from pdf2md.result_cache import ConversionCache, get_conversion_cache, options_fingerprint
+
+
+OPTIONS = {"lang": "ch", "backend": "pipeline", "method": "auto", "formula_enable": True, "table_enable": True}
+
+
+def _make_output(directory: Path, name: str, size: int = 10) -> Path:
+    """构造一个mineru风格的输出目录"""
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{name}.md").write_text("# title\n![](images/a.jpg)\n", encoding="utf-8")
+    (directory / "images").mkdir(exist_ok=True)
+    (directory / "images" / "a.jpg").write_bytes(b"x" * size)
+    (directory / f"{name}_content_list.json").write_text("[]", encoding="utf-8")
+    return directory
+
+
+class TestConversionCache:
+    """转换结果缓存测试类"""
+
+    def test_fingerprint_depends_on_options(self):
+        """测试参数变化时指纹变化"""
+        changed = dict(OPTIONS, table_enable=False)
+        assert options_fingerprint(OPTIONS) == options_fingerprint(dict(OPTIONS))
+        assert options_fingerprint(OPTIONS) != options_fingerprint(changed)
+
+    def test_key_depends_on_content(self, tmp_path):
+        """测试缓存键随文件内容变化"""
+        cache = ConversionCache(tmp_path / "cache")
+        pdf_file = tmp_path / "a.pdf"
+        pdf_file.write_bytes(b"%PDF-1.4 one")
+        key1 = cache.make_key(pdf_file, OPTIONS)
+        pdf_file.write_bytes(b"%PDF-1.4 two")
+        key2 = cache.make_key(pdf_file, OPTIONS)
+        assert key1 != key2
+
+    def test_store_and_restore(self, tmp_path):
+        """测试存入后恢复markdown、图片和JSON"""
+        cache = ConversionCache(tmp_path / "cache")
+        source = _make_output(tmp_path / "out" / "doc" / "auto", "doc")
+
+        assert not cache.restore("abc", tmp_path / "restored")
+        assert cache.store("abc", source)
+        assert cache.contains("abc")
+
+        restored = tmp_path / "restored"
+        assert cache.restore("abc", restored)
+        assert (restored / "doc.md").read_text(encoding="utf-8").startswith("# title")
+        assert (restored / "images" / "a.jpg").exists()
+        assert (restored / "doc_content_list.json").exists()
+        assert not (restored / "entry.json").exists()
+
+    def test_lru_eviction(self, tmp_path):
+        """测试超出容量时淘汰最久未访问的条目"""
+        cache = ConversionCache(tmp_path / "cache", max_size_mb=1)
+        half_mb = 512 * 1024
+
+        cache.store("aa1", _make_output(tmp_path / "s1", "one", half_mb))
+        cache.store("bb2", _make_output(tmp_path / "s2", "two", half_mb // 2))
+
+        # 让第一个条目成为最近访问的
+        old = time.time() - 100
+        os.utime(cache._entry_path("bb2") / "entry.json", (old, old))
+        assert cache.restore("aa1", tmp_path / "r1")
+
+        cache.store("cc3", _make_output(tmp_path / "s3", "three", half_mb // 2))
+
+        assert cache.contains("aa1")
+        assert not cache.contains("bb2")
+        assert cache.get_size() <= 1024 * 1024
+
+    def test_shared_instance(self, tmp_path):
+        """测试同一进程内复用缓存实例"""
+        assert get_conversion_cache(tmp_path / "c") is get_conversion_cache(tmp_path / "c")
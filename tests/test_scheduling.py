@@ -0,0 +1,45 @@
+"""
+任务调度测试
+"""
+
+from pdf2md.estimator import estimate_makespan
+from pdf2md.scheduling import iter_longest_first, schedule_window_for
+
+
+class TestScheduling:
+    """任务调度测试类"""
+
+    def test_full_window_is_lpt(self):
+        """测试窗口覆盖全部任务时按耗时从大到小排序"""
+        durations = [1, 9, 3, 7, 3]
+        assert list(iter_longest_first(durations, key=float, window=10)) == [9, 7, 3, 3, 1]
+
+    def test_bounded_window(self):
+        """测试有界窗口内取最大者，且不丢失任务"""
+        order = list(iter_longest_first([1, 2, 3, 10, 4, 5], key=float, window=3))
+        assert order[:2] == [3, 10]
+        assert sorted(order) == [1, 2, 3, 4, 5, 10]
+
+    def test_window_disabled(self):
+        """测试窗口为1时保持原顺序"""
+        assert list(iter_longest_first([1, 3, 2], key=float, window=1)) == [1, 3, 2]
+
+    def test_auto_window(self):
+        """测试默认窗口按工作进程数确定，配置的窗口保持不变"""
+        assert schedule_window_for(0, 4) == 16
+        assert schedule_window_for(0, 1) == 4
+        assert schedule_window_for(100, 4) == 100
+
+    def test_straggler_last_reduces_makespan(self):
+        """测试大文件排在最后时，按最长任务优先提交缩短总耗时"""
+        durations = [1.0] * 8 + [8.0]
+
+        def simulate(order, workers=2):
+            loads = [0.0] * workers
+            for duration in order:
+                loads[loads.index(min(loads))] += duration
+            return max(loads)
+
+        assert simulate(durations) == 12.0
+        scheduled = list(iter_longest_first(durations, key=float, window=16))
+        assert simulate(scheduled) == estimate_makespan(durations, 2) == 8.0
@@ -0,0 +1,90 @@
+"""
+产物序列化测试
+"""
+
+import json
+
+import pytest
+
+from pdf2md.serialization import Serializer, find_artifact, load_artifact
+
+_MIDDLE = {"pdf_info": [{"page_idx": 0, "text": "中文"}, {"page_idx": 1}], "_backend": "pipeline", "_version_name": "2.0.6"}
+
+
+class TestSerialization:
+    """产物序列化测试类"""
+
+    def test_parse_spec(self):
+        """测试解析 格式+压缩 配置，未知格式报错"""
+        assert Serializer.parse(None) == Serializer("json", "none")
+        assert Serializer.parse("compact+gzip") == Serializer("compact", "gzip")
+        assert Serializer.parse("compact+gzip").suffix == ".json.gz"
+        assert Serializer.parse("compact").spec == "compact"
+        with pytest.raises(ValueError):
+            Serializer.parse("yaml")
+        with pytest.raises(ValueError):
+            Serializer.parse("json+bz2")
+
+    def test_missing_module_falls_back(self, monkeypatch):
+        """测试依赖模块未安装时退回紧凑json"""
+        monkeypatch.setattr("pdf2md.serialization._module_available", lambda name: name is None)
+        assert Serializer.parse("orjson+zstd") == Serializer("compact", "gzip")
+
+    @pytest.mark.parametrize("spec", ["json", "compact", "json+gzip", "compact+gzip"])
+    def test_dump_roundtrip(self, tmp_path, spec):
+        """测试各种编码写出后按文件头自动识别读回"""
+        serializer = Serializer.parse(spec)
+        path = serializer.dump(_MIDDLE, serializer.path_for(tmp_path, "doc_middle"))
+        assert find_artifact(tmp_path, "doc_middle") == path
+        assert load_artifact(path) == _MIDDLE
+
+    def test_compact_is_smaller(self, tmp_path):
+        """测试紧凑json没有缩进，且能被标准json解析"""
+        pretty = Serializer("json").dump(_MIDDLE, tmp_path / "a.json")
+        compact = Serializer("compact").dump(_MIDDLE, tmp_path / "b.json")
+        assert compact.stat().st_size < pretty.stat().st_size
+        assert json.loads(compact.read_text(encoding="utf-8")) == _MIDDLE
+
+    @pytest.mark.parametrize("spec", ["json", "compact", "compact+gzip"])
+    def test_array_writer(self, tmp_path, spec):
+        """测试逐段追加的数组和带其他字段的对象"""
+        serializer = Serializer.parse(spec)
+        writer = serializer.array_writer(serializer.path_for(tmp_path, "list"))
+        writer.extend([{"a": 1}])
+        writer.extend([])
+        writer.extend([{"b": "中文"}, 3])
+        writer.close()
+        assert load_artifact(writer.path) == [{"a": 1}, {"b": "中文"}, 3]
+
+        empty = serializer.array_writer(serializer.path_for(tmp_path, "empty"))
+        empty.close()
+        assert load_artifact(empty.path) == []
+
+        middle = serializer.array_writer(serializer.path_for(tmp_path, "middle"), key="pdf_info")
+        middle.extend(_MIDDLE["pdf_info"])
+        middle.close({"_backend": "pipeline", "_version_name": "2.0.6"})
+        middle.close()
+        assert load_artifact(middle.path) == _MIDDLE
+
+    def test_zstd(self, tmp_path):
+        """测试zstd压缩"""
+        pytest.importorskip("zstandard")
+        serializer = Serializer.parse("compact+zstd")
+        path = serializer.dump(_MIDDLE, serializer.path_for(tmp_path, "doc_middle"))
+        assert path.name == "doc_middle.json.zst"
+        assert load_artifact(path) == _MIDDLE
+
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_msgpack(self, tmp_path, compression):
+        """测试msgpack整体写出和回填数组头的流式写出"""
+        pytest.importorskip("msgpack")
+        serializer = Serializer("msgpack", compression)
+        path = serializer.dump(_MIDDLE, serializer.path_for(tmp_path, "doc_middle"))
+        assert load_artifact(path) == _MIDDLE
+
+        writer = serializer.array_writer(serializer.path_for(tmp_path, "streamed"), key="pdf_info")
+        writer.extend(_MIDDLE["pdf_info"][:1])
+        writer.extend(_MIDDLE["pdf_info"][1:])
+        writer.close({"_backend": "pipeline", "_version_name": "2.0.6"})
+        assert load_artifact(writer.path) == _MIDDLE
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted([path.name, writer.path.name])
@@ -0,0 +1,113 @@
+"""
+大文档分片测试
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from pdf2md.sharding import ShardResult, plan_shards, stitch_shards
+
+
+def _task(tmp_path: Path, file_path: Path = Path("/pdfs/book.pdf")):
+    return SimpleNamespace(file_path=file_path, output_dir=tmp_path, task_id=1, serialization="json")
+
+
+def _make_shard(directory: Path, text: str, image: str, page_idx: int) -> Path:
+    """构造一个mineru风格的分片输出目录"""
+    (directory / "images").mkdir(parents=True)
+    (directory / "images" / image).write_bytes(b"img")
+    (directory / "book.md").write_text(f"{text}\n![](images/{image})\n", encoding="utf-8")
+    content = [{"type": "text", "text": text, "page_idx": page_idx}]
+    (directory / "book_content_list.json").write_text(json.dumps(content), encoding="utf-8")
+    structured = [dict(item, markdown=text, section=[]) for item in content]
+    (directory / "book_structured.json").write_text(json.dumps(structured), encoding="utf-8")
+    middle = {"pdf_info": [{"page_idx": page_idx}], "_backend": "pipeline"}
+    (directory / "book_middle.json").write_text(json.dumps(middle), encoding="utf-8")
+    return directory
+
+
+class TestSharding:
+    """分片测试类"""
+
+    def test_plan_shards(self, tmp_path):
+        """测试按页数拆分，页码范围包含结束页"""
+        jobs = plan_shards(_task(tmp_path), page_count=250, shard_pages=100)
+        assert [(j.start_page, j.end_page) for j in jobs] == [(0, 99), (100, 199), (200, 249)]
+        assert all(j.shard_count == 3 for j in jobs)
+        assert len({j.staging_dir for j in jobs}) == 3
+
+    def test_stitch_shards(self, tmp_path):
+        """测试拼接markdown、图片并偏移页码"""
+        jobs = plan_shards(_task(tmp_path), page_count=20, shard_pages=10)
+        results = [
+            ShardResult(0, True, 1.0, _make_shard(tmp_path / "s0", "first", "a.jpg", 3)),
+            ShardResult(1, True, 1.0, _make_shard(tmp_path / "s1", "second", "b.jpg", 2)),
+        ]
+
+        merged = tmp_path / "merged"
+        md_file = stitch_shards(jobs, results, merged)
+
+        md = md_file.read_text(encoding="utf-8")
+        assert md.index("first") < md.index("second")
+        assert "images/b.jpg" in md
+        assert (merged / "images" / "a.jpg").exists()
+        assert (merged / "images" / "b.jpg").exists()
+
+        content = json.loads((merged / "book_content_list.json").read_text(encoding="utf-8"))
+        assert [item["page_idx"] for item in content] == [3, 12]
+        middle = json.loads((merged / "book_middle.json").read_text(encoding="utf-8"))
+        assert [page["page_idx"] for page in middle["pdf_info"]] == [3, 12]
+
+    def test_stitch_structured_sections(self, tmp_path):
+        """测试结构化JSON的章节路径跨分片延续"""
+        jobs = plan_shards(_task(tmp_path), page_count=20, shard_pages=10)
+        first = _make_shard(tmp_path / "s0", "引言", "a.jpg", 0)
+        (first / "book_structured.json").write_text(
+            json.dumps([{"type": "text", "text": "引言", "text_level": 1, "page_idx": 0, "section": ["引言"]}]),
+            encoding="utf-8"
+        )
+        results = [ShardResult(0, True, 1.0, first), ShardResult(1, True, 1.0, _make_shard(tmp_path / "s1", "正文", "b.jpg", 0))]
+
+        merged = tmp_path / "merged"
+        stitch_shards(jobs, results, merged)
+        structured = json.loads((merged / "book_structured.json").read_text(encoding="utf-8"))
+        assert [(item["page_idx"], item["section"]) for item in structured] == [(0, ["引言"]), (10, ["引言"])]
+
+    def test_stitch_debug_artifacts(self, tmp_path):
+        """测试full-debug的标注几何信息、模型输出和_origin.pdf也被拼接"""
+        pdf_path = tmp_path / "book.pdf"
+        pdf_path.write_bytes(b"%PDF-full")
+        jobs = plan_shards(_task(tmp_path, pdf_path), page_count=20, shard_pages=10)
+        shards = []
+        for i, job in enumerate(jobs):
+            directory = _make_shard(tmp_path / f"s{i}", f"part{i}", f"{i}.jpg", 0)
+            geometry = {"pdf_info": [{"page_idx": 0}], "source": str(pdf_path), "start_page_id": job.start_page,
+                        "end_page_id": job.end_page, "layout": True, "span": True}
+            (directory / "book_bbox.json").write_text(json.dumps(geometry), encoding="utf-8")
+            (directory / "book_model.json").write_text(json.dumps([{"page_info": {"page_no": 0}}]), encoding="utf-8")
+            (directory / "book_origin.pdf").write_bytes(b"%PDF-part")
+            shards.append(ShardResult(i, True, 1.0, directory))
+
+        merged = tmp_path / "merged"
+        stitch_shards(jobs, shards, merged)
+
+        geometry = json.loads((merged / "book_bbox.json").read_text(encoding="utf-8"))
+        assert [page["page_idx"] for page in geometry["pdf_info"]] == [0, 10]
+        assert (geometry["source"], geometry["start_page_id"], geometry["end_page_id"]) == (str(pdf_path.resolve()), 0, None)
+        model = json.loads((merged / "book_model.json").read_text(encoding="utf-8"))
+        assert [page["page_info"]["page_no"] for page in model] == [0, 10]
+        assert (merged / "book_origin.pdf").read_bytes() == b"%PDF-full"
+
+    def test_stitch_vlm_model_output(self, tmp_path):
+        """测试VLM的文本模型输出按分片顺序追加"""
+        jobs = plan_shards(_task(tmp_path), page_count=20, shard_pages=10)
+        shards = []
+        for i in range(2):
+            directory = _make_shard(tmp_path / f"s{i}", f"part{i}", f"{i}.jpg", 0)
+            (directory / "book_model_output.txt").write_text(f"page{i}", encoding="utf-8")
+            shards.append(ShardResult(i, True, 1.0, directory))
+
+        merged = tmp_path / "merged"
+        stitch_shards(jobs, shards, merged)
+        assert (merged / "book_model_output.txt").read_text(encoding="utf-8") == "page0\n" + "-" * 50 + "\npage1"
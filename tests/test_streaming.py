@@ -0,0 +1,99 @@
+"""
+分窗口流式转换测试
+"""
+
+import json
+
+from pdf2md.content_make import MadeContent
+from pdf2md.serialization import Serializer, load_artifact
+from pdf2md.streaming import StreamingOutput, group_documents, offset_model_pages, page_windows, write_json_array
+
+
+class TestStreaming:
+    """分窗口流式转换测试类"""
+
+    def test_page_windows(self):
+        """测试页码窗口覆盖整个范围且包含两端"""
+        assert page_windows(0, 249, 100) == [(0, 99), (100, 199), (200, 249)]
+        assert page_windows(10, 19, 100) == [(10, 19)]
+        assert page_windows(5, 7, 1) == [(5, 5), (6, 6), (7, 7)]
+
+    def test_group_documents(self):
+        """测试文档按页数顺序分组，页数达到目标即成组，单个大文档不拆分"""
+        assert group_documents([30, 40, 50, 10, 5], 100) == [[0, 1, 2], [3, 4]]
+        assert group_documents([250, 1], 100) == [[0], [1]]
+        assert group_documents([], 100) == []
+
+    def test_write_json_array_matches_json_dump(self, tmp_path):
+        """测试逐页写出的模型输出与整体json.dumps解析结果相同"""
+        model_list = [
+            {"layout_dets": [{"category_id": 1, "poly": [0.0, 1.5], "text": "中文"}], "page_info": {"page_no": p}}
+            for p in range(3)
+        ]
+        path = tmp_path / "doc_model.json"
+        assert write_json_array(path, model_list) == 3
+        assert json.loads(path.read_text(encoding="utf-8")) == json.loads(json.dumps(model_list))
+
+    def test_offset_model_pages_keeps_original(self):
+        """测试模型输出页码偏移不修改原模型输出"""
+        pages = [{"layout_dets": [], "page_info": {"page_no": 0}}, {"layout_dets": []}]
+        shifted = offset_model_pages(pages, 100)
+        assert shifted[0]["page_info"]["page_no"] == 100
+        assert pages[0]["page_info"]["page_no"] == 0
+        assert shifted[1] is pages[1]
+
+    def test_streaming_output_matches_single_pass(self, tmp_path):
+        """测试按窗口写出的文件与整份文档一次写出的内容一致"""
+        windows = [
+            (0, "# 第一章", [{"type": "text", "page_idx": 0}], [{"page_idx": 0}, {"page_idx": 1}]),
+            (2, "正文", [{"type": "text", "page_idx": 1}], [{"page_idx": 0}, {"page_idx": 1}]),
+        ]
+        with StreamingOutput(tmp_path, "doc") as output:
+            for offset, markdown, content_list, pdf_info in windows:
+                output.write_markdown(markdown)
+                output.write_model_output([{"page_info": {"page_no": 0}}], offset)
+                output.content_list.extend([dict(item, page_idx=item["page_idx"] + offset) for item in content_list])
+                output.write_middle({"pdf_info": pdf_info, "_backend": "pipeline", "_version_name": "2.0.6"}, offset)
+
+        assert (tmp_path / "doc.md").read_text(encoding="utf-8") == "# 第一章\n\n正文"
+        content_list = json.loads((tmp_path / "doc_content_list.json").read_text(encoding="utf-8"))
+        assert [item["page_idx"] for item in content_list] == [0, 3]
+        middle = json.loads((tmp_path / "doc_middle.json").read_text(encoding="utf-8"))
+        assert [page["page_idx"] for page in middle["pdf_info"]] == [0, 1, 2, 3]
+        assert middle["_backend"] == "pipeline" and middle["_version_name"] == "2.0.6"
+        model = json.loads((tmp_path / "doc_model.json").read_text(encoding="utf-8"))
+        assert [page["page_info"]["page_no"] for page in model] == [0, 2]
+
+    def test_streaming_output_write_content(self, tmp_path):
+        """测试追加ContentMaker一次生成的markdown、content_list和结构化JSON"""
+        with StreamingOutput(tmp_path, "doc", dump_structured_json=True, dump_middle_json=False) as output:
+            for offset in (0, 5):
+                item = {"type": "text", "page_idx": 0}
+                output.write_content(MadeContent("正文", [dict(item)], [dict(item, section=[])]), offset)
+
+        assert (tmp_path / "doc.md").read_text(encoding="utf-8") == "正文\n\n正文"
+        assert [item["page_idx"] for item in load_artifact(tmp_path / "doc_content_list.json")] == [0, 5]
+        assert [item["page_idx"] for item in load_artifact(tmp_path / "doc_structured.json")] == [0, 5]
+
+    def test_streaming_output_respects_flags(self, tmp_path):
+        """测试关闭的产物不生成文件，VLM模型输出写为文本"""
+        with StreamingOutput(
+            tmp_path, "doc", dump_content_list=False, dump_middle_json=False, model_output_as_text=True
+        ) as output:
+            output.write_markdown("a")
+            output.write_model_output(["p1", "p2"], 0)
+            output.write_middle({"pdf_info": []}, 0)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["doc.md", "doc_model_output.txt"]
+        assert (tmp_path / "doc_model_output.txt").read_text(encoding="utf-8") == "p1\n" + "-" * 50 + "\np2"
+
+    def test_streaming_output_compressed(self, tmp_path):
+        """测试按配置的序列化器写出压缩的JSON产物"""
+        with StreamingOutput(tmp_path, "doc", dump_md=False, serializer=Serializer("compact", "gzip")) as output:
+            output.content_list.extend([{"page_idx": 0}])
+            output.write_middle({"pdf_info": [{"page_idx": 0}], "_backend": "pipeline"}, 5)
+            output.write_model_output([{"page_info": {"page_no": 0}}], 5)
+
+        assert load_artifact(tmp_path / "doc_content_list.json.gz") == [{"page_idx": 0}]
+        assert load_artifact(tmp_path / "doc_middle.json.gz") == {"pdf_info": [{"page_idx": 5}], "_backend": "pipeline"}
+        assert load_artifact(tmp_path / "doc_model.json.gz") == [{"page_info": {"page_no": 5}}]
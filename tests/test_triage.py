@@ -0,0 +1,53 @@
+"""
+PDF预分类测试
+"""
+
+from pathlib import Path
+
+from pdf2md.triage import (
+    MIXED, SCANNED, TEXT, PageSample, TriageResult, classify_samples, sample_page_indices, triage_pdf
+)
+
+
+def _page(chars: int, image_area: float = 0.0, images: int = 0) -> PageSample:
+    return PageSample(page_index=0, chars=chars, image_count=images, image_area_ratio=image_area)
+
+
+class TestTriage:
+    """预分类测试类"""
+
+    def test_text_pdf(self):
+        """测试所有页都有文字层时为文字型，使用txt方法"""
+        samples = [_page(1500), _page(800, image_area=0.2, images=1)]
+        assert classify_samples(samples) == TEXT
+        assert TriageResult(kind=TEXT, pages=2, samples=samples).method == "txt"
+
+    def test_scanned_pdf(self):
+        """测试所有页只有零星文字时为扫描型，使用ocr方法"""
+        samples = [_page(0, image_area=1.0, images=1), _page(5, image_area=0.95, images=1)]
+        assert classify_samples(samples) == SCANNED
+        assert TriageResult(kind=SCANNED, pages=2, samples=samples).method == "ocr"
+
+    def test_mixed_pdf(self):
+        """测试部分页缺少文字层或有大面积图片时为混合型"""
+        assert classify_samples([_page(1200), _page(0, image_area=1.0, images=1)]) == MIXED
+        assert classify_samples([_page(1200), _page(300, image_area=0.7, images=2)]) == MIXED
+
+    def test_result_statistics(self):
+        """测试文字层覆盖率和图片密度"""
+        result = TriageResult(kind=MIXED, pages=10, samples=[_page(100, images=2), _page(0, images=1)])
+        assert result.text_coverage == 0.5
+        assert result.image_density == 1.5
+
+    def test_sample_page_indices(self):
+        """测试在整个文档范围内均匀采样"""
+        assert sample_page_indices(3, 8) == [0, 1, 2]
+        assert sample_page_indices(80, 8) == [0, 10, 20, 30, 40, 50, 60, 70]
+        assert sample_page_indices(0, 8) == []
+
+    def test_unreadable_pdf(self, tmp_path):
+        """测试无法解析的文件返回None"""
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        assert triage_pdf(broken) is None
+        assert triage_pdf(Path(tmp_path / "missing.pdf")) is None
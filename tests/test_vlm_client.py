@@ -0,0 +1,131 @@
+"""
+VLM服务并发客户端测试（本地模拟sglang服务）
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pdf2md.vlm_client import ConcurrentVlmClient, VlmClientOptions, VlmRequestError
+
+
+class _MockSglang(ThreadingHTTPServer):
+    """模拟sglang的 /generate 接口：返回 "page-{image}"，记录并发数和连接数，可以让前几次请求返回503"""
+    daemon_threads = True
+
+    def __init__(self, delay=0.05, failures=0, status=503):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = delay
+        self.failures = failures
+        self.status = status
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.connections = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            fail = server.failures > 0
+            if fail:
+                server.failures -= 1
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        if fail:
+            status, data = server.status, b"busy"
+        else:
+            status, data = 200, json.dumps({"text": f"page-{body['image_data']}"}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def mock_server(request):
+    server = _MockSglang(**getattr(request, "param", {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **options):
+    return ConcurrentVlmClient(server.url, lambda image: {"image_data": image}, VlmClientOptions(backoff=0.01, **options))
+
+
+class TestConcurrentVlmClient:
+    """VLM服务并发客户端测试类"""
+
+    def test_results_keep_page_order(self, mock_server):
+        """测试页面结果按提交顺序返回"""
+        with _client(mock_server, max_in_flight=4) as client:
+            assert client.predict_pages(["a", "b", "c"]) == ["page-a", "page-b", "page-c"]
+
+    def test_in_flight_across_documents(self, mock_server):
+        """测试多个文档的页面请求同时在途，不超过max_in_flight，且复用连接"""
+        with _client(mock_server, max_in_flight=4) as client:
+            documents = [client.submit_pages([f"{doc}-{page}" for page in range(5)]) for doc in range(3)]
+            results = [[future.result() for future in futures] for futures in documents]
+        assert results[2] == [f"page-2-{page}" for page in range(5)]
+        assert mock_server.max_in_flight == 4
+        assert mock_server.requests == 15
+        assert len(mock_server.connections) <= 4
+
+    @pytest.mark.parametrize("mock_server", [{"failures": 2}], indirect=True)
+    def test_retry_with_backoff(self, mock_server):
+        """测试服务端繁忙时退避重试"""
+        with _client(mock_server, max_in_flight=1, retries=3) as client:
+            assert client.predict_pages(["a"]) == ["page-a"]
+            assert client.retried == 2
+            assert client.requests == 3
+
+    @pytest.mark.parametrize("mock_server", [{"failures": 10}], indirect=True)
+    def test_retries_exhausted(self, mock_server):
+        """测试重试次数用完后报错"""
+        with _client(mock_server, max_in_flight=1, retries=1) as client:
+            with pytest.raises(VlmRequestError):
+                client.predict("a")
+        assert mock_server.requests == 2
+
+    @pytest.mark.parametrize("mock_server", [{"failures": 1, "status": 400}], indirect=True)
+    def test_client_error_not_retried(self, mock_server):
+        """测试请求错误（4xx）不重试"""
+        with _client(mock_server, max_in_flight=1) as client:
+            with pytest.raises(VlmRequestError):
+                client.predict("a")
+            assert client.retried == 0
+
+    def test_connection_refused(self):
+        """测试服务未启动时重试后报错"""
+        with ConcurrentVlmClient("http://127.0.0.1:9", lambda image: {}, VlmClientOptions(retries=1, backoff=0.01)) as client:
+            with pytest.raises(VlmRequestError):
+                client.predict("a")
+
+    def test_options(self):
+        """测试max_in_flight为0时不启用，无效地址报错"""
+        assert not VlmClientOptions(max_in_flight=0).enabled
+        with pytest.raises(ValueError):
+            ConcurrentVlmClient("ftp://host", lambda image: {})
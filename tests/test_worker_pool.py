@@ -0,0 +1,100 @@
+"""
+常驻模型工作进程池测试
+"""
+
+import os
+import signal
+from pathlib import Path
+
+import pytest
+
+from pdf2md.worker_pool import (
+    THREAD_ENV_VARS, ModelWorkerPool, WorkerJobResult, create_process_executor, thread_env, threads_per_worker
+)
+
+
+class TestModelWorkerPool:
+    """常驻模型工作进程池测试类"""
+
+    def test_submit_returns_function_result(self):
+        """测试提交任务返回函数结果"""
+        with ModelWorkerPool(max_workers=1) as pool:
+            future = pool.submit(pow, 3, 2)
+            assert future.result(timeout=60) == 9
+
+    def test_statistics_split_load_and_inference(self):
+        """测试统计中区分模型加载与推理耗时"""
+        with ModelWorkerPool(max_workers=1) as pool:
+            futures = [pool.submit(pow, 2, n) for n in range(3)]
+            assert [f.result(timeout=60) for f in futures] == [1, 2, 4]
+
+        stats = pool.get_statistics()
+        assert stats["workers"] == 1
+        assert stats["documents"] == 3
+        assert "total_model_load_time" in stats
+        assert stats["per_worker"][0]["documents"] == 3
+
+    def test_workers_share_process_executor_setup(self):
+        """测试常驻模型进程与普通进程池一样忽略Ctrl+C并限制线程数"""
+        with ModelWorkerPool(max_workers=2) as pool:
+            assert pool.submit(os.getenv, "OMP_NUM_THREADS").result(timeout=60) == str(threads_per_worker(2))
+            handler = pool.submit(signal.getsignal, signal.SIGINT).result(timeout=60)
+        assert handler == signal.SIG_IGN
+
+    def test_batch_job_counts_each_document(self):
+        """测试返回列表的批量任务按文档数计数"""
+        with ModelWorkerPool(max_workers=1) as pool:
+            assert pool.submit(list, "abc").result(timeout=60) == ["a", "b", "c"]
+            assert pool.submit(pow, 2, 3).result(timeout=60) == 8
+
+        assert pool.get_statistics()["documents"] == 4
+
+    def test_record_accumulates_per_worker(self):
+        """测试按工作进程累计统计"""
+        pool = ModelWorkerPool(max_workers=2)
+        pool._record(WorkerJobResult(worker_pid=1, model_load_time=5.0, inference_time=1.0, result=None))
+        pool._record(WorkerJobResult(worker_pid=1, model_load_time=5.0, inference_time=2.0, result=None))
+        pool._record(WorkerJobResult(worker_pid=2, model_load_time=4.0, inference_time=3.0, result=None))
+
+        stats = pool.get_statistics()
+        assert stats["documents"] == 3
+        # 每个工作进程的模型加载时间只计一次
+        assert stats["total_model_load_time"] == 9.0
+        assert stats["total_inference_time"] == 6.0
+        assert stats["avg_inference_time_per_document"] == 2.0
+
+
+class TestProcessExecutor:
+    """普通转换进程池测试类"""
+
+    def test_threads_per_worker(self):
+        """测试按工作进程数分配计算线程"""
+        assert threads_per_worker(1) == (os.cpu_count() or 1)
+        assert threads_per_worker(10 ** 6) == 1
+
+    def test_worker_initialised_with_thread_limit(self, monkeypatch):
+        """测试spawn启动的工作进程设置了设备，启动时已继承线程数环境变量，父进程环境不变"""
+        for name in THREAD_ENV_VARS:
+            monkeypatch.delenv(name, raising=False)
+        with create_process_executor(max_workers=2) as executor:
+            assert executor.submit(os.getenv, "MINERU_DEVICE_MODE").result(timeout=60) == "cpu"
+            if os.path.exists("/proc/self/environ"):
+                # /proc/self/environ是子进程启动时的环境，不含初始化函数之后的修改
+                environ = executor.submit(Path("/proc/self/environ").read_bytes).result(timeout=60)
+                assert f"OMP_NUM_THREADS={threads_per_worker(2)}".encode() in environ.split(b"\0")
+        assert not any(name in os.environ for name in THREAD_ENV_VARS)
+
+    def test_thread_env_restores_previous_values(self, monkeypatch):
+        """测试临时设置的线程数环境变量退出后恢复原值"""
+        monkeypatch.setenv("OMP_NUM_THREADS", "7")
+        monkeypatch.delenv("MKL_NUM_THREADS", raising=False)
+        with thread_env(2):
+            assert os.environ["OMP_NUM_THREADS"] == os.environ["MKL_NUM_THREADS"] == "2"
+        assert os.environ["OMP_NUM_THREADS"] == "7"
+        assert "MKL_NUM_THREADS" not in os.environ
+
+    def test_worker_torch_threads(self):
+        """测试工作进程中torch实际使用的计算线程数"""
+        torch = pytest.importorskip("torch")
+        with create_process_executor(max_workers=2) as executor:
+            assert executor.submit(torch.get_num_threads).result(timeout=120) == threads_per_worker(2)